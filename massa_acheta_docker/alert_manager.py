@@ -1,9 +1,11 @@
 # massa_acheta_docker/alert_manager.py
 import time
+import asyncio
 from datetime import datetime
 from loguru import logger
 from telegram.queue import queue_telegram_message
 import app_globals
+from remotes.store import is_store_enabled, store_execute, build_alert_statements
 
 # Dictionnaire pour éviter le spam (alerte = clé unique, valeur = timestamp)
 _alert_cooldown = {}
@@ -19,6 +21,8 @@ ALERT_COOLDOWNS = {
     "wallet_block_miss": 120,
     "wallet_block_produced": 5,
     "watcher_block_produced": 5,
+    "draw_node_not_ready": 60,
+    "task_crash_loop": 60,
     "release_update": 60,     # 30 minutes
 }
 
@@ -33,6 +37,8 @@ ALERT_LABELS = {
     "wallet_block_miss": "❌ Block missed",
     "wallet_block_produced": "✅ Block produced",
     "watcher_block_produced": "✅ Block produced",
+    "draw_node_not_ready": "🎯 Node not ready for block slot",
+    "task_crash_loop": "💥 Background task crash-looping",
     "release_update": "⬆️ New release detected",
     # Ajoute d'autres types ici si besoin
 }
@@ -109,4 +115,11 @@ async def send_alert(alert_type, node=None, wallet=None, level="info", details=N
         f"[ALERT] Alert '{alert_type}' sent for {node or ''} {wallet or ''} (level: {level})")
     _alert_cooldown[key] = now
 
+    # Historique des alertes envoyées (base SQLite uniquement)
+    if is_store_enabled():
+        await asyncio.to_thread(
+            store_execute,
+            build_alert_statements(alert_type=alert_type, node_name=node, wallet_address=wallet, level=level, message=message)
+        )
+
     # Ajoute ici d'autres canaux si tu veux (Discord, email, ...)
@@ -10,26 +10,111 @@ app_config['config_version'] = "2.0"
 # Telegram settings
 app_config['telegram']['sending_delay_sec'] = 2
 app_config['telegram']['sending_timeout_sec'] = 5
+# Limite Telegram (4096 caractères) : les messages plus longs sont découpés avant la file
+app_config['telegram']['max_message_length'] = 4096
 
 # Service settings
 app_config['service']['results_path'] = "app_results.json"
 app_config['service']['deferred_credits_path'] = "deferred_credits.json"
 app_config['service']['stat_path'] = "app_stat.json"
+# Stockage : "json" (fichiers ci-dessus) ou "sqlite" (base WAL unique, reprise des JSON au premier démarrage)
+app_config['service']['storage_backend'] = "json"
+app_config['service']['sqlite_path'] = "acheta_data/acheta.db"
+# Sauvegarde de app_results : seulement si un node / wallet a changé, au plus une écriture par intervalle
+app_config['service']['results_flush_interval_sec'] = 30
+# Écriture différée de l'état des watchers et des stats (sous-systèmes modifiés seulement)
+app_config['service']['persistence_flush_period_sec'] = 60
+# Historique des balances (watchers/balance.py) : un événement par changement + une keyframe par période
+app_config['service']['balance_keyframe_period_sec'] = 6 * 60 * 60
+# Stat wallets / réseau (remotes/timeseries.py) : mesures brutes, agrégats horaires, agrégats journaliers (gardés toujours)
+app_config['service']['stat_raw_retention_hours'] = 48
+app_config['service']['stat_hour_retention_days'] = 90
+# Plage par défaut de /chart_wallet et /massa_chart (ex: 48h, 30d, 1w, all)
+app_config['service']['chart_default_range'] = "48h"
 
 app_config['service']['main_loop_period_min'] = 10
 app_config['service']['heartbeat_period_hours'] = 6
+# Nombre de pipelines node → wallets menés en parallèle par le monitor
+app_config['service']['monitor_fleet_concurrency'] = 8
 app_config['service']['massa_network_update_period_min'] = 30
+app_config['service']['address_snapshot_period_sec'] = 10
+# Rafraîchissement get_addresses calé sur les tirages (next_block_draws) : avant / après chaque slot, lent sinon
+app_config['service']['address_snapshot_idle_period_sec'] = 120
+app_config['service']['draws_poll_before_sec'] = 2
+app_config['service']['draws_poll_after_sec'] = [3, 20]
+# Vérification du node avant un slot tiré (en ligne, à jour, assez de peers)
+app_config['service']['draws_readiness_window_sec'] = 180
+app_config['service']['draws_readiness_check_period_sec'] = 30
+# Relevé des résultats de cycle (stat wallets, blocks manqués) en fin de cycle + délai
+app_config['service']['cycle_close_delay_sec'] = 30
+app_config['service']['cycle_close_tick_budget_sec'] = 120
+app_config['service']['deferred_credits_refresh_period_sec'] = 600
+app_config['service']['credits_summary_days'] = 30
 
 app_config['service']['http_session_timeout_sec'] = 300
 app_config['service']['http_probe_timeout_sec'] = 120
 
+# Pool HTTP partagé (une session aiohttp par endpoint)
+app_config['service']['http_pool_limit_per_host'] = 8
+app_config['service']['http_pool_limit_total'] = 64
+app_config['service']['http_keepalive_timeout_sec'] = 60
+app_config['service']['http_dns_cache_ttl_sec'] = 300
+
+# Single-flight : requêtes identiques en vol partagées + cache court des résultats (0 = désactivé)
+app_config['service']['http_singleflight_ttl_sec'] = 2
+
+# Limiteur par node : requêtes simultanées, requêtes/s, réduction adaptative (latence / erreurs)
+app_config['service']['node_max_concurrent_requests'] = 4
+app_config['service']['node_max_requests_per_sec'] = 10
+app_config['service']['node_min_requests_per_sec'] = 1
+app_config['service']['node_latency_target_sec'] = 5
+app_config['service']['node_error_rate_threshold'] = 0.3
+app_config['service']['node_limits_adjust_interval_sec'] = 10
+
+# Disjoncteur par URL de node : ouvert après N échecs consécutifs, requête de test après le délai
+app_config['service']['node_breaker_failure_threshold'] = 3
+app_config['service']['node_breaker_open_sec'] = 60
+
+# Budget de temps par tick : chaque appel RPC du tick hérite du temps restant (sinon "late")
+app_config['service']['monitor_tick_budget_sec'] = 300
+app_config['service']['massa_tick_budget_sec'] = 600
+app_config['service']['address_snapshot_tick_budget_sec'] = 30
+
+# Scheduler : décalage aléatoire des jobs périodiques (étale la charge), budgets des autres jobs
+app_config['service']['scheduler_jitter_sec'] = 5
+app_config['service']['heartbeat_tick_budget_sec'] = 120
+app_config['service']['deferred_credits_tick_budget_sec'] = 120
+app_config['service']['draws_readiness_tick_budget_sec'] = 30
+app_config['service']['watchers_tick_budget_sec'] = 60
+app_config['service']['watchers_polling_period_sec'] = 30
+
+# Superviseur des tâches de fond : redémarrage avec backoff exponentiel, alerte unique si crash en boucle
+app_config['service']['supervisor_backoff_base_sec'] = 5
+app_config['service']['supervisor_backoff_max_sec'] = 300
+app_config['service']['supervisor_crash_loop_count'] = 5
+app_config['service']['supervisor_crash_loop_window_sec'] = 600
+app_config['service']['supervisor_stable_sec'] = 600
+
+# Plusieurs endpoints RPC par node ('url' + 'urls') : lectures vers le plus rapide des sains
+app_config['service']['node_mainnet_fallback'] = True
+app_config['service']['node_endpoint_latency_samples'] = 100
+app_config['service']['node_hedge_enabled'] = True
+app_config['service']['node_hedge_min_samples'] = 20
+
+# Nombre max d'appels JSON-RPC envoyés dans un même batch
+app_config['service']['rpc_batch_max_calls'] = 50
+
 app_config['service']['massa_release_url'] = "https://api.github.com/repos/massalabs/massa/releases/latest"
 app_config['service']['acheta_release_url'] = "https://api.github.com/repos/COLOC-BOB/Massa-acheta-docker/releases/latest"
 
 app_config['service']['mainnet_rpc_url'] = "https://mainnet.massa.net/api/v2"
 app_config['service']['mainnet_explorer_url'] = "https://explorer.massa.net/mainnet"
 app_config['service']['massexplo_api_url'] = "https://api.massexplo.io/info?network=MainNet"
+# Taille des pages get_stakers et nombre de pages récupérées en parallèle
 app_config['service']['mainnet_stakers_bundle'] = 100
+app_config['service']['mainnet_stakers_concurrency'] = 4
+# Rescan complet de get_stakers seulement si le nombre de stakers (/info) change, ou au plus tard après ce délai
+app_config['service']['mainnet_stakers_full_scan_period_min'] = 360
 
 # Alert settings (centralisé pour alert_manager)
 app_config['alerts']['wallet_balance_drop_threshold'] = 10   # ex: 10 MAS
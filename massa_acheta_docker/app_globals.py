@@ -12,6 +12,11 @@ import requests
 
 from app_config import app_config
 from remotes_utils import save_app_results
+from remotes.store import (
+    is_store_enabled, migrate_json_to_store, load_results, load_samples, load_credits,
+    SERIES_WALLET_STAT, SERIES_NETWORK_STAT
+)
+from remotes.timeseries import ROLLUP_TIERS, get_tier_series, restore_rollups
 
 # Charge les variables d'environnement .env (clé bot, chat id)
 load_dotenv()
@@ -29,7 +34,17 @@ tg_bot = None
 tg_dp = None
 
 app_results_obj = Path(app_config['service']['results_path'])
-if app_results_obj.exists():
+if is_store_enabled():
+    # Base SQLite : reprise unique des fichiers JSON au premier démarrage, puis lecture de la base
+    try:
+        migrate_json_to_store()
+        app_results = load_results()
+    except BaseException as E:
+        logger.critical(f"[APP_GLOBALS] Cannot load results from SQLite store '{app_config['service']['sqlite_path']}' ({str(E)})")
+        sys_exit(1)
+    else:
+        logger.info(f"[APP_GLOBALS] Successfully loaded results from SQLite store ({len(app_results)} node(s))")
+elif app_results_obj.exists():
     logger.info(f"[APP_GLOBALS] Loading results from '{app_results_obj}' file...")
 
     with open(file=app_results_obj, mode="rt") as input_results:
@@ -73,9 +88,15 @@ for node_name, node_data in app_results.items():
         wallet_data.setdefault('produced_blocks', 0)
         wallet_data.setdefault('last_result', {"unknown": "Never updated before"})
         if 'stat' not in wallet_data or not isinstance(wallet_data['stat'], deque):
-            wallet_data['stat'] = deque(
-                maxlen=int(24 * 60 / app_config['service']['main_loop_period_min'])
-            )
+            # Mesures brutes, purgées par âge (remotes/timeseries.py)
+            wallet_data['stat'] = deque()
+
+# --- Shared get_addresses snapshot (remotes/addresses.py) ---
+address_snapshot = {
+    "version": 0,
+    "time": 0,
+    "nodes": {}
+}
 
 # --- MASSA network values ---
 massa_config = {}
@@ -93,13 +114,36 @@ massa_network['values'] = {
     "node_ip": "",
     "last_updated": 0
 }
-massa_network['stat'] = deque(
-    maxlen=int(24 * 60 / app_config['service']['massa_network_update_period_min'])
-)
+massa_network['stat'] = deque()
 
 # --- Restore stat values ---
 app_stat_obj = Path(app_config['service']['stat_path'])
-if app_stat_obj.exists():
+if is_store_enabled():
+    try:
+        for node_name in app_results:
+            for wallet_address, wallet_data in app_results[node_name]['wallets'].items():
+                wallet_data['stat'].extend(load_samples(series=SERIES_WALLET_STAT, node_name=node_name, wallet_address=wallet_address))
+                restore_rollups(
+                    series=SERIES_WALLET_STAT,
+                    node_name=node_name,
+                    wallet_address=wallet_address,
+                    stat=wallet_data['stat'],
+                    tiers={
+                        tier: load_samples(series=get_tier_series(series=SERIES_WALLET_STAT, tier=tier), node_name=node_name, wallet_address=wallet_address)
+                        for tier in ROLLUP_TIERS
+                    }
+                )
+        massa_network['stat'].extend(load_samples(series=SERIES_NETWORK_STAT))
+        restore_rollups(
+            series=SERIES_NETWORK_STAT,
+            stat=massa_network['stat'],
+            tiers={tier: load_samples(series=get_tier_series(series=SERIES_NETWORK_STAT, tier=tier)) for tier in ROLLUP_TIERS}
+        )
+    except BaseException as E:
+        logger.error(f"[APP_GLOBALS] Cannot restore stat from SQLite store ({str(E)})")
+    else:
+        logger.info(f"[APP_GLOBALS] Restored stat from SQLite store ({len(massa_network['stat'])} measures for massa_network)")
+elif app_stat_obj.exists():
     logger.info(f"[APP_GLOBALS] Loading stat from '{app_stat_obj}' file...")
     try:
         with open(file=app_stat_obj, mode="rt") as input_stat:
@@ -111,10 +155,18 @@ if app_stat_obj.exists():
         try:
             for node_name in app_results:
                 for wallet_address in app_results[node_name]['wallets']:
-                    wallet_stat = app_stat['app_results'][node_name][wallet_address].get("stat", None)
+                    wallet_stat_data = app_stat['app_results'][node_name][wallet_address]
+                    wallet_stat = wallet_stat_data.get("stat", None)
                     if wallet_stat and type(wallet_stat) == list and len(wallet_stat) > 0:
                         for measure in wallet_stat:
                             app_results[node_name]['wallets'][wallet_address]['stat'].append(measure)
+                    restore_rollups(
+                        series=SERIES_WALLET_STAT,
+                        node_name=node_name,
+                        wallet_address=wallet_address,
+                        stat=app_results[node_name]['wallets'][wallet_address]['stat'],
+                        tiers={tier: wallet_stat_data.get(f"stat_{tier}", None) for tier in ROLLUP_TIERS}
+                    )
                     logger.info(f"[APP_GLOBALS] Restored {len(app_results[node_name]['wallets'][wallet_address]['stat'])} measures for wallet '{wallet_address}'@'{node_name}'")
         except BaseException as E:
             logger.error(f"[APP_GLOBALS] Cannot restore app_result stat ({str(E)})")
@@ -126,6 +178,11 @@ if app_stat_obj.exists():
                 for measure in massa_network_stat:
                     if type(measure) == dict:
                         massa_network['stat'].append(measure)
+            restore_rollups(
+                series=SERIES_NETWORK_STAT,
+                stat=massa_network['stat'],
+                tiers={tier: app_stat['massa_network'].get(f"stat_{tier}", None) for tier in ROLLUP_TIERS}
+            )
             logger.info(f"[APP_GLOBALS] Restored {len(massa_network['stat'])} measures for massa_network")
         except BaseException as E:
             logger.error(f"[APP_GLOBALS] Cannot restore massa_network stat ({str(E)})")
@@ -157,8 +214,16 @@ latest_acheta_release = fetch_latest_github_release()
 # --- Init deferred_credits ---
 deferred_credits = {}
 deferred_credits_obj = Path(app_config['service']['deferred_credits_path'])
-if not deferred_credits_obj.exists():
+if is_store_enabled():
+    try:
+        deferred_credits = load_credits()
+    except BaseException as E:
+        logger.error(f"[APP_GLOBALS] Cannot load deferred_credits from SQLite store ({str(E)})")
+    else:
+        logger.info(f"[APP_GLOBALS] Successfully loaded deferred_credits from SQLite store ({len(deferred_credits)} wallet(s))")
+elif not deferred_credits_obj.exists():
     logger.warning(f"[APP_GLOBALS] No deferred_credits file '{deferred_credits_obj}' exists. Skipping...")
+else:
     with open(file=deferred_credits_obj, mode="rt") as input_deferred_credits:
         try:
             deferred_credits = json.load(fp=input_deferred_credits)
@@ -167,5 +232,10 @@ if not deferred_credits_obj.exists():
         else:
             logger.info(f"[APP_GLOBALS] Successfully loaded deferred_credits from '{deferred_credits_obj}' file!")
 
+# Index en mémoire des crédits (par adresse, trié par slot), republié à chaque changement
+deferred_credits_index = None
+from remotes.credits import publish_credits_index
+publish_credits_index(deferred_credits=deferred_credits)
+
 if __name__ == "__main__":
     pass
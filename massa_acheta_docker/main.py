@@ -10,9 +10,16 @@ from aiogram.fsm.storage.memory import MemoryStorage
 from app_config import app_config
 import app_globals
 
-from remotes.monitor import monitor as remote_monitor
-from remotes.massa import massa as remote_massa
-from remotes.heartbeat import heartbeat as remote_heartbeat
+from remotes.monitor import monitor_tick
+from remotes.massa import massa_tick
+from remotes.heartbeat import heartbeat_tick
+from remotes.addresses import address_snapshot_tick
+from remotes.draws import draws_readiness_tick
+from remotes.cycles import cycle_close_tick
+from remotes.chainclock import at_cycle_end
+from remotes.scheduler import register_job, run_scheduler
+from remotes.supervisor import start_supervised_task, stop_supervised_tasks
+from remotes.limiter import validate_limiter_config
 
 from telegram.queue import queue_telegram_message, operate_telegram_queue
 
@@ -21,21 +28,23 @@ from telegram.handlers import cancel
 from telegram.handlers import view_config, view_node, view_wallet, view_address, view_credits, view_earnings, view_id, chart_wallet
 from telegram.handlers import add_node, add_wallet
 from telegram.handlers import delete_node, delete_wallet
-from telegram.handlers import massa_info, massa_chart, acheta_release
+from telegram.handlers import massa_info, massa_chart, view_stakers, acheta_release
 from telegram.handlers import reset
 from telegram.handlers import unknown
 from telegram.menu import router as menu_router
 from telegram.handlers import help
 from telegram.handlers import watchers_menu
 
-from remotes_utils import save_app_stat, save_app_results, update_deferred_credits_from_node
+from remotes_utils import save_app_results, update_deferred_credits_from_node, close_http_sessions
+from remotes.persistence import persistence_tick, flush_persistence, flush_persistence_sync
+from remotes.store import close_store
 
-from watchers.blocks import watch_blocks
-from watchers.deferred_credits import watch_deferred_credits
-from watchers.rolls import watch_rolls
-from watchers.balance import watch_balance
-from watchers.missed_blocks import watch_missed_blocks
-from watchers.operations import watch_operations
+from watchers.blocks import watch_blocks_tick
+from watchers.deferred_credits import watch_deferred_credits_tick
+from watchers.rolls import watch_rolls_tick
+from watchers.balance import watch_balance_tick
+from watchers.missed_blocks import watch_missed_blocks_tick
+from watchers.operations import watch_operations_tick
 
 from loguru import logger
 logger.add(
@@ -49,14 +58,83 @@ logger.add(
     diagnose=True
 )
 
-async def deferred_credits_auto_refresh_loop():
-    while True:
-        try:
-            logger.info(f"[MAIN] Refresh deferred_credits.json depuis le node Massa")
-            await asyncio.to_thread(update_deferred_credits_from_node)  # Si la fonction est sync ! Sinon : await update_deferred_credits_from_node()
-        except Exception as e:
-            logger.error(f"[MAIN] Refresh deferred_credits error: {str(e)}")
-        await asyncio.sleep(600)  # 10 minutes
+# Jobs périodiques, tous planifiés par le scheduler unique (remotes/scheduler.py)
+SCHEDULED_JOBS = [
+    {
+        "name": "monitor",
+        "func": monitor_tick,
+        "period_sec": app_config['service']['main_loop_period_min'] * 60,
+        "jitter_sec": app_config['service']['scheduler_jitter_sec'],
+        "deadline_sec": app_config['service']['monitor_tick_budget_sec'],
+        "catch_up": "once"
+    },
+    {
+        "name": "massa",
+        "func": massa_tick,
+        "period_sec": app_config['service']['massa_network_update_period_min'] * 60,
+        "jitter_sec": app_config['service']['scheduler_jitter_sec'],
+        "deadline_sec": app_config['service']['massa_tick_budget_sec'],
+        "initial_delay_sec": app_config['service']['scheduler_jitter_sec']
+    },
+    {
+        "name": "heartbeat",
+        "func": heartbeat_tick,
+        "period_sec": app_config['service']['heartbeat_period_hours'] * 60 * 60,
+        "deadline_sec": app_config['service']['heartbeat_tick_budget_sec'],
+        "initial_delay_sec": app_config['service']['heartbeat_period_hours'] * 60 * 60
+    },
+    {
+        "name": "deferred_credits",
+        "func": update_deferred_credits_from_node,
+        "period_sec": app_config['service']['deferred_credits_refresh_period_sec'],
+        "jitter_sec": app_config['service']['scheduler_jitter_sec'],
+        "deadline_sec": app_config['service']['deferred_credits_tick_budget_sec']
+    },
+    {
+        # Adaptatif : address_snapshot_tick retourne le délai jusqu'au prochain tirage à surveiller
+        "name": "address_snapshot",
+        "func": address_snapshot_tick,
+        "period_sec": app_config['service']['address_snapshot_idle_period_sec'],
+        "deadline_sec": app_config['service']['address_snapshot_tick_budget_sec']
+    },
+    {
+        "name": "draws_readiness",
+        "func": draws_readiness_tick,
+        "period_sec": app_config['service']['draws_readiness_check_period_sec'],
+        "deadline_sec": app_config['service']['draws_readiness_tick_budget_sec']
+    },
+    {
+        # Horloge de la chaîne : fin de cycle + délai, résultats du cycle définitifs (stat, blocks manqués)
+        "name": "cycle_close",
+        "func": cycle_close_tick,
+        "at_func": at_cycle_end(offset_sec=app_config['service']['cycle_close_delay_sec']),
+        "deadline_sec": app_config['service']['cycle_close_tick_budget_sec']
+    },
+    {
+        # Écriture différée de l'état des watchers et des stats (remotes/persistence.py)
+        "name": "persistence",
+        "func": persistence_tick,
+        "period_sec": app_config['service']['persistence_flush_period_sec']
+    },
+    # WATCHERS : réveillés à chaque nouveau snapshot d'adresses, période = filet de sécurité
+    *[
+        {
+            "name": watcher_name,
+            "func": watcher_tick,
+            "period_sec": app_config['service']['watchers_polling_period_sec'],
+            "deadline_sec": app_config['service']['watchers_tick_budget_sec'],
+            "triggers": ["address_snapshot"]
+        }
+        for watcher_name, watcher_tick in [
+            ("watch_blocks", watch_blocks_tick),
+            ("watch_deferred_credits", watch_deferred_credits_tick),
+            ("watch_rolls", watch_rolls_tick),
+            ("watch_balance", watch_balance_tick),
+            ("watch_missed_blocks", watch_missed_blocks_tick),
+            ("watch_operations", watch_operations_tick)
+        ]
+    ]
+]
 
 def format_start_message():
     nodes_list = []
@@ -95,18 +173,11 @@ async def main() -> None:
     await queue_telegram_message(message_text=format_start_message())
 
     try:
-        asyncio.create_task(operate_telegram_queue())
-        asyncio.create_task(remote_monitor())
-        asyncio.create_task(remote_massa())
-        asyncio.create_task(remote_heartbeat())
-        asyncio.create_task(deferred_credits_auto_refresh_loop())
-        # WATCHERS
-        asyncio.create_task(watch_blocks())
-        asyncio.create_task(watch_deferred_credits())
-        asyncio.create_task(watch_rolls())
-        asyncio.create_task(watch_balance())
-        asyncio.create_task(watch_missed_blocks())
-        asyncio.create_task(watch_operations())
+        # Tâches de fond supervisées : relancées avec backoff si elles plantent ou s'arrêtent
+        start_supervised_task(task_name="telegram_queue", coro_factory=operate_telegram_queue)
+        for scheduled_job in SCHEDULED_JOBS:
+            register_job(**scheduled_job)
+        start_supervised_task(task_name="scheduler", coro_factory=run_scheduler)
         # ROUTEURS HANDLERS
         tg_dp.include_router(help.router)
         tg_dp.include_router(start.router)
@@ -125,6 +196,7 @@ async def main() -> None:
         tg_dp.include_router(delete_wallet.router)
         tg_dp.include_router(massa_info.router)
         tg_dp.include_router(massa_chart.router)
+        tg_dp.include_router(view_stakers.router)
         tg_dp.include_router(acheta_release.router)
         tg_dp.include_router(reset.router)
         tg_dp.include_router(menu_router)  
@@ -137,6 +209,9 @@ async def main() -> None:
     except BaseException as E:
         logger.error(f"[MAIN] Exception {str(E)} ({E})")
     finally:
+        await stop_supervised_tasks()
+        await flush_persistence()
+        await close_http_sessions()
         logger.error(f"[MAIN] <- Quit Def")
 
     return
@@ -144,12 +219,19 @@ async def main() -> None:
 if __name__ == "__main__":
     logger.info(f"[MAIN] MASSA Acheta started at {app_globals.acheta_start_time}")
 
+    try:
+        validate_limiter_config()
+    except ValueError as E:
+        logger.critical(f"[MAIN] Invalid configuration ({str(E)})")
+        sys_exit(1)
+
     try:
         asyncio.run(main())
     except BaseException as E:
         logger.error(f"[MAIN] Exception {str(E)} ({E})")
     finally:
         save_app_results()
-        save_app_stat()
+        flush_persistence_sync()
+        close_store()
         logger.critical(f"[MAIN] Service terminated")
         sys_exit()
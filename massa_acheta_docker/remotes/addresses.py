@@ -0,0 +1,226 @@
+# massa_acheta_docker/remotes/addresses.py
+from loguru import logger
+import asyncio
+
+from app_config import app_config
+import app_globals
+from remotes_utils import pull_node_api, t_now
+from remotes.deadline import is_late
+from remotes.scheduler import trigger_jobs
+from remotes.draws import get_node_next_poll
+
+# Réveille les watchers à chaque nouvelle version du snapshot
+_snapshot_updated = asyncio.Condition()
+_refresh_lock = asyncio.Lock()
+
+@logger.catch
+async def pull_node_addresses(node_name: str="", node_url: str="", wallet_addresses: list=[]) -> dict:
+    logger.debug(f"[ADDRESSES] -> pull_node_addresses")
+
+    node_snapshot = {
+        "url": node_url,
+        "time": await t_now(),
+        "status": False,
+        "error": None,
+        "late": False,
+        "wallets": {}
+    }
+
+    try:
+        # get_addresses accepte une liste : tous les wallets du node en un seul appel
+        # Données publiques : endpoint le plus rapide du node, repli possible sur mainnet
+        node_answer = await pull_node_api(
+            node_name=node_name,
+            read_only=True,
+            api_method="POST",
+            api_payload={
+                "jsonrpc": "2.0",
+                "id": 0,
+                "method": "get_addresses",
+                "params": [wallet_addresses]
+            },
+            api_root_element="result"
+        )
+        node_snapshot['late'] = is_late(node_answer)
+        node_result = node_answer.get("result", None)
+        if not isinstance(node_result, list):
+            raise Exception(f"Wrong answer from MASSA node API ({node_answer})")
+
+        for address_info in node_result:
+            if not isinstance(address_info, dict):
+                continue
+            address = address_info.get("address", None)
+            if address in wallet_addresses:
+                node_snapshot['wallets'][address] = address_info
+
+        missing_wallets = [a for a in wallet_addresses if a not in node_snapshot['wallets']]
+        if missing_wallets:
+            logger.warning(f"[ADDRESSES] Node '{node_name}' did not return {len(missing_wallets)} wallet(s): {missing_wallets}")
+
+    except BaseException as E:
+        logger.warning(f"[ADDRESSES] Cannot pull addresses from node '{node_name}' ({node_url}): {str(E)}")
+        node_snapshot['error'] = str(E)
+
+    else:
+        node_snapshot['status'] = True
+
+    return node_snapshot
+
+@logger.catch
+async def refresh_address_snapshot(node_names: list=None) -> dict:
+    """
+    Récupère une fois les adresses de chaque node et publie un nouveau snapshot versionné.
+    node_names: limite le rafraîchissement à ces nodes (les autres gardent leur dernière valeur).
+    """
+    logger.debug(f"[ADDRESSES] -> refresh_address_snapshot")
+
+    node_coros = {}
+    for node_name, node_data in list(app_globals.app_results.items()):
+        if node_names is not None and node_name not in node_names:
+            continue
+        wallet_addresses = list(node_data.get("wallets", {}).keys())
+        if not wallet_addresses:
+            continue
+        node_url = node_data.get("url") or app_config['service']['mainnet_rpc_url']
+        node_coros[node_name] = pull_node_addresses(
+            node_name=node_name,
+            node_url=node_url,
+            wallet_addresses=wallet_addresses
+        )
+
+    # Appels hors verrou : les rafraîchissements de nodes différents (pipelines du monitor) se chevauchent
+    node_results = await asyncio.gather(*node_coros.values(), return_exceptions=True)
+    time_now = await t_now()
+
+    async with _refresh_lock:
+        # Fusion dans le snapshot courant (publié éventuellement par un autre rafraîchissement entre-temps)
+        previous_snapshot = app_globals.address_snapshot
+        snapshot_nodes = {}
+        if node_names is not None:
+            snapshot_nodes.update(
+                {n: v for n, v in previous_snapshot['nodes'].items() if n in app_globals.app_results}
+            )
+        for node_name, node_snapshot in zip(node_coros.keys(), node_results):
+            if isinstance(node_snapshot, BaseException) or not node_snapshot:
+                node_snapshot = {
+                    "url": app_globals.app_results.get(node_name, {}).get("url"),
+                    "time": time_now,
+                    "status": False,
+                    "error": str(node_snapshot),
+                    "late": False,
+                    "wallets": {}
+                }
+            snapshot_nodes[node_name] = node_snapshot
+
+        # Nouveau dict à chaque version : les lecteurs gardent une vue cohérente
+        new_snapshot = {
+            "version": previous_snapshot['version'] + 1,
+            "time": time_now,
+            "nodes": snapshot_nodes
+        }
+        app_globals.address_snapshot = new_snapshot
+
+    async with _snapshot_updated:
+        _snapshot_updated.notify_all()
+    # Réveille les watchers abonnés au snapshot
+    trigger_jobs(event="address_snapshot")
+
+    nb_wallets = sum(len(n['wallets']) for n in snapshot_nodes.values())
+    logger.info(f"[ADDRESSES] Published address snapshot v{new_snapshot['version']} ({len(snapshot_nodes)} node(s), {nb_wallets} wallet(s))")
+    return new_snapshot
+
+async def wait_address_snapshot(last_version: int=0, timeout: int=None) -> dict:
+    """
+    Attend un snapshot plus récent que last_version (ou timeout) et le retourne.
+    """
+    if app_globals.address_snapshot['version'] > last_version:
+        return app_globals.address_snapshot
+
+    try:
+        async with _snapshot_updated:
+            await asyncio.wait_for(
+                _snapshot_updated.wait_for(lambda: app_globals.address_snapshot['version'] > last_version),
+                timeout=timeout
+            )
+    except asyncio.TimeoutError:
+        pass
+
+    return app_globals.address_snapshot
+
+def get_snapshot_wallet(snapshot: dict={}, node_name: str="", wallet_address: str="") -> dict:
+    """Entrée get_addresses d'un wallet dans un snapshot donné (None si absente)."""
+    return snapshot.get("nodes", {}).get(node_name, {}).get("wallets", {}).get(wallet_address, None)
+
+async def get_wallet_address_info(node_name: str="", wallet_address: str="", max_age_sec: int=None) -> dict:
+    """
+    Retourne l'entrée get_addresses du wallet depuis le snapshot.
+    Rafraîchit le node si le wallet est absent (ex: wallet juste ajouté) ou trop ancien.
+    Retourne {"result": info} ou {"error": ...} comme pull_http_api.
+    """
+    if max_age_sec is None:
+        max_age_sec = app_config['service']['address_snapshot_period_sec'] * 3
+
+    node_snapshot = app_globals.address_snapshot['nodes'].get(node_name, None)
+    time_now = await t_now()
+    if (
+        not node_snapshot or
+        wallet_address not in node_snapshot['wallets'] or
+        time_now - node_snapshot['time'] > max_age_sec
+    ):
+        snapshot = await refresh_address_snapshot(node_names=[node_name])
+        node_snapshot = snapshot['nodes'].get(node_name, None) if snapshot else None
+
+    if not node_snapshot:
+        return {"error": f"No address snapshot for node '{node_name}'"}
+    if node_snapshot['error']:
+        if node_snapshot.get("late", False):
+            return {"error": node_snapshot['error'], "late": True}
+        return {"error": node_snapshot['error']}
+
+    address_info = node_snapshot['wallets'].get(wallet_address, None)
+    if not address_info:
+        return {"error": f"Wallet '{wallet_address}' missing from node '{node_name}' answer"}
+
+    return {"result": address_info}
+
+# Prochain rafraîchissement prévu par node (horodatage unix)
+_node_next_poll = {}
+
+async def address_snapshot_tick() -> float:
+    """
+    Rafraîchit les nodes dont le créneau est échu, au rythme de leurs tirages : juste avant / après
+    les slots de leurs wallets (next_block_draws), cadence lente (address_snapshot_idle_period_sec) entre deux.
+    Retourne le délai avant le prochain passage (job adaptatif de remotes/scheduler.py).
+    """
+    time_now = await t_now()
+    # Nodes sans wallet : rien à rafraîchir, pas de créneau
+    polled_nodes = [
+        node_name for node_name, node_data in list(app_globals.app_results.items())
+        if node_data.get("wallets", {})
+    ]
+    due_nodes = [
+        node_name for node_name in polled_nodes
+        if _node_next_poll.get(node_name, 0) <= time_now
+    ]
+    if due_nodes:
+        snapshot = await refresh_address_snapshot(node_names=due_nodes)
+        time_now = await t_now()
+        for node_name in due_nodes:
+            _node_next_poll[node_name] = get_node_next_poll(
+                snapshot=snapshot or app_globals.address_snapshot,
+                node_name=node_name,
+                time_now=time_now
+            )
+            logger.debug(f"[ADDRESSES] Next poll for node '{node_name}' in {_node_next_poll[node_name] - time_now:.1f}s")
+
+    for node_name in list(_node_next_poll):
+        if node_name not in polled_nodes:
+            _node_next_poll.pop(node_name, None)
+
+    # Aucun créneau prévu (pas de node, ou nodes sans wallet) : cadence lente
+    idle_period_sec = app_config['service']['address_snapshot_idle_period_sec']
+    sleep_sec = min(_node_next_poll.values(), default=time_now + idle_period_sec) - time_now
+    return min(max(sleep_sec, 0.5), idle_period_sec)
+
+if __name__ == "__main__":
+    pass
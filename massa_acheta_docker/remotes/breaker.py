@@ -0,0 +1,84 @@
+# massa_acheta_docker/remotes/breaker.py
+from loguru import logger
+from time import monotonic
+
+from app_config import app_config
+
+# Disjoncteur par URL de node : "closed" -> "open" après N échecs (fast-fail),
+# puis "half_open" après node_breaker_open_sec avec une seule requête de test à la fois.
+_node_breakers = {}
+
+def get_node_breaker(node_url: str="") -> dict:
+    breaker = _node_breakers.get(node_url, None)
+    if breaker is None:
+        breaker = {
+            "state": "closed",
+            "failures": 0,
+            "opened_at": 0.0,
+            "probe_in_flight": False,
+            "fast_failed": 0,
+            "opened_count": 0
+        }
+        _node_breakers[node_url] = breaker
+    return breaker
+
+def get_breaker_stats() -> dict:
+    return {node_url: dict(breaker) for node_url, breaker in _node_breakers.items()}
+
+def is_node_circuit_open(node_url: str="") -> bool:
+    """True si le node est considéré mort et pas encore éligible à une requête de test."""
+    breaker = _node_breakers.get(node_url, None)
+    if breaker is None or breaker['state'] == "closed":
+        return False
+    if breaker['state'] == "open":
+        return monotonic() - breaker['opened_at'] < app_config['service']['node_breaker_open_sec']
+    return breaker['probe_in_flight']
+
+def breaker_allow_request(node_url: str="") -> bool:
+    breaker = get_node_breaker(node_url=node_url)
+
+    if breaker['state'] == "closed":
+        return True
+
+    if breaker['state'] == "open":
+        if monotonic() - breaker['opened_at'] < app_config['service']['node_breaker_open_sec']:
+            breaker['fast_failed'] += 1
+            return False
+        breaker['state'] = "half_open"
+        breaker['probe_in_flight'] = False
+        logger.info(f"[BREAKER] Circuit for '{node_url}' is half-open, probing...")
+
+    # half_open : une seule requête de test à la fois
+    if breaker['probe_in_flight']:
+        breaker['fast_failed'] += 1
+        return False
+    breaker['probe_in_flight'] = True
+    return True
+
+def breaker_record_result(node_url: str="", success: bool=False) -> None:
+    breaker = get_node_breaker(node_url=node_url)
+
+    if success:
+        if breaker['state'] != "closed":
+            logger.info(f"[BREAKER] Circuit for '{node_url}' closed again (node answered)")
+        breaker['state'] = "closed"
+        breaker['failures'] = 0
+        breaker['probe_in_flight'] = False
+        return
+
+    breaker['failures'] += 1
+    if breaker['state'] == "half_open" or breaker['failures'] >= app_config['service']['node_breaker_failure_threshold']:
+        if breaker['state'] != "open":
+            breaker['opened_count'] += 1
+            logger.warning(f"[BREAKER] Circuit for '{node_url}' opened after {breaker['failures']} failure(s), fast-failing for {app_config['service']['node_breaker_open_sec']}s")
+        breaker['state'] = "open"
+        breaker['opened_at'] = monotonic()
+        breaker['probe_in_flight'] = False
+
+def breaker_release_probe(node_url: str="") -> None:
+    """Libère une requête de test sans compter ni succès ni échec (ex: coupée par le budget du tick)."""
+    breaker = get_node_breaker(node_url=node_url)
+    breaker['probe_in_flight'] = False
+
+if __name__ == "__main__":
+    pass
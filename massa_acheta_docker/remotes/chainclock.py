@@ -0,0 +1,126 @@
+# massa_acheta_docker/remotes/chainclock.py
+from loguru import logger
+import math
+from datetime import datetime, timezone
+from functools import lru_cache
+
+import app_globals
+
+# Paramètres mainnet par défaut, remplacés par ceux remontés par get_status (massa_get_status)
+MAINNET_GENESIS_TIMESTAMP = 1705312800
+MAINNET_T0_SEC = 16
+MAINNET_THREAD_COUNT = 32
+MAINNET_PERIODS_PER_CYCLE = 128
+
+def get_chain_params() -> dict:
+    """genesis (s), t0 (s), thread_count, periods_per_cycle du réseau suivi."""
+    network_values = app_globals.massa_network['values']
+    try:
+        genesis_sec = int(network_values.get("genesis_timestamp", 0) or 0) / 1000 or MAINNET_GENESIS_TIMESTAMP
+        t0_sec = int(network_values.get("t0", 0) or 0) / 1000 or MAINNET_T0_SEC
+        thread_count = int(network_values.get("thread_count", 0) or 0) or MAINNET_THREAD_COUNT
+        periods_per_cycle = int(network_values.get("periods_per_cycle", 0) or 0) or MAINNET_PERIODS_PER_CYCLE
+    except Exception as E:
+        logger.warning(f"[CHAINCLOCK] Bad network timing values, using mainnet defaults ({str(E)})")
+        genesis_sec, t0_sec, thread_count, periods_per_cycle = MAINNET_GENESIS_TIMESTAMP, MAINNET_T0_SEC, MAINNET_THREAD_COUNT, MAINNET_PERIODS_PER_CYCLE
+    return {
+        "genesis_sec": genesis_sec,
+        "t0_sec": t0_sec,
+        "thread_count": thread_count,
+        "periods_per_cycle": periods_per_cycle
+    }
+
+def get_period_at(unix_time: float=0) -> int:
+    """Période en cours à cet instant."""
+    chain_params = get_chain_params()
+    return max(0, math.floor((unix_time - chain_params['genesis_sec']) / chain_params['t0_sec']))
+
+def get_cycle_at(unix_time: float=0) -> int:
+    """Cycle en cours à cet instant."""
+    return get_period_at(unix_time=unix_time) // get_chain_params()['periods_per_cycle']
+
+def get_period_start(period: int=0) -> float:
+    chain_params = get_chain_params()
+    return chain_params['genesis_sec'] + period * chain_params['t0_sec']
+
+def get_cycle_start(cycle: int=0) -> float:
+    return get_period_start(period=cycle * get_chain_params()['periods_per_cycle'])
+
+def get_cycle_end(cycle: int=0) -> float:
+    """Fin du cycle = début du suivant : ses résultats sont définitifs à partir de là."""
+    return get_cycle_start(cycle=cycle + 1)
+
+def get_next_cycle_boundary(unix_time: float=0, offset_sec: float=0) -> float:
+    """Prochain instant 'fin de cycle + offset_sec' strictement après unix_time."""
+    cycle = get_cycle_at(unix_time=unix_time - offset_sec)
+    return get_cycle_end(cycle=cycle) + offset_sec
+
+def get_next_period_boundary(unix_time: float=0, offset_sec: float=0, every_periods: int=1) -> float:
+    """Prochain instant 'fin de période (multiple de every_periods) + offset_sec' strictement après unix_time."""
+    period = get_period_at(unix_time=unix_time - offset_sec)
+    next_period = (period // every_periods + 1) * every_periods
+    return get_period_start(period=next_period) + offset_sec
+
+@lru_cache(maxsize=4096)
+def _slot_timestamp(period: int, thread: int, genesis_sec: float, t0_sec: float, thread_count: int) -> float:
+    return genesis_sec + period * t0_sec + thread * t0_sec / thread_count
+
+def get_slot_timestamp(slot: dict={}) -> float:
+    """Horodatage (s) d'un slot {period, thread} : genesis + period * t0 + thread * t0 / thread_count."""
+    chain_params = get_chain_params()
+    return _slot_timestamp(
+        int(slot['period']),
+        int(slot.get("thread", 0) or 0),
+        chain_params['genesis_sec'],
+        chain_params['t0_sec'],
+        chain_params['thread_count']
+    )
+
+def get_slots_timestamps(slots: list=[]) -> list:
+    """Version liste de get_slot_timestamp : paramètres lus une fois pour toute la liste."""
+    chain_params = get_chain_params()
+    genesis_sec = chain_params['genesis_sec']
+    t0_sec = chain_params['t0_sec']
+    thread_sec = t0_sec / chain_params['thread_count']
+    return [
+        genesis_sec + int(slot['period']) * t0_sec + int(slot.get("thread", 0) or 0) * thread_sec
+        for slot in slots
+    ]
+
+def get_timestamp_slot(unix_time: float=0) -> dict:
+    """Slot {period, thread} en cours à cet instant."""
+    chain_params = get_chain_params()
+    elapsed = max(0.0, unix_time - chain_params['genesis_sec'])
+    period = math.floor(elapsed / chain_params['t0_sec'])
+    thread = math.floor((elapsed - period * chain_params['t0_sec']) * chain_params['thread_count'] / chain_params['t0_sec'])
+    return {"period": period, "thread": min(thread, chain_params['thread_count'] - 1)}
+
+@lru_cache(maxsize=4096)
+def _format_time(time_key: int, date_format: str, day_only: bool) -> str:
+    unix_time = time_key * 86400 if day_only else time_key
+    return datetime.fromtimestamp(unix_time, tz=timezone.utc).strftime(date_format)
+
+def format_chain_times(unix_times: list=[], date_format: str="%b %d, %Y") -> list:
+    """
+    Dates UTC des horodatages, mémorisées : à la journée pour un format sans heure
+    (les longues listes de crédits partagent peu de jours distincts), à la seconde sinon.
+    """
+    day_only = not any(directive in date_format for directive in ("%H", "%I", "%M", "%S", "%p", "%X", "%c"))
+    return [
+        _format_time(int(unix_time // 86400) if day_only else int(unix_time), date_format, day_only)
+        for unix_time in unix_times
+    ]
+
+def format_chain_time(unix_time: float=0, date_format: str="%b %d, %Y") -> str:
+    return format_chain_times(unix_times=[unix_time], date_format=date_format)[0]
+
+def at_cycle_end(offset_sec: float=0):
+    """Planification pour remotes/scheduler.py (at_func) : chaque fin de cycle + offset_sec."""
+    return lambda unix_time: get_next_cycle_boundary(unix_time=unix_time, offset_sec=offset_sec)
+
+def at_period_end(offset_sec: float=0, every_periods: int=1):
+    """Planification pour remotes/scheduler.py (at_func) : chaque fin de période + offset_sec."""
+    return lambda unix_time: get_next_period_boundary(unix_time=unix_time, offset_sec=offset_sec, every_periods=every_periods)
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,116 @@
+# massa_acheta_docker/remotes/credits.py
+from loguru import logger
+from bisect import bisect_left
+from itertools import accumulate
+
+import app_globals
+from remotes.chainclock import get_chain_params, get_slots_timestamps
+
+def build_credits_entries(wallet_credits: list=[]) -> dict:
+    """
+    Crédits d'un wallet triés par slot de libération, avec les timestamps et les sommes
+    cumulées pour répondre aux requêtes par intervalle en O(log n).
+    """
+    credits = []
+    for wallet_credit in wallet_credits or []:
+        try:
+            credit_slot = wallet_credit.get("slot", None) or {}
+            credit_period = credit_slot.get("period", wallet_credit.get("period", None))
+            if credit_period is None:
+                raise Exception("slot period missing")
+            credits.append({
+                "period": int(credit_period),
+                "thread": int(credit_slot.get("thread", 0)),
+                "amount": float(wallet_credit.get("amount", 0) or 0)
+            })
+        except Exception as E:
+            logger.warning(f"[CREDITS] Cannot index deferred credit '{wallet_credit}' ({str(E)})")
+
+    credits.sort(key=lambda c: (c['period'], c['thread']))
+    # Conversion slot -> timestamp en une passe sur toute la liste (remotes/chainclock.py)
+    for credit, credit_unix in zip(credits, get_slots_timestamps(slots=credits)):
+        credit['unix'] = credit_unix
+    return {
+        "credits": credits,
+        "unix": [c['unix'] for c in credits],
+        "cumulative": [0.0] + list(accumulate(c['amount'] for c in credits))
+    }
+
+def build_credits_index(deferred_credits: dict={}) -> dict:
+    wallets = {
+        wallet_address: build_credits_entries(wallet_credits=wallet_credits)
+        for wallet_address, wallet_credits in deferred_credits.items()
+    }
+    # Index global (tous wallets) pour les totaux
+    all_credits = sorted(
+        (c for w in wallets.values() for c in w['credits']),
+        key=lambda c: (c['period'], c['thread'])
+    )
+    return {
+        "chain_params": get_chain_params(),
+        "wallets": wallets,
+        "all": {
+            "credits": all_credits,
+            "unix": [c['unix'] for c in all_credits],
+            "cumulative": [0.0] + list(accumulate(c['amount'] for c in all_credits))
+        }
+    }
+
+def publish_credits_index(deferred_credits: dict={}) -> dict:
+    """Construit un nouvel index et le publie d'un coup (les lecteurs ne voient jamais d'état partiel)."""
+    previous_index = getattr(app_globals, "deferred_credits_index", None) or {"version": 0}
+    credits_index = build_credits_index(deferred_credits=deferred_credits)
+    credits_index['version'] = previous_index.get("version", 0) + 1
+    app_globals.deferred_credits_index = credits_index
+    logger.info(f"[CREDITS] Published deferred credits index v{credits_index['version']} ({len(credits_index['wallets'])} wallet(s), {len(credits_index['all']['credits'])} credit(s))")
+    return credits_index
+
+def refresh_credits_index_timing() -> bool:
+    """Republie l'index si les paramètres de la chaîne (genesis, t0...) ont changé depuis sa construction."""
+    credits_index = getattr(app_globals, "deferred_credits_index", None)
+    if credits_index is None or credits_index.get("chain_params", None) == get_chain_params():
+        return False
+    logger.info(f"[CREDITS] Network timing changed, rebuilding deferred credits index")
+    publish_credits_index(deferred_credits=app_globals.deferred_credits)
+    return True
+
+def get_credits_entries(wallet_address: str=None) -> dict:
+    credits_index = app_globals.deferred_credits_index
+    if wallet_address is None:
+        return credits_index['all']
+    return credits_index['wallets'].get(wallet_address, None)
+
+def get_wallet_credits(wallet_address: str="") -> list:
+    """Crédits du wallet triés par slot : [{period, thread, amount, unix}, ...]."""
+    credits_entries = get_credits_entries(wallet_address=wallet_address)
+    return credits_entries['credits'] if credits_entries else []
+
+def get_credits_between(wallet_address: str=None, start_unix: int=0, end_unix: int=None) -> tuple:
+    """
+    (nombre, montant) des crédits libérés dans [start_unix, end_unix[.
+    wallet_address=None : tous les wallets.
+    """
+    credits_entries = get_credits_entries(wallet_address=wallet_address)
+    if not credits_entries:
+        return 0, 0.0
+    first = bisect_left(credits_entries['unix'], start_unix)
+    last = len(credits_entries['unix']) if end_unix is None else bisect_left(credits_entries['unix'], end_unix)
+    if last <= first:
+        return 0, 0.0
+    return last - first, credits_entries['cumulative'][last] - credits_entries['cumulative'][first]
+
+def get_credits_next_days(wallet_address: str=None, now_unix: int=0, days: int=30) -> tuple:
+    return get_credits_between(wallet_address=wallet_address, start_unix=now_unix, end_unix=now_unix + days * 86400)
+
+def get_credits_pending(wallet_address: str=None, now_unix: int=0) -> tuple:
+    return get_credits_between(wallet_address=wallet_address, start_unix=now_unix)
+
+def get_credits_released(wallet_address: str=None, now_unix: int=0) -> tuple:
+    credits_entries = get_credits_entries(wallet_address=wallet_address)
+    if not credits_entries:
+        return 0, 0.0
+    last = bisect_left(credits_entries['unix'], now_unix)
+    return last, credits_entries['cumulative'][last]
+
+if __name__ == "__main__":
+    pass
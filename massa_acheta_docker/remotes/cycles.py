@@ -0,0 +1,98 @@
+# massa_acheta_docker/remotes/cycles.py
+from loguru import logger
+
+import app_globals
+from remotes_utils import t_now, set_results_fields, save_app_results_async
+from remotes.addresses import refresh_address_snapshot, get_snapshot_wallet
+from remotes.chainclock import get_cycle_at, get_cycle_end
+from watchers.missed_blocks import watch_missed_blocks_tick
+from remotes.persistence import mark_dirty
+from remotes.store import SERIES_WALLET_STAT
+from remotes.timeseries import append_stat_sample
+
+def record_cycle_stats(snapshot: dict={}, closed_cycle: int=0, time_now: int=0) -> int:
+    """
+    Ajoute au 'stat' de chaque wallet une mesure par cycle clôturé pas encore relevé (agrégats compris) :
+    le wallet garde son dernier cycle traité ('last_cycle'), les cycles manqués (node en retard,
+    cycle pas encore final) sont rattrapés au passage suivant.
+    Sans await : à appeler sous results_lock. Retourne le nombre de mesures ajoutées.
+    """
+    nb_measures = 0
+    for node_name, node_data in app_globals.app_results.items():
+        for wallet_address, wallet_data in node_data.get("wallets", {}).items():
+            wallet_stat = wallet_data['stat']
+            last_cycle = int(wallet_data.get("last_cycle", 0) or 0)
+            if wallet_stat:
+                last_cycle = max(last_cycle, int(wallet_stat[-1].get("cycle", -1)))
+            if last_cycle >= closed_cycle:
+                continue
+
+            address_info = get_snapshot_wallet(snapshot, node_name, wallet_address)
+            if not address_info:
+                continue
+            pending_cycle_infos = sorted(
+                (
+                    ci for ci in address_info.get("cycle_infos", []) or []
+                    if ci.get("cycle", None) is not None
+                    and last_cycle < ci['cycle'] <= closed_cycle
+                    and ci.get("is_final", True)
+                ),
+                key=lambda ci: ci['cycle']
+            )
+            if not pending_cycle_infos:
+                logger.warning(f"[CYCLES] No final info for cycle(s) {last_cycle + 1}-{closed_cycle} for wallet '{wallet_address}'@'{node_name}', retry at next cycle close")
+                continue
+
+            for cycle_info in pending_cycle_infos:
+                append_stat_sample(stat=wallet_stat, series=SERIES_WALLET_STAT, node_name=node_name, wallet_address=wallet_address, entry={
+                    "time": time_now if cycle_info['cycle'] == closed_cycle else int(get_cycle_end(cycle=cycle_info['cycle'])),
+                    "cycle": cycle_info['cycle'],
+                    "balance": wallet_data.get("final_balance", 0),
+                    "rolls": cycle_info.get("active_rolls", 0),
+                    "total_rolls": app_globals.massa_network['values']['total_staked_rolls'],
+                    "ok_blocks": cycle_info.get("ok_count", 0),
+                    "nok_blocks": cycle_info.get("nok_count", 0),
+                    "produced_blocks": wallet_data.get("produced_blocks", 0)
+                })
+                nb_measures += 1
+            if pending_cycle_infos[-1]['cycle'] != closed_cycle or len(pending_cycle_infos) > 1:
+                logger.info(f"[CYCLES] Caught up cycle(s) {[ci['cycle'] for ci in pending_cycle_infos]} for wallet '{wallet_address}'@'{node_name}'")
+
+            set_results_fields(
+                target=wallet_data,
+                fields={
+                    "last_cycle": pending_cycle_infos[-1]['cycle'],
+                    "last_ok_count": pending_cycle_infos[-1].get("ok_count", 0),
+                    "last_nok_count": pending_cycle_infos[-1].get("nok_count", 0)
+                },
+                node_name=node_name,
+                wallet_address=wallet_address
+            )
+    return nb_measures
+
+async def cycle_close_tick() -> None:
+    """
+    Fin de cycle + délai (planifié sur l'horloge de la chaîne) : les résultats du cycle sont
+    définitifs, on les relève une fois (stat des wallets, historique des blocks manqués,
+    signalés en direct à chaque snapshot par watchers/missed_blocks.py).
+    """
+    logger.debug(f"[CYCLES] -> cycle_close_tick")
+
+    time_now = await t_now()
+    closed_cycle = get_cycle_at(unix_time=time_now) - 1
+    snapshot = await refresh_address_snapshot()
+    if not snapshot:
+        snapshot = app_globals.address_snapshot
+
+    async with app_globals.results_lock:
+        nb_measures = record_cycle_stats(snapshot=snapshot, closed_cycle=closed_cycle, time_now=time_now)
+    logger.info(f"[CYCLES] Cycle {closed_cycle} closed: {nb_measures} wallet measure(s) recorded")
+    if nb_measures:
+        mark_dirty(name="app_stat")
+        # Dernier cycle traité par wallet (reprise après redémarrage)
+        await save_app_results_async()
+
+    await watch_missed_blocks_tick(closed_cycle=closed_cycle)
+
+if __name__ == "__main__":
+    pass
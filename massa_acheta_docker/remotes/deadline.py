@@ -0,0 +1,97 @@
+# massa_acheta_docker/remotes/deadline.py
+from loguru import logger
+from contextlib import contextmanager
+from contextvars import ContextVar
+from collections import deque
+from time import monotonic
+
+# Budget de temps du tick courant, propagé à toutes les coroutines/tâches lancées dans le tick
+_current_tick = ContextVar("current_tick", default=None)
+
+# Statistiques par boucle : durées, dépassements, appels RPC rendus "late"
+_tick_stats = {}
+
+def get_tick_stats() -> dict:
+    return {
+        tick_name: {k: v for k, v in stats.items() if k != "durations"}
+        for tick_name, stats in _tick_stats.items()
+    }
+
+def get_remaining_budget() -> float:
+    """Secondes restantes dans le tick courant (None hors tick)."""
+    tick = _current_tick.get()
+    if tick is None:
+        return None
+    return tick['deadline'] - monotonic()
+
+def get_call_timeout(timeout: float=None) -> float:
+    """Timeout d'un appel : le plus petit entre le timeout demandé et le budget restant."""
+    remaining = get_remaining_budget()
+    if remaining is None:
+        return timeout
+    if timeout is None:
+        return max(0.0, remaining)
+    return max(0.0, min(timeout, remaining))
+
+def get_late_result(what: str="") -> dict:
+    """Résultat d'un appel abandonné faute de budget (même forme que pull_http_api)."""
+    tick = _current_tick.get()
+    if tick is not None:
+        tick['late'] += 1
+        tick_name = tick['name']
+    else:
+        tick_name = "-"
+    return {"error": f"Late: tick '{tick_name}' deadline reached before {what} completed", "late": True}
+
+def is_late(api_result: object=None) -> bool:
+    return isinstance(api_result, dict) and api_result.get("late", False) == True
+
+@contextmanager
+def tick_budget(tick_name: str="", budget_sec: float=0):
+    """
+    Ouvre un tick de budget_sec secondes.
+    Chaque appel RPC du tick hérite du temps restant ; la durée et les dépassements sont mesurés.
+    """
+    tick = {
+        "name": tick_name,
+        "deadline": monotonic() + budget_sec,
+        "late": 0
+    }
+    token = _current_tick.set(tick)
+    start_time = monotonic()
+    try:
+        yield tick
+
+    finally:
+        _current_tick.reset(token)
+        duration = monotonic() - start_time
+        stats = _tick_stats.get(tick_name, None)
+        if stats is None:
+            stats = {
+                "ticks": 0,
+                "overruns": 0,
+                "late_calls": 0,
+                "budget_sec": budget_sec,
+                "last_duration_sec": 0.0,
+                "max_duration_sec": 0.0,
+                "max_overrun_sec": 0.0,
+                "durations": deque(maxlen=100)
+            }
+            _tick_stats[tick_name] = stats
+        stats['ticks'] += 1
+        stats['late_calls'] += tick['late']
+        stats['budget_sec'] = budget_sec
+        stats['last_duration_sec'] = duration
+        stats['max_duration_sec'] = max(stats['max_duration_sec'], duration)
+        stats['durations'].append(duration)
+
+        overrun = duration - budget_sec
+        if overrun > 0:
+            stats['overruns'] += 1
+            stats['max_overrun_sec'] = max(stats['max_overrun_sec'], overrun)
+            logger.warning(f"[DEADLINE] Tick '{tick_name}' overran its {budget_sec:.0f}s budget by {overrun:.1f}s ({tick['late']} late call(s))")
+        elif tick['late']:
+            logger.warning(f"[DEADLINE] Tick '{tick_name}' finished in {duration:.1f}s with {tick['late']} late call(s)")
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,149 @@
+# massa_acheta_docker/remotes/draws.py
+from loguru import logger
+import json
+
+from app_config import app_config
+import app_globals
+from alert_manager import send_alert
+from remotes_utils import pull_node_api, t_now
+from remotes.chainclock import get_slot_timestamp, get_slots_timestamps
+
+def get_wallet_draw_times(address_info: dict={}) -> list:
+    """Horodatages triés des prochains slots de production du wallet (next_block_draws)."""
+    draw_slots = (address_info or {}).get("next_block_draws", []) or []
+    try:
+        return sorted(get_slots_timestamps(slots=draw_slots))
+    except Exception as E:
+        logger.warning(f"[DRAWS] Cannot convert draw slots '{draw_slots}' ({str(E)})")
+        return []
+
+def get_node_draw_times(snapshot: dict={}, node_name: str="") -> list:
+    node_wallets = snapshot.get("nodes", {}).get(node_name, {}).get("wallets", {})
+    return sorted(t for address_info in node_wallets.values() for t in get_wallet_draw_times(address_info=address_info))
+
+def get_node_next_poll(snapshot: dict={}, node_name: str="", time_now: float=0) -> float:
+    """
+    Prochain instant de rafraîchissement du node : juste avant et juste après chacun des slots
+    tirés pour ses wallets, sinon cadence lente entre deux tirages.
+    """
+    next_poll = time_now + app_config['service']['address_snapshot_idle_period_sec']
+    for draw_time in get_node_draw_times(snapshot=snapshot, node_name=node_name):
+        poll_times = [draw_time - app_config['service']['draws_poll_before_sec']] + [
+            draw_time + poll_after for poll_after in app_config['service']['draws_poll_after_sec']
+        ]
+        upcoming = [poll_time for poll_time in poll_times if poll_time > time_now]
+        if upcoming:
+            next_poll = min(next_poll, upcoming[0])
+        if draw_time - app_config['service']['draws_poll_before_sec'] > next_poll:
+            break
+    return next_poll
+
+def get_wallet_draws_timeline(snapshot: dict={}, node_name: str="", wallet_address: str="", time_now: float=0) -> list:
+    """Prochains tirages du wallet : [{"period", "thread", "time"}, ...] triés, à venir uniquement."""
+    address_info = snapshot.get("nodes", {}).get(node_name, {}).get("wallets", {}).get(wallet_address, None) or {}
+    draw_slots = address_info.get("next_block_draws", []) or []
+    try:
+        draw_times = get_slots_timestamps(slots=draw_slots)
+    except Exception:
+        return []
+    timeline = [
+        {
+            "period": int(draw_slot['period']),
+            "thread": int(draw_slot.get("thread", 0)),
+            "time": draw_time
+        }
+        for draw_slot, draw_time in zip(draw_slots, draw_times)
+        if draw_time >= time_now
+    ]
+    return sorted(timeline, key=lambda d: d['time'])
+
+async def check_node_readiness(node_name: str="") -> list:
+    """Problèmes qui empêcheraient le node de produire un block maintenant (liste vide = prêt)."""
+    node_problems = []
+    node_answer = await pull_node_api(
+        node_name=node_name,
+        read_only=False,
+        api_method="POST",
+        api_payload=json.dumps({"id": 0, "jsonrpc": "2.0", "method": "get_status", "params": []}),
+        api_root_element="result"
+    )
+    node_result = node_answer.get("result", None) if node_answer else None
+    if not node_result:
+        return [f"☠ Node is offline ({node_answer.get('error', 'no answer') if node_answer else 'no answer'})"]
+
+    node_cycle = node_result.get("current_cycle", None)
+    network_cycle = app_globals.massa_network['values'].get("current_cycle", None)
+    try:
+        if int(node_cycle) < int(network_cycle):
+            node_problems.append(f"🌀 Node is behind: cycle {node_cycle} < network {network_cycle}")
+    except Exception:
+        pass
+
+    network_stats = node_result.get("network_stats", {})
+    try:
+        active_peers = int(network_stats.get("in_connection_count", 0)) + int(network_stats.get("out_connection_count", 0))
+        if active_peers < app_config['alerts']['min_peers']:
+            node_problems.append(f"🌐 Low peers: {active_peers} active connection(s) (min {app_config['alerts']['min_peers']})")
+    except Exception:
+        pass
+
+    return node_problems
+
+# Tirages déjà signalés : (wallet, period, thread)
+_alerted_draws = set()
+
+async def draws_readiness_tick() -> None:
+    """
+    Avant chaque slot tiré pour un wallet, vérifie que le node qui l'héberge est prêt
+    (en ligne, à jour sur le cycle, assez de peers) et prévient sinon, pour éviter le block manqué.
+    """
+    global _alerted_draws
+    logger.debug(f"[DRAWS] -> draws_readiness_tick")
+
+    time_now = await t_now()
+    window_end = time_now + app_config['service']['draws_readiness_window_sec']
+    snapshot = app_globals.address_snapshot
+
+    upcoming = {}
+    for node_name, node_data in list(app_globals.app_results.items()):
+        for wallet_address in node_data.get("wallets", {}):
+            for draw in get_wallet_draws_timeline(snapshot=snapshot, node_name=node_name, wallet_address=wallet_address, time_now=time_now):
+                if draw['time'] > window_end:
+                    break
+                if (wallet_address, draw['period'], draw['thread']) not in _alerted_draws:
+                    upcoming.setdefault(node_name, []).append((wallet_address, draw))
+
+    for node_name, node_draws in upcoming.items():
+        node_problems = await check_node_readiness(node_name=node_name)
+        if not node_problems:
+            continue
+        for wallet_address, draw in node_draws:
+            _alerted_draws.add((wallet_address, draw['period'], draw['thread']))
+            message_lines = [
+                f"🏠 Node: \"{node_name}\"",
+                f"👛 Wallet: <code>{wallet_address}</code>",
+                f"🎯 <b>Block slot in {int(draw['time'] - time_now)}s</b> (period {draw['period']}, thread {draw['thread']})",
+                "",
+                *node_problems,
+                "",
+                "⚠️ Fix the node now to avoid a missed block!"
+            ]
+            logger.warning(f"[DRAWS] Node '{node_name}' not ready for slot {draw['period']}/{draw['thread']} of '{wallet_address}': {node_problems}")
+            await send_alert(
+                alert_type="draw_node_not_ready",
+                node=node_name,
+                wallet=wallet_address,
+                level="critical",
+                html="\n".join(message_lines),
+                extra=f"{draw['period']}:{draw['thread']}",
+                disable_web_page_preview=True
+            )
+
+    # Oubli des tirages passés
+    _alerted_draws = {
+        (wallet_address, period, thread) for wallet_address, period, thread in _alerted_draws
+        if get_slot_timestamp(slot={"period": period, "thread": thread}) >= time_now
+    }
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,107 @@
+# massa_acheta_docker/remotes/endpoints.py
+from loguru import logger
+from collections import deque
+
+from app_config import app_config
+import app_globals
+from remotes.breaker import is_node_circuit_open
+
+# Santé et latence par URL d'endpoint RPC, alimentées par chaque appel réseau réel
+_endpoint_health = {}
+endpoint_stats = {
+    "hedged": 0,
+    "hedge_wins": 0,
+    "failovers": 0
+}
+
+EWMA_ALPHA = 0.2
+
+def get_endpoint_health(api_url: str="") -> dict:
+    health = _endpoint_health.get(api_url, None)
+    if health is None:
+        health = {
+            "latency_ewma": None,
+            "latencies": deque(maxlen=app_config['service']['node_endpoint_latency_samples']),
+            "consecutive_failures": 0,
+            "requests": 0,
+            "errors": 0
+        }
+        _endpoint_health[api_url] = health
+    return health
+
+def get_endpoints_stats() -> dict:
+    return {
+        api_url: {
+            "latency_ewma": health['latency_ewma'],
+            "p95": get_endpoint_p95(api_url=api_url),
+            "healthy": is_endpoint_healthy(api_url=api_url),
+            "requests": health['requests'],
+            "errors": health['errors']
+        }
+        for api_url, health in _endpoint_health.items()
+    }
+
+def record_endpoint_result(api_url: str="", latency: float=0.0, success: bool=False) -> None:
+    health = get_endpoint_health(api_url=api_url)
+    health['requests'] += 1
+    if success:
+        health['consecutive_failures'] = 0
+        health['latencies'].append(latency)
+        if health['latency_ewma'] is None:
+            health['latency_ewma'] = latency
+        else:
+            health['latency_ewma'] = (1 - EWMA_ALPHA) * health['latency_ewma'] + EWMA_ALPHA * latency
+    else:
+        health['errors'] += 1
+        health['consecutive_failures'] += 1
+
+def get_endpoint_p95(api_url: str="") -> float:
+    """p95 des latences récentes (None tant qu'il n'y a pas assez d'échantillons)."""
+    health = _endpoint_health.get(api_url, None)
+    if health is None or len(health['latencies']) < app_config['service']['node_hedge_min_samples']:
+        return None
+    latencies = sorted(health['latencies'])
+    return latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))]
+
+def is_endpoint_healthy(api_url: str="") -> bool:
+    health = _endpoint_health.get(api_url, None)
+    if is_node_circuit_open(node_url=api_url):
+        return False
+    return health is None or health['consecutive_failures'] == 0
+
+def get_node_urls(node_name: str="") -> list:
+    """Toutes les URLs RPC déclarées pour un node : 'url' puis 'urls' (sans doublon)."""
+    node_data = app_globals.app_results.get(node_name, {})
+    node_urls = []
+    for node_url in [node_data.get("url", None)] + list(node_data.get("urls", [])):
+        if node_url and node_url not in node_urls:
+            node_urls.append(node_url)
+    return node_urls
+
+def select_node_endpoints(node_name: str="", read_only: bool=False) -> list:
+    """
+    Endpoints du node par ordre de préférence : sains du plus rapide au plus lent, puis les autres.
+    read_only: ajoute mainnet_rpc_url en dernier recours (données publiques des wallets uniquement).
+    """
+    own_urls = get_node_urls(node_name=node_name)
+    node_urls = list(own_urls)
+    if read_only and app_config['service']['node_mainnet_fallback']:
+        mainnet_url = app_config['service']['mainnet_rpc_url']
+        if mainnet_url not in node_urls:
+            node_urls.append(mainnet_url)
+
+    def endpoint_rank(api_url: str) -> tuple:
+        health = _endpoint_health.get(api_url, None)
+        latency = health['latency_ewma'] if health and health['latency_ewma'] is not None else 0.0
+        # Le fallback mainnet ne passe devant que si les endpoints du node sont tous en panne
+        return (not is_endpoint_healthy(api_url=api_url), api_url not in own_urls, latency)
+
+    return sorted(node_urls, key=endpoint_rank)
+
+def is_node_reachable(node_name: str="") -> bool:
+    """False si tous les endpoints du node ont leur disjoncteur ouvert."""
+    node_urls = get_node_urls(node_name=node_name)
+    return any(not is_node_circuit_open(node_url=node_url) for node_url in node_urls)
+
+if __name__ == "__main__":
+    pass
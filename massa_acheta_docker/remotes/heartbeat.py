@@ -6,7 +6,15 @@ from app_config import app_config
 import app_globals
 
 from alert_manager import send_alert
-from remotes_utils import get_last_seen, get_short_address, get_rewards_mas_day, get_duration
+from remotes_utils import get_last_seen, get_short_address, get_rewards_mas_day, get_duration, get_http_stats
+from remotes.deadline import get_tick_stats
+from remotes.scheduler import get_scheduler_stats
+from remotes.supervisor import get_supervisor_stats
+from remotes.persistence import get_persistence_stats, format_flush_size
+from remotes.monitor import monitor_stats
+from remotes.endpoints import endpoint_stats
+from remotes import stakers
+from remotes.stakers import get_wallet_staking_position, get_top_share, get_stakers_gini
 
 def html_link(text, url):
     return f'<a href="{url}">{text}</a>'
@@ -23,141 +31,191 @@ def format_wallet_line_unknown(wallet_address, explorer_url):
         f"( ? MAS | ? OK | cycle ? )"
     )
 
-async def heartbeat() -> None:
-    logger.debug(f"[HEARTBEAT] -> heartbeat")
+def log_service_metrics() -> None:
+    """Métriques internes (RPC, jobs, tâches, persistence) : dans le log, pas dans le heartbeat Telegram."""
+    service_list = []
+    http_stats = get_http_stats()
+    service_list.append(
+        f"🔁 RPC calls: {http_stats['calls']:,} requested / {http_stats['network_calls']:,} sent"
+        f" ({http_stats['deduplicated']:,} deduplicated, {http_stats['cache_hits']:,} from cache,"
+        f" {http_stats['fast_failed']:,} fast-failed, {http_stats['late']:,} late)"
+    )
+    if endpoint_stats['hedged'] or endpoint_stats['failovers']:
+        service_list.append(
+            f"🔀 Endpoints: {endpoint_stats['hedged']:,} hedged ({endpoint_stats['hedge_wins']:,} won),"
+            f" {endpoint_stats['failovers']:,} failover(s)"
+        )
+    tick_stats = get_tick_stats()
+    for job_name, job_stats in get_scheduler_stats().items():
+        job_line = (
+            f"⏱ Job {job_name}: {job_stats['runs']} run(s), avg {job_stats['avg_run_sec']:.1f}s (max {job_stats['max_run_sec']:.1f}s),"
+            f" lag max {job_stats['max_lag_sec']:.1f}s, {job_stats['skipped']} skipped, {job_stats['failures']} failed"
+        )
+        if job_name in tick_stats:
+            job_line += f", {tick_stats[job_name]['overruns']} overrun(s), {tick_stats[job_name]['late_calls']} late call(s)"
+        service_list.append(job_line)
+    restarted_tasks = [
+        f"{task_name} {task_stats['restarts']}" + (" (crash-looping)" if task_stats['crash_looping'] else "")
+        for task_name, task_stats in get_supervisor_stats().items()
+        if task_stats['restarts']
+    ]
+    if restarted_tasks:
+        service_list.append(f"♻️ Task restarts: {', '.join(restarted_tasks)}")
+    flushed_subsystems = [
+        f"{name} {subsystem['flushes']}x (last {format_flush_size(subsystem['last_size'])}, max {subsystem['max_flush_sec']:.2f}s"
+        + (f", {subsystem['failures']} failed)" if subsystem['failures'] else ")")
+        for name, subsystem in get_persistence_stats().items()
+        if subsystem['flushes'] or subsystem['failures']
+    ]
+    if flushed_subsystems:
+        service_list.append(f"💾 Persistence: {', '.join(flushed_subsystems)}")
+
+    for service_line in service_list:
+        logger.info(f"[HEARTBEAT] {service_line}")
+
+async def heartbeat_tick() -> None:
+    """Envoie le message heartbeat (planifié toutes les heartbeat_period_hours par remotes/scheduler.py)."""
+    logger.debug(f"[HEARTBEAT] -> heartbeat_tick")
+    logger.info(f"[HEARTBEAT] Heartbeat planner schedule time")
+
+    computed_rewards = await get_rewards_mas_day(rolls_number=100)
+
+    heartbeat_list = []
+    heartbeat_list.append(
+        "📚 <b>MASSA network info:</b>"
+        f" 👥 Total stakers: <b>{app_globals.massa_network['values'].get('total_stakers', '?'):,}</b>"
+        f" 🗞 Total staked rolls: <b>{app_globals.massa_network['values'].get('total_staked_rolls', '?'):,}</b>"
+        f"🪙 Estimated rewards for 100 Rolls ≈ <b>{computed_rewards:,} MAS / Day</b>"
+        f"👁 Info updated: {await get_last_seen(last_time=app_globals.massa_network['values'].get('last_updated'))}"
+    )
+
+    # Résumé global
+    total_nodes = len(app_globals.app_results)
+    online_nodes = sum(1 for n in app_globals.app_results.values() if n.get('last_status') == True)
+    offline_nodes = total_nodes - online_nodes
+    heartbeat_list.append(
+        f"🖥️ <b>Node summary:</b> {online_nodes} online / {offline_nodes} offline (total {total_nodes})"
+    )
 
-    try:
-        while True:
-            logger.info(f"[HEARTBEAT] Sleeping for {app_config['service']['heartbeat_period_hours'] * 60 * 60} seconds...")
-            await asyncio.sleep(app_config['service']['heartbeat_period_hours'] * 60 * 60)
-            logger.info(f"[HEARTBEAT] Heartbeat planner schedule time")
+    if stakers.stakers_index['rolls']:
+        heartbeat_list.append(
+            f"🏅 <b>Stakers:</b> top 10 hold {get_top_share(top_n=10):.1f}% of rolls,"
+            f" Gini {get_stakers_gini():.3f}"
+        )
+    log_service_metrics()
+
+    # Séparer nodes online/offline
+    nodes_online = [n for n in app_globals.app_results if app_globals.app_results[n].get('last_status') == True]
+    nodes_offline = [n for n in app_globals.app_results if app_globals.app_results[n].get('last_status') != True]
+
+    if total_nodes == 0:
+        heartbeat_list.append("⭕ Node list is empty")
+
+    # Section ONLINE
+    if nodes_online:
+        heartbeat_list.append("\n🟢 <b>Online nodes:</b>")
+        for node_name in nodes_online:
+            node = app_globals.app_results[node_name]
+            heartbeat_list.append(f"\n🏠 <b>Node:</b> \"{node_name}\"")
+            heartbeat_list.append(f"\n📍 {node.get('url', '?')}")
+            version = node.get('version', '?')
+            node_ip = node.get('node_ip', '?')
+            chain_id = node.get('last_chain_id', '?')
+            last_seen = await get_last_seen(node.get('last_update'))
+            node_uptime = await get_duration(
+                start_time=node.get('start_time', 0),
+                show_days=True
+            )
+            # Infos réseau/stat (issus du get_status)
+            network_stats = node.get('last_result', {}).get('network_stats', {})
+            in_con = network_stats.get('in_connection_count', '?')
+            out_con = network_stats.get('out_connection_count', '?')
+            peers = network_stats.get('known_peer_count', '?')
+            banned = network_stats.get('banned_peer_count', '?')
 
-            computed_rewards = await get_rewards_mas_day(rolls_number=100)
+            consensus = node.get('last_result', {}).get('consensus_stats', {})
+            final_blocks = consensus.get('final_block_count', '?')
+            stale_blocks = consensus.get('stale_block_count', '?')
 
-            heartbeat_list = []
             heartbeat_list.append(
-                "📚 <b>MASSA network info:</b>"
-                f" 👥 Total stakers: <b>{app_globals.massa_network['values'].get('total_stakers', '?'):,}</b>"
-                f" 🗞 Total staked rolls: <b>{app_globals.massa_network['values'].get('total_staked_rolls', '?'):,}</b>"
-                f"🪙 Estimated rewards for 100 Rolls ≈ <b>{computed_rewards:,} MAS / Day</b>"
-                f"👁 Info updated: {await get_last_seen(last_time=app_globals.massa_network['values'].get('last_updated'))}"
+                f"\n🌿 <b>Status:</b> Online (uptime {node_uptime}, last update {last_seen})"
             )
-
-            # Résumé global
-            total_nodes = len(app_globals.app_results)
-            online_nodes = sum(1 for n in app_globals.app_results.values() if n.get('last_status') == True)
-            offline_nodes = total_nodes - online_nodes
             heartbeat_list.append(
-                f"🖥️ <b>Node summary:</b> {online_nodes} online / {offline_nodes} offline (total {total_nodes})"
+                f"\n🔢 Version: <b>{version}</b> | Chain ID: <b>{chain_id}</b> | IP: <b>{node_ip}</b>"
             )
-
-            # Séparer nodes online/offline
-            nodes_online = [n for n in app_globals.app_results if app_globals.app_results[n].get('last_status') == True]
-            nodes_offline = [n for n in app_globals.app_results if app_globals.app_results[n].get('last_status') != True]
-
-            if total_nodes == 0:
-                heartbeat_list.append("⭕ Node list is empty")
-
-            # Section ONLINE
-            if nodes_online:
-                heartbeat_list.append("\n🟢 <b>Online nodes:</b>")
-                for node_name in nodes_online:
-                    node = app_globals.app_results[node_name]
-                    heartbeat_list.append(f"\n🏠 <b>Node:</b> \"{node_name}\"")
-                    heartbeat_list.append(f"\n📍 {node.get('url', '?')}")
-                    version = node.get('version', '?')
-                    node_ip = node.get('node_ip', '?')
-                    chain_id = node.get('last_chain_id', '?')
-                    last_seen = await get_last_seen(node.get('last_update'))
-                    node_uptime = await get_duration(
-                        start_time=node.get('start_time', 0),
-                        show_days=True
-                    )
-                    # Infos réseau/stat (issus du get_status)
-                    network_stats = node.get('last_result', {}).get('network_stats', {})
-                    in_con = network_stats.get('in_connection_count', '?')
-                    out_con = network_stats.get('out_connection_count', '?')
-                    peers = network_stats.get('known_peer_count', '?')
-                    banned = network_stats.get('banned_peer_count', '?')
-
-                    consensus = node.get('last_result', {}).get('consensus_stats', {})
-                    final_blocks = consensus.get('final_block_count', '?')
-                    stale_blocks = consensus.get('stale_block_count', '?')
-
-                    heartbeat_list.append(
-                        f"\n🌿 <b>Status:</b> Online (uptime {node_uptime}, last update {last_seen})"
-                    )
-                    heartbeat_list.append(
-                        f"\n🔢 Version: <b>{version}</b> | Chain ID: <b>{chain_id}</b> | IP: <b>{node_ip}</b>"
-                    )
-                    heartbeat_list.append(
-                        f"\n🌐 Network: {peers} peers, {in_con} in / {out_con} out, 🚫 {banned} banned"
-                    )
-                    heartbeat_list.append(
-                        f"\n⛓️ Consensus: {final_blocks} final / {stale_blocks} stale blocks"
-                    )
-
-                    num_wallets = len(node['wallets'])
-                    if num_wallets == 0:
-                        heartbeat_list.append("\n⭕ No wallets attached")
+            heartbeat_list.append(
+                f"\n🌐 Network: {peers} peers, {in_con} in / {out_con} out, 🚫 {banned} banned"
+            )
+            heartbeat_list.append(
+                f"\n⛓️ Consensus: {final_blocks} final / {stale_blocks} stale blocks"
+            )
+            node_pipeline = monitor_stats['nodes'].get(node_name, None)
+            if node_pipeline:
+                heartbeat_list.append(
+                    f"\n⏱ Last check: node + {node_pipeline['wallets']} wallet(s) in {node_pipeline['duration_sec']:.1f}s"
+                )
+
+            num_wallets = len(node['wallets'])
+            if num_wallets == 0:
+                heartbeat_list.append("\n⭕ No wallets attached")
+            else:
+                heartbeat_list.append(f"\n👛 {num_wallets} wallet(s) attached:")
+                wallet_lines = []
+                for wallet_address in node['wallets']:
+                    w = node['wallets'][wallet_address]
+                    explorer_url = f"{app_config['service']['mainnet_explorer_url']}/address/{wallet_address}"
+                    short_addr = await get_short_address(address=wallet_address)
+                    if w.get('last_status') == True:
+                        balance = w.get('final_balance', '?')
+                        produced_blocks = w.get('produced_blocks', '?')
+                        last_cycle = w.get('last_cycle', '?')
+                        wallet_lines.append(
+                            format_wallet_line(short_addr, balance, produced_blocks, last_cycle, explorer_url)
+                        )
+                        staking_position = get_wallet_staking_position(wallet_address=wallet_address)
+                        if staking_position:
+                            wallet_lines.append(
+                                f"   🏅 Rank {staking_position['rank']:,} / {staking_position['stakers']:,}"
+                                f" (top {100 - staking_position['percentile']:.1f}%)"
+                            )
                     else:
-                        heartbeat_list.append(f"\n👛 {num_wallets} wallet(s) attached:")
-                        wallet_lines = []
-                        for wallet_address in node['wallets']:
-                            w = node['wallets'][wallet_address]
-                            explorer_url = f"{app_config['service']['mainnet_explorer_url']}/address/{wallet_address}"
-                            short_addr = await get_short_address(address=wallet_address)
-                            if w.get('last_status') == True:
-                                balance = w.get('final_balance', '?')
-                                produced_blocks = w.get('produced_blocks', '?')
-                                last_cycle = w.get('last_cycle', '?')
-                                wallet_lines.append(
-                                    format_wallet_line(short_addr, balance, produced_blocks, last_cycle, explorer_url)
-                                )
-                            else:
-                                wallet_lines.append(
-                                    format_wallet_line_unknown(short_addr, explorer_url)
-                                )
-                        heartbeat_list.append("\n".join(wallet_lines))
-                    heartbeat_list.append("\n")
-
-            # Section OFFLINE
-            if nodes_offline:
-                heartbeat_list.append("\n🔴 <b>Offline nodes:</b>")
-                for node_name in nodes_offline:
-                    node = app_globals.app_results[node_name]
-                    heartbeat_list.append(f"\n🏠 <b>Node:</b> \"{node_name}\"")
-                    heartbeat_list.append(f"\n📍 {node.get('url', '?')}")
-                    last_seen = await get_last_seen(node.get('last_update'))
-                    heartbeat_list.append(f"\n☠️ <b>Status:</b> Offline (last seen {last_seen})")
-                    version = node.get('version', '?')
-                    node_ip = node.get('node_ip', '?')
-                    chain_id = node.get('last_chain_id', '?')
-                    heartbeat_list.append(
-                        f"\n🔢 Version: <b>{version}</b> | Chain ID: <b>{chain_id}</b> | IP: <b>{node_ip}</b>"
-                    )
-                    heartbeat_list.append("\n⭕ No wallets info available")
-
-            # Compose le message complet
-            message_html = (
-                "💓 <b>Heartbeat message:</b>\n\n"
-                + "\n".join(heartbeat_list)
-                + f"\n⏳ Heartbeat schedule: every <b>{app_config['service']['heartbeat_period_hours']}</b> hour(s)"
+                        wallet_lines.append(
+                            format_wallet_line_unknown(short_addr, explorer_url)
+                        )
+                heartbeat_list.append("\n".join(wallet_lines))
+            heartbeat_list.append("\n")
+
+    # Section OFFLINE
+    if nodes_offline:
+        heartbeat_list.append("\n🔴 <b>Offline nodes:</b>")
+        for node_name in nodes_offline:
+            node = app_globals.app_results[node_name]
+            heartbeat_list.append(f"\n🏠 <b>Node:</b> \"{node_name}\"")
+            heartbeat_list.append(f"\n📍 {node.get('url', '?')}")
+            last_seen = await get_last_seen(node.get('last_update'))
+            heartbeat_list.append(f"\n☠️ <b>Status:</b> Offline (last seen {last_seen})")
+            version = node.get('version', '?')
+            node_ip = node.get('node_ip', '?')
+            chain_id = node.get('last_chain_id', '?')
+            heartbeat_list.append(
+                f"\n🔢 Version: <b>{version}</b> | Chain ID: <b>{chain_id}</b> | IP: <b>{node_ip}</b>"
             )
+            heartbeat_list.append("\n⭕ No wallets info available")
 
-            await send_alert(
-                alert_type="heartbeat",
-                level="info",
-                html=message_html,
-                disable_web_page_preview=True
-            )
+    # Compose le message complet
+    message_html = (
+        "💓 <b>Heartbeat message:</b>\n\n"
+        + "\n".join(heartbeat_list)
+        + f"\n⏳ Heartbeat schedule: every <b>{app_config['service']['heartbeat_period_hours']}</b> hour(s)"
+    )
 
-    except BaseException as E:
-        logger.error(f"[HEARTBEAT] Exception {str(E)} ({E})")
-    finally:
-        logger.error(f"[HEARTBEAT] <- Quit heartbeat")
+    await send_alert(
+        alert_type="heartbeat",
+        level="info",
+        html=message_html,
+        disable_web_page_preview=True
+    )
 
-    return
 
 if __name__ == "__main__":
     pass
@@ -0,0 +1,137 @@
+# massa_acheta_docker/remotes/limiter.py
+from loguru import logger
+import asyncio
+from contextlib import asynccontextmanager
+from time import monotonic
+
+from app_config import app_config
+
+# Un limiteur par endpoint RPC (scheme://host:port) : concurrence max + token bucket,
+# limites réduites automatiquement quand la latence ou le taux d'erreur montent.
+_node_limiters = {}
+
+EWMA_ALPHA = 0.2
+
+def validate_limiter_config() -> None:
+    """Contrôle des limites configurées au démarrage (ValueError si inutilisables)."""
+    max_concurrent = app_config['service']['node_max_concurrent_requests']
+    min_rps = app_config['service']['node_min_requests_per_sec']
+    max_rps = app_config['service']['node_max_requests_per_sec']
+    if not isinstance(max_concurrent, int) or max_concurrent < 1:
+        raise ValueError(f"node_max_concurrent_requests must be an integer >= 1 (got {max_concurrent!r})")
+    if not isinstance(min_rps, (int, float)) or min_rps <= 0:
+        raise ValueError(f"node_min_requests_per_sec must be > 0 (got {min_rps!r})")
+    if not isinstance(max_rps, (int, float)) or max_rps < min_rps:
+        raise ValueError(f"node_max_requests_per_sec must be >= node_min_requests_per_sec (got {max_rps!r})")
+
+def get_node_limiter(endpoint_key: str="") -> dict:
+    limiter = _node_limiters.get(endpoint_key, None)
+    if limiter is None:
+        limiter = {
+            "max_concurrent": app_config['service']['node_max_concurrent_requests'],
+            "max_rps": float(app_config['service']['node_max_requests_per_sec']),
+            "in_flight": 0,
+            "tokens": max(1.0, float(app_config['service']['node_max_requests_per_sec'])),
+            "last_refill": monotonic(),
+            "latency_ewma": 0.0,
+            "error_ewma": 0.0,
+            "last_adjust": monotonic(),
+            "requests": 0,
+            "errors": 0,
+            "throttled": 0,
+            "condition": asyncio.Condition()
+        }
+        _node_limiters[endpoint_key] = limiter
+    return limiter
+
+def get_limiter_stats() -> dict:
+    return {
+        endpoint_key: {
+            k: v for k, v in limiter.items() if k != "condition"
+        }
+        for endpoint_key, limiter in _node_limiters.items()
+    }
+
+async def take_token(limiter: dict={}) -> None:
+    while True:
+        time_now = monotonic()
+        # Capacité d'au moins un jeton : sous 1 req/s le bucket doit pouvoir atteindre 1
+        limiter['tokens'] = min(
+            max(1.0, limiter['max_rps']),
+            limiter['tokens'] + (time_now - limiter['last_refill']) * limiter['max_rps']
+        )
+        limiter['last_refill'] = time_now
+        if limiter['tokens'] >= 1:
+            limiter['tokens'] -= 1
+            return
+        limiter['throttled'] += 1
+        await asyncio.sleep((1 - limiter['tokens']) / limiter['max_rps'])
+
+def adjust_node_limits(endpoint_key: str="", limiter: dict={}) -> bool:
+    time_now = monotonic()
+    if time_now - limiter['last_adjust'] < app_config['service']['node_limits_adjust_interval_sec']:
+        return False
+    limiter['last_adjust'] = time_now
+
+    cfg_concurrent = app_config['service']['node_max_concurrent_requests']
+    cfg_rps = float(app_config['service']['node_max_requests_per_sec'])
+    old_limits = (limiter['max_concurrent'], limiter['max_rps'])
+
+    if (
+        limiter['latency_ewma'] > app_config['service']['node_latency_target_sec'] or
+        limiter['error_ewma'] > app_config['service']['node_error_rate_threshold']
+    ):
+        # Décroissance multiplicative
+        limiter['max_concurrent'] = max(1, limiter['max_concurrent'] // 2)
+        limiter['max_rps'] = max(float(app_config['service']['node_min_requests_per_sec']), limiter['max_rps'] / 2)
+    else:
+        # Croissance additive jusqu'aux limites configurées
+        limiter['max_concurrent'] = min(cfg_concurrent, limiter['max_concurrent'] + 1)
+        limiter['max_rps'] = min(cfg_rps, limiter['max_rps'] + 1)
+
+    if old_limits != (limiter['max_concurrent'], limiter['max_rps']):
+        logger.info(
+            f"[LIMITER] Endpoint '{endpoint_key}' limits: {old_limits[0]} -> {limiter['max_concurrent']} concurrent, "
+            f"{old_limits[1]:.1f} -> {limiter['max_rps']:.1f} req/s "
+            f"(latency {limiter['latency_ewma']:.2f}s, error rate {limiter['error_ewma']:.2f})"
+        )
+        return True
+    return False
+
+@asynccontextmanager
+async def node_slot(endpoint_key: str=""):
+    """
+    Réserve un créneau de requête vers l'endpoint.
+    L'appelant renseigne slot['success'] pour alimenter l'ajustement adaptatif.
+    """
+    limiter = get_node_limiter(endpoint_key=endpoint_key)
+
+    # Jeton d'abord : l'attente du débit n'occupe pas un créneau de concurrence
+    await take_token(limiter=limiter)
+    async with limiter['condition']:
+        await limiter['condition'].wait_for(lambda: limiter['in_flight'] < limiter['max_concurrent'])
+        limiter['in_flight'] += 1
+
+    slot = {"success": False}
+    start_time = monotonic()
+    try:
+        yield slot
+
+    finally:
+        latency = monotonic() - start_time
+        limiter['requests'] += 1
+        if not slot['success']:
+            limiter['errors'] += 1
+        limiter['latency_ewma'] = (1 - EWMA_ALPHA) * limiter['latency_ewma'] + EWMA_ALPHA * latency
+        limiter['error_ewma'] = (1 - EWMA_ALPHA) * limiter['error_ewma'] + EWMA_ALPHA * (0.0 if slot['success'] else 1.0)
+        limits_changed = adjust_node_limits(endpoint_key=endpoint_key, limiter=limiter)
+
+        async with limiter['condition']:
+            limiter['in_flight'] -= 1
+            if limits_changed:
+                limiter['condition'].notify_all()
+            else:
+                limiter['condition'].notify(1)
+
+if __name__ == "__main__":
+    pass
@@ -2,10 +2,17 @@
 from loguru import logger
 import asyncio
 import json
+from time import monotonic
 
 from app_config import app_config
 import app_globals
-from remotes_utils import pull_http_api, t_now, save_app_stat
+from remotes_utils import pull_http_api, t_now
+from remotes.persistence import mark_dirty
+from remotes.store import SERIES_NETWORK_STAT
+from remotes.timeseries import append_stat_sample
+from remotes import stakers
+from remotes.stakers import apply_stakers_table
+from remotes.credits import refresh_credits_index_timing
 
 @logger.catch
 async def massa_get_info() -> bool:
@@ -83,7 +90,8 @@ async def massa_get_status() -> bool:
             ("roll_price", "roll_price", int),
             ("thread_count", "thread_count", int),
             ("t0", "t0", int),
-            ("periods_per_cycle", "periods_per_cycle", int)
+            ("periods_per_cycle", "periods_per_cycle", int),
+            ("genesis_timestamp", "genesis_timestamp", int)
         ]:
             value = config.get(api_field)
             if value is not None:
@@ -92,6 +100,8 @@ async def massa_get_status() -> bool:
                 except Exception:
                     app_globals.massa_network['values'][global_key] = value
 
+        # Dates des crédits recalculées si genesis / t0 du réseau diffèrent de ceux de l'index
+        refresh_credits_index_timing()
 
         # Statistiques (optionnelles, non utilisées ici mais accessibles)
         for k in ["consensus_stats", "network_stats", "execution_stats"]:
@@ -106,129 +116,163 @@ async def massa_get_status() -> bool:
     logger.debug(f"[MASSA] massa_get_status: {app_globals.massa_network['values']}")
     return True
 
+async def massa_get_stakers_page(offset: int=0, limit: int=100) -> list:
+    """Une page de get_stakers : liste de [address, rolls] (None si erreur)."""
+    payload = json.dumps({
+        "id": 0,
+        "jsonrpc": "2.0",
+        "method": "get_stakers",
+        "params": [{
+            "limit": limit,
+            "offset": offset
+        }]
+    })
+    massa_stakers_answer = await pull_http_api(
+        api_url=app_config['service']['mainnet_rpc_url'],
+        api_method="POST",
+        api_payload=payload,
+        api_root_element="result"
+    )
+    massa_stakers_result = massa_stakers_answer.get("result", None)
+    # Cas erreur : pas de result
+    if massa_stakers_result is None:
+        logger.warning(f"[MASSA] No result in MASSA mainnet RPC 'get_stakers' answer at offset {offset} ({massa_stakers_answer})")
+        return None
+    # Cas résultat = dict vide : fin de pagination
+    if isinstance(massa_stakers_result, dict):
+        return []
+    if not isinstance(massa_stakers_result, list):
+        logger.warning(f"[MASSA] Unknown format in MASSA mainnet RPC 'get_stakers' answer: {type(massa_stakers_result)}")
+        return None
+    return massa_stakers_result
+
+# Dernier scan complet de get_stakers : nombre de stakers annoncé par /info et heure du scan
+_stakers_scan = {"total_stakers": None, "time": 0.0}
+
 @logger.catch
 async def massa_get_stakers() -> bool:
+    """
+    Récupère toute la table des stakers par pages concurrentes (mainnet_stakers_concurrency pages
+    en vol, débit borné par le limiteur du node), puis met à jour le total de rolls par diff.
+    Pas de rescan tant que le nombre de stakers de /info ne change pas (mainnet_stakers_full_scan_period_min au plus).
+    """
     logger.debug(f"[MASSA] -> massa_get_stakers")
-    massa_total_rolls = 0
-    massa_stakers_offset = 0
-    massa_stakers_bundle_length = app_config['service']['mainnet_stakers_bundle']
-
-    while True:
-        logger.debug(f"[MASSA] massa_get_stakers loop offset {massa_stakers_offset}")
-        payload = json.dumps({
-            "id": 0,
-            "jsonrpc": "2.0",
-            "method": "get_stakers",
-            "params": [{
-                "limit": massa_stakers_bundle_length,
-                "offset": massa_stakers_offset
-            }]
-        })
-        try:
-            massa_stakers_answer = await pull_http_api(
-                api_url=app_config['service']['mainnet_rpc_url'],
-                api_method="POST",
-                api_payload=payload,
-                api_root_element="result"
-            )
-            massa_stakers_result = massa_stakers_answer.get("result", None)
-            # Cas erreur : pas de result
-            if massa_stakers_result is None:
-                logger.warning(f"[MASSA] No result in MASSA mainnet RPC 'get_stakers' answer ({massa_stakers_answer})")
-                break
-            # Cas résultat = dict vide : fin de pagination
-            if isinstance(massa_stakers_result, dict):
-                logger.info(f"[MASSA] End of stakers pagination (empty dict)")
-                break
-            # Cas résultat = liste vide
-            if isinstance(massa_stakers_result, list) and len(massa_stakers_result) == 0:
-                logger.info(f"[MASSA] No more stakers to fetch.")
-                break
-            # Cas résultat = liste
-            if isinstance(massa_stakers_result, list):
-                for staker in massa_stakers_result:
+    page_length = app_config['service']['mainnet_stakers_bundle']
+    page_semaphore = asyncio.Semaphore(app_config['service']['mainnet_stakers_concurrency'])
+
+    async def get_page(offset: int) -> list:
+        async with page_semaphore:
+            return await massa_get_stakers_page(offset=offset, limit=page_length)
+
+    # Nombre de stakers inchangé depuis le dernier scan : table gardée, pas de rescan de toutes les pages
+    total_stakers = app_globals.massa_network['values'].get("total_stakers", 0)
+    scan_age_sec = monotonic() - _stakers_scan['time']
+    if (
+        stakers.stakers_table and
+        total_stakers == _stakers_scan['total_stakers'] and
+        scan_age_sec < app_config['service']['mainnet_stakers_full_scan_period_min'] * 60
+    ):
+        logger.info(f"[MASSA] Stakers count unchanged ({total_stakers}), keeping stakers table from {scan_age_sec / 60:.0f} min ago")
+        return True
+
+    # Nombre de pages attendu d'après /info, puis on continue tant que les pages sont pleines
+    try:
+        wave_pages = int(total_stakers) // page_length + 1
+    except Exception:
+        wave_pages = app_config['service']['mainnet_stakers_concurrency']
+
+    new_table = {}
+    next_offset = 0
+    nb_pages = 0
+    try:
+        while True:
+            offsets = [next_offset + i * page_length for i in range(wave_pages)]
+            pages = await asyncio.gather(*[get_page(offset=offset) for offset in offsets])
+            nb_pages += len(pages)
+
+            for offset, page in zip(offsets, pages):
+                if page is None:
+                    logger.warning(f"[MASSA] Cannot get stakers page at offset {offset}, keeping previous table")
+                    return False
+                for staker in page:
                     if isinstance(staker, (list, tuple)) and len(staker) == 2:
                         try:
-                            massa_total_rolls += int(staker[1])
+                            # Dict : un staker décalé entre deux pages n'est pas compté deux fois
+                            new_table[staker[0]] = int(staker[1])
                         except Exception:
                             logger.warning(f"[MASSA] Invalid roll number for staker {staker}")
                     else:
                         logger.warning(f"[MASSA] Cannot take rolls number from staker '{staker}'")
-                # Pagination : avancer du nombre reçu
-                massa_stakers_offset += len(massa_stakers_result)
-            else:
-                logger.warning(f"[MASSA] Unknown format in MASSA mainnet RPC 'get_stakers' answer: {type(massa_stakers_result)}")
+
+            if any(len(page) < page_length for page in pages):
                 break
-        except BaseException as E:
-            logger.warning(f"[MASSA] Cannot operate MASSA mainnet RPC get_stakers: {E}")
-            return False
+            next_offset = offsets[-1] + page_length
+            wave_pages = app_config['service']['mainnet_stakers_concurrency']
 
-        await asyncio.sleep(1)
+    except BaseException as E:
+        logger.warning(f"[MASSA] Cannot operate MASSA mainnet RPC get_stakers: {E}")
+        return False
 
-    app_globals.massa_network['values']['total_staked_rolls'] = massa_total_rolls
-    logger.debug(f"[MASSA] massa_get_stakers: total_staked_rolls: {massa_total_rolls}")
+    apply_stakers_table(new_table=new_table)
+    app_globals.massa_network['values']['total_staked_rolls'] = stakers.stakers_total_rolls
+    _stakers_scan['total_stakers'] = total_stakers
+    _stakers_scan['time'] = monotonic()
+    logger.debug(f"[MASSA] massa_get_stakers: {len(new_table)} stakers in {nb_pages} page(s), total_staked_rolls: {stakers.stakers_total_rolls}")
     return True
 
+async def massa_tick() -> None:
+    """Un passage de collecte des infos réseau MASSA (planifié par remotes/scheduler.py)."""
+    logger.debug(f"[MASSA] -> massa_tick")
+    success_flag = True
+    if success_flag and await massa_get_info():
+        logger.info(f"[MASSA] Successfully pulled /info from MASSA mainnet RPC")
+        await asyncio.sleep(1)
+    else:
+        success_flag = False
+        logger.warning(f"[MASSA] Error pulling /info from MASSA mainnet RPC")
 
-@logger.catch
-async def massa() -> None:
-    logger.debug(f"[MASSA] -> massa")
-    try:
-        while True:
-            success_flag = True
-            if success_flag and await massa_get_info():
-                logger.info(f"[MASSA] Successfully pulled /info from MASSA mainnet RPC")
-                await asyncio.sleep(1)
-            else:
-                success_flag = False
-                logger.warning(f"[MASSA] Error pulling /info from MASSA mainnet RPC")
-
-            if success_flag and await massa_get_status():
-                logger.info(f"[MASSA] Successfully pulled get_status from MASSA mainnet RPC")
-                await asyncio.sleep(1)
-            else:
-                success_flag = False
-                logger.warning(f"[MASSA] Error pulling get_status from MASSA mainnet RPC")
+    if success_flag and await massa_get_status():
+        logger.info(f"[MASSA] Successfully pulled get_status from MASSA mainnet RPC")
+        await asyncio.sleep(1)
+    else:
+        success_flag = False
+        logger.warning(f"[MASSA] Error pulling get_status from MASSA mainnet RPC")
 
-            if success_flag and await massa_get_stakers():
-                logger.info(f"[MASSA] Successfully pulled get_stakers from MASSA mainnet RPC")
-                await asyncio.sleep(1)
-            else:
-                success_flag = False
-                logger.warning(f"[MASSA] Error pulling get_stakers from MASSA mainnet RPC")
+    if success_flag and await massa_get_stakers():
+        logger.info(f"[MASSA] Successfully pulled get_stakers from MASSA mainnet RPC")
+        await asyncio.sleep(1)
+    else:
+        success_flag = False
+        logger.warning(f"[MASSA] Error pulling get_stakers from MASSA mainnet RPC")
 
-            if success_flag:
-                logger.info(f"[MASSA] Successfully collected MASSA mainnet network info")
-                time_now = await t_now()
-                try:
-                    app_globals.massa_network['values']['last_updated'] = time_now
-                    app_globals.massa_network['stat'].append(
-                        {
-                            "time": time_now,
-                            "cycle": app_globals.massa_network['values'].get("current_cycle"),
-                            "stakers": app_globals.massa_network['values'].get("total_stakers"),
-                            "rolls": app_globals.massa_network['values'].get("total_staked_rolls"),
-                            "release": app_globals.massa_network['values'].get("current_release"),
-                            "block_reward": app_globals.massa_network['values'].get("block_reward"),
-                            "roll_price": app_globals.massa_network['values'].get("roll_price"),
-                            "node_id": app_globals.massa_network['values'].get("node_id"),
-                            "ip": app_globals.massa_network['values'].get("node_ip"),
-                        }
-                    )
-                except Exception as E:
-                    logger.warning(f"[MASSA] Cannot store MASSA stat ({E})")
-                else:
-                    logger.info(f"[MASSA] Successfully stored MASSA stat ({len(app_globals.massa_network['stat'])} measures)")
-            else:
-                logger.warning(f"[MASSA] Could not collect MASSA mainnet network info")
-            logger.info(f"[MASSA] Sleeping for {app_config['service']['massa_network_update_period_min'] * 60} seconds...")
-            await asyncio.sleep(app_config['service']['massa_network_update_period_min'] * 60)
-            save_app_stat()
-    except Exception as E:
-        logger.error(f"[MASSA] Exception {E}")
-    finally:
-        logger.error(f"[MASSA] <- Quit massa")
-    return
+    if success_flag:
+        logger.info(f"[MASSA] Successfully collected MASSA mainnet network info")
+        time_now = await t_now()
+        try:
+            app_globals.massa_network['values']['last_updated'] = time_now
+            append_stat_sample(
+                stat=app_globals.massa_network['stat'],
+                series=SERIES_NETWORK_STAT,
+                entry={
+                    "time": time_now,
+                    "cycle": app_globals.massa_network['values'].get("current_cycle"),
+                    "stakers": app_globals.massa_network['values'].get("total_stakers"),
+                    "rolls": app_globals.massa_network['values'].get("total_staked_rolls"),
+                    "release": app_globals.massa_network['values'].get("current_release"),
+                    "block_reward": app_globals.massa_network['values'].get("block_reward"),
+                    "roll_price": app_globals.massa_network['values'].get("roll_price"),
+                    "node_id": app_globals.massa_network['values'].get("node_id"),
+                    "ip": app_globals.massa_network['values'].get("node_ip"),
+                }
+            )
+        except Exception as E:
+            logger.warning(f"[MASSA] Cannot store MASSA stat ({E})")
+        else:
+            logger.info(f"[MASSA] Successfully stored MASSA stat ({len(app_globals.massa_network['stat'])} measures)")
+    else:
+        logger.warning(f"[MASSA] Could not collect MASSA mainnet network info")
+    # Écriture différée (remotes/persistence.py)
+    mark_dirty(name="app_stat")
 
 if __name__ == "__main__":
     pass
@@ -1,78 +1,120 @@
 from loguru import logger
 import asyncio
+from time import monotonic
 
 from app_config import app_config
 import app_globals
 
 from remotes.massa import massa_get_info
-from remotes.node import check_node
-from remotes.wallet import check_wallet
+from remotes.node import probe_node, apply_node_probe
+from remotes.wallet import probe_wallet, apply_wallet_probe
+from remotes.addresses import refresh_address_snapshot
 from remotes.releases import check_releases
-from remotes_utils import save_app_results
+from remotes_utils import save_app_results_async
 
 from alert_manager import send_alert
 from remotes.node import format_html_message
 
-@logger.catch
-async def monitor() -> None:
-    logger.debug(f"[MONITOR] -> Monitor")
-    try:
-        while True:
-            # 1. Rafraîchir le statut réseau AVANT tout le reste !
-            await massa_get_info()    # Ou await massa_get_status(), ou les deux selon ta logique
-
-            node_coros = []
-            wallet_coros = []
-
-            # 2. Création des coroutines
-            for node_name in app_globals.app_results:
-                node_coros.append(check_node(node_name=node_name))
-                for wallet_address in app_globals.app_results[node_name]['wallets']:
-                    wallet_coros.append(check_wallet(node_name=node_name, wallet_address=wallet_address))
-
-            # 3. Exécution des vérifications avec tolérance aux erreurs
-            async with app_globals.results_lock:
-                node_results = await asyncio.gather(*node_coros, return_exceptions=True)
-                wallet_results = await asyncio.gather(*wallet_coros, return_exceptions=True)
-                save_app_results()
-
-            # 4. Log erreurs individuelles (nodes et wallets)
-            for idx, result in enumerate(node_results):
-                if isinstance(result, Exception):
-                    logger.warning(f"Node check error (#{idx}): {result}")
-            for idx, result in enumerate(wallet_results):
-                if isinstance(result, Exception):
-                    logger.warning(f"Wallet check error (#{idx}): {result}")
-
-            # 5. Vérification releases
-            await check_releases()
-
-            # 6. Log et alerte si besoin
-            nb_nodes = len(node_coros)
-            nb_wallets = len(wallet_coros)
-            logger.info(f"[MONITOR] Monitor: {nb_nodes} nodes, {nb_wallets} wallets checked.")
-
-            all_nodes_offline = all(
-                not app_globals.app_results[n]['last_status']
-                for n in app_globals.app_results
+# Durée du dernier pipeline node → wallets, par node
+monitor_stats = {
+    "nodes": {}
+}
+
+async def run_node_pipeline(node_name: str="", fleet_slots: asyncio.Semaphore=None) -> int:
+    """
+    Probe du node puis, dès son statut connu, snapshot d'adresses et probes de ses wallets
+    (phase 1, hors verrou) ; application sous verrou court (phase 2) puis alertes.
+    fleet_slots borne le nombre de pipelines simultanés sur l'ensemble des nodes.
+    Retourne le nombre de wallets vérifiés.
+    """
+    async with fleet_slots:
+        start_time = monotonic()
+        node_probe = await probe_node(node_name=node_name)
+
+        wallet_addresses = list(app_globals.app_results.get(node_name, {}).get("wallets", {}))
+        wallet_results = []
+        if wallet_addresses:
+            node_online = None if node_probe['late'] else node_probe['status']
+            if node_online:
+                # Snapshot get_addresses frais pour ce node uniquement (un appel)
+                await refresh_address_snapshot(node_names=[node_name])
+            wallet_results = await asyncio.gather(
+                *[
+                    probe_wallet(node_name=node_name, wallet_address=wallet_address, node_online=node_online)
+                    for wallet_address in wallet_addresses
+                ],
+                return_exceptions=True
             )
-            if all_nodes_offline and nb_nodes > 0:                
-                await send_alert(
-                    alert_type="all_nodes_offline",
-                    level="critical",
-                    details ="🚨 TOUS les nodes surveillés sont OFFLINE ! Vérifiez votre infrastructure.",
-                    disable_web_page_preview=True,
-                )
-
-
-            logger.info(f"[MONITOR] Sleeping for {app_config['service']['main_loop_period_min']} minutes...")
-            await asyncio.sleep(app_config['service']['main_loop_period_min'] * 60)
-
-    except BaseException as E:
-        logger.error(f"[MONITOR] Exception {str(E)} ({E})")
-    finally:
-        logger.error(f"[MONITOR] <- Quit Monitor")
-    return
+        pipeline_duration = monotonic() - start_time
+
+    node_alerts = []
+    async with app_globals.results_lock:
+        node_alerts += apply_node_probe(node_probe=node_probe)
+        for wallet_address, wallet_probe in zip(wallet_addresses, wallet_results):
+            if isinstance(wallet_probe, BaseException):
+                logger.warning(f"[MONITOR] Wallet '{wallet_address}'@'{node_name}' check error: {wallet_probe}")
+                continue
+            node_alerts += apply_wallet_probe(wallet_probe=wallet_probe)
+
+    for node_alert in node_alerts:
+        await send_alert(**node_alert)
+
+    monitor_stats['nodes'][node_name] = {
+        "time": node_probe['time'],
+        "duration_sec": pipeline_duration,
+        "status": node_probe['status'],
+        "late": node_probe['late'],
+        "wallets": len(wallet_addresses)
+    }
+    logger.info(f"[MONITOR] Node '{node_name}' pipeline done in {pipeline_duration:.1f}s ({len(wallet_addresses)} wallet(s))")
+    return len(wallet_addresses)
+
+async def monitor_tick() -> None:
+    """Un passage du monitor (planifié par remotes/scheduler.py, budget = deadline du job)."""
+    logger.debug(f"[MONITOR] -> monitor_tick")
+    # 1. Rafraîchir le statut réseau AVANT tout le reste !
+    await massa_get_info()    # Ou await massa_get_status(), ou les deux selon ta logique
+
+    node_names = list(app_globals.app_results)
+    fleet_slots = asyncio.Semaphore(app_config['service']['monitor_fleet_concurrency'])
+
+    # 2. Un pipeline par node : ses wallets partent dès que son statut est connu
+    pipeline_results = await asyncio.gather(
+        *[run_node_pipeline(node_name=node_name, fleet_slots=fleet_slots) for node_name in node_names],
+        return_exceptions=True
+    )
+    nb_wallets = 0
+    for node_name, result in zip(node_names, pipeline_results):
+        if isinstance(result, BaseException):
+            logger.warning(f"[MONITOR] Node '{node_name}' pipeline error: {result}")
+        else:
+            nb_wallets += result
+
+    for node_name in list(monitor_stats['nodes']):
+        if node_name not in app_globals.app_results:
+            monitor_stats['nodes'].pop(node_name, None)
+
+    # 3. Persistance après application de tous les pipelines
+    await save_app_results_async()
+
+    # 4. Vérification releases
+    await check_releases()
+
+    # 5. Log et alerte si besoin
+    nb_nodes = len(node_names)
+    logger.info(f"[MONITOR] Monitor: {nb_nodes} nodes, {nb_wallets} wallets checked.")
+
+    all_nodes_offline = all(
+        not app_globals.app_results[n]['last_status']
+        for n in app_globals.app_results
+    )
+    if all_nodes_offline and nb_nodes > 0:                
+        await send_alert(
+            alert_type="all_nodes_offline",
+            level="critical",
+            details ="🚨 TOUS les nodes surveillés sont OFFLINE ! Vérifiez votre infrastructure.",
+            disable_web_page_preview=True,
+        )
 
 
 if __name__ == "__main__":
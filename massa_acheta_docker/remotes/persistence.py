@@ -0,0 +1,162 @@
+# massa_acheta_docker/remotes/persistence.py
+from loguru import logger
+import asyncio
+import json
+import os
+from pathlib import Path
+from time import monotonic
+
+from remotes.store import is_store_enabled, store_execute
+
+# Écriture différée (write-behind) de l'état des sous-systèmes (watchers, stats) :
+# chacun se déclare sale après modification, le job "persistence" écrit les sous-systèmes sales
+# dans un thread, sur planning et à l'arrêt.
+_subsystems = {}
+_flush_lock = asyncio.Lock()
+
+def register_persistence(name: str="", collect_func=None, forget_func=None) -> None:
+    """
+    collect_func() : sans await (vue cohérente), retourne (write_func, write_args) à exécuter dans un
+    thread, write_func retournant la taille écrite (octets ou lignes) ou False ; None si rien à écrire.
+    forget_func(node_name, wallet_address) : optionnel, oublie l'état d'un wallet (ou de tout un node
+    si wallet_address=None) ; retourne True si quelque chose a été retiré.
+    """
+    _subsystems[name] = {
+        "collect": collect_func,
+        "forget": forget_func,
+        "dirty": False,
+        "flushes": 0,
+        "failures": 0,
+        "last_size": 0,
+        "total_size": 0,
+        "last_flush_sec": 0.0,
+        "max_flush_sec": 0.0
+    }
+
+def mark_dirty(name: str="") -> None:
+    subsystem = _subsystems.get(name, None)
+    if subsystem is None:
+        logger.warning(f"[PERSISTENCE] Unknown subsystem '{name}' marked dirty")
+        return
+    subsystem['dirty'] = True
+
+def forget_wallet_state(node_name: str="", wallet_address: str=None) -> int:
+    """Node ou wallet supprimé : chaque sous-système qui a oublié quelque chose est marqué sale. Retourne leur nombre."""
+    nb_forgotten = 0
+    for name, subsystem in _subsystems.items():
+        if subsystem['forget'] is None:
+            continue
+        if subsystem['forget'](node_name, wallet_address):
+            subsystem['dirty'] = True
+            nb_forgotten += 1
+            logger.debug(f"[PERSISTENCE] '{name}' forgot {wallet_address or 'all wallets'}@{node_name}")
+    return nb_forgotten
+
+def write_json_file(file_path: str="", data: object=None) -> int:
+    """Sérialise et écrit un fichier JSON de façon atomique (temporaire + rename). Retourne la taille en octets."""
+    file_obj = Path(file_path)
+    tmp_file_obj = file_obj.with_name(file_obj.name + ".tmp")
+    data_text = json.dumps(data, indent=2, ensure_ascii=False)
+    with open(file=tmp_file_obj, mode="wt", encoding="utf-8") as output_file:
+        output_file.write(data_text)
+        output_file.flush()
+        os.fsync(output_file.fileno())
+    os.replace(tmp_file_obj, file_obj)
+    return len(data_text)
+
+def copy_nested(data: object=None) -> object:
+    """Copie des conteneurs (dict / list) seulement : les mesures ne sont plus modifiées une fois ajoutées."""
+    if isinstance(data, dict):
+        return {k: copy_nested(v) for k, v in data.items()}
+    if isinstance(data, list):
+        return list(data)
+    return data
+
+def write_store_statements(statements: list=[]) -> int:
+    """Transaction SQLite ; retourne le nombre de lignes écrites (False si échec)."""
+    if not store_execute(statements=statements):
+        return False
+    return sum(len(statement[1]) for statement in statements)
+
+def format_flush_size(size: int=0) -> str:
+    return f"{size} row(s)" if is_store_enabled() else f"{size / 1024:.1f} KB"
+
+def _collect_writes(names: list=None) -> list:
+    writes = []
+    for name, subsystem in _subsystems.items():
+        if names is not None and name not in names:
+            continue
+        if not subsystem['dirty']:
+            continue
+        subsystem['dirty'] = False
+        try:
+            collected = subsystem['collect']()
+        except Exception as E:
+            logger.error(f"[PERSISTENCE] Cannot collect state of '{name}': {str(E)}")
+            subsystem['dirty'] = True
+            subsystem['failures'] += 1
+            continue
+        if collected is not None:
+            writes.append((name, collected))
+    return writes
+
+def _run_writes(writes: list=[]) -> list:
+    """Exécute les écritures collectées (thread) : [(name, size ou False, durée), ...]."""
+    results = []
+    for name, (write_func, write_args) in writes:
+        time_start = monotonic()
+        try:
+            size = write_func(*write_args)
+        except Exception as E:
+            logger.error(f"[PERSISTENCE] Cannot write state of '{name}': {str(E)}")
+            size = False
+        results.append((name, size, monotonic() - time_start))
+    return results
+
+def _record_results(results: list=[]) -> None:
+    for name, size, duration in results:
+        subsystem = _subsystems[name]
+        if size is False:
+            # Réessayé au prochain flush
+            subsystem['dirty'] = True
+            subsystem['failures'] += 1
+            continue
+        subsystem['flushes'] += 1
+        subsystem['last_size'] = size
+        subsystem['total_size'] += size
+        subsystem['last_flush_sec'] = round(duration, 3)
+        subsystem['max_flush_sec'] = max(subsystem['max_flush_sec'], round(duration, 3))
+        logger.debug(f"[PERSISTENCE] Flushed '{name}': {format_flush_size(size)} in {duration:.3f}s")
+
+async def flush_persistence(names: list=None) -> int:
+    """Écrit les sous-systèmes sales : collecte dans la boucle, sérialisation et écriture dans un thread."""
+    async with _flush_lock:
+        writes = _collect_writes(names=names)
+        if not writes:
+            return 0
+        results = await asyncio.to_thread(_run_writes, writes)
+        _record_results(results=results)
+    logger.info(f"[PERSISTENCE] Flushed {len(results)} subsystem(s): " + ", ".join(
+        f"{name} {format_flush_size(size)} in {duration:.3f}s" for name, size, duration in results if size is not False
+    ))
+    return len(results)
+
+def flush_persistence_sync() -> int:
+    """Flush final à l'arrêt du service (hors boucle)."""
+    results = _run_writes(_collect_writes())
+    _record_results(results=results)
+    if results:
+        logger.info(f"[PERSISTENCE] Final flush: {len(results)} subsystem(s)")
+    return len(results)
+
+async def persistence_tick() -> None:
+    await flush_persistence()
+
+def get_persistence_stats() -> dict:
+    return {
+        name: {k: v for k, v in subsystem.items() if k not in ("collect", "forget")}
+        for name, subsystem in _subsystems.items()
+    }
+
+if __name__ == "__main__":
+    pass
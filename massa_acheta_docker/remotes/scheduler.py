@@ -0,0 +1,244 @@
+# massa_acheta_docker/remotes/scheduler.py
+from loguru import logger
+import asyncio
+import random
+from time import monotonic, time
+
+from remotes.deadline import tick_budget
+from remotes.supervisor import record_task_crash, record_task_recovery
+
+# Jobs périodiques déclarés par register_job() et exécutés par run_scheduler()
+_jobs = {}
+_wakeup = None
+
+CATCH_UP_POLICIES = ("skip", "once", "all")
+
+def register_job(
+    name: str="",
+    func=None,
+    period_sec: float=60,
+    jitter_sec: float=0,
+    deadline_sec: float=None,
+    catch_up: str="skip",
+    skip_if_running: bool=True,
+    initial_delay_sec: float=0,
+    triggers: list=None,
+    max_catch_up: int=10,
+    at_func=None
+) -> dict:
+    """
+    Déclare un job périodique.
+    func: coroutine sans argument ; si elle retourne un nombre, le prochain passage est replanifié
+          à fin du run + ce délai (job adaptatif), sinon la cadence fixe period_sec est gardée.
+    jitter_sec: décalage aléatoire [0, jitter_sec] ajouté à chaque passage (étale la charge).
+    deadline_sec: budget du run (tick_budget), propagé aux appels RPC du job.
+    catch_up: passages manqués (boucle bloquée, run trop long) :
+              "skip" = prochain créneau aligné, "once" = un seul rattrapage immédiat,
+              "all" = tous les passages manqués enchaînés (max max_catch_up).
+    skip_if_running: pas de run concurrent du même job, le passage est compté comme sauté.
+    triggers: événements (trigger_jobs) qui déclenchent le job sans attendre son créneau.
+    at_func: planification calée sur l'horloge de la chaîne (remotes/chainclock.py) :
+             at_func(unix_time) -> horodatage unix du prochain passage ; remplace period_sec.
+    """
+    if catch_up not in CATCH_UP_POLICIES:
+        raise ValueError(f"Unknown catch-up policy '{catch_up}' for job '{name}'")
+    if name in _jobs:
+        logger.warning(f"[SCHEDULER] Job '{name}' already registered, replacing it")
+
+    time_now = monotonic()
+    first_run = time_now + initial_delay_sec
+    if at_func is not None:
+        first_run = max(first_run, time_now + at_func(time()) - time())
+    _jobs[name] = {
+        "name": name,
+        "func": func,
+        "period_sec": period_sec,
+        "jitter_sec": jitter_sec,
+        "deadline_sec": deadline_sec,
+        "catch_up": catch_up,
+        "skip_if_running": skip_if_running,
+        "triggers": set(triggers or []),
+        "max_catch_up": max_catch_up,
+        "at_func": at_func,
+        "due": first_run,
+        "next_run": first_run + random.uniform(0, jitter_sec),
+        "running": 0,
+        "pending_trigger": False,
+        "tasks": set(),
+        "stats": {
+            "runs": 0,
+            "failures": 0,
+            "skipped": 0,
+            "missed": 0,
+            "triggered": 0,
+            "last_run_sec": 0.0,
+            "max_run_sec": 0.0,
+            "total_run_sec": 0.0,
+            "last_lag_sec": 0.0,
+            "max_lag_sec": 0.0
+        }
+    }
+    logger.info(f"[SCHEDULER] Job '{name}' registered: {'on chain clock' if at_func else f'every {period_sec}s'} (jitter {jitter_sec}s, deadline {deadline_sec}s, catch-up '{catch_up}')")
+    _wake()
+    return _jobs[name]
+
+def unregister_job(name: str="") -> bool:
+    job = _jobs.pop(name, None)
+    if job is None:
+        return False
+    for task in list(job['tasks']):
+        task.cancel()
+    _wake()
+    return True
+
+def trigger_jobs(event: str="") -> int:
+    """Lance dès que possible les jobs abonnés à l'événement (rejoué en fin de run s'il tourne déjà)."""
+    nb_triggered = 0
+    time_now = monotonic()
+    for job in _jobs.values():
+        if event not in job['triggers']:
+            continue
+        nb_triggered += 1
+        job['stats']['triggered'] += 1
+        if job['running'] and job['skip_if_running']:
+            job['pending_trigger'] = True
+        else:
+            job['due'] = job['next_run'] = time_now
+    if nb_triggered:
+        _wake()
+    return nb_triggered
+
+def _wake() -> None:
+    if _wakeup is not None:
+        _wakeup.set()
+
+def _plan_next_run(job: dict={}, time_now: float=0) -> None:
+    """Créneau suivant à cadence fixe (sans dérive), selon la politique de rattrapage."""
+    if job['at_func'] is not None:
+        # Horloge de la chaîne : prochaine frontière (cycle / période) après ce passage, +1s de marge
+        unix_now = time()
+        job['due'] = time_now + max(0.0, job['at_func'](unix_now + 1) - unix_now)
+        job['next_run'] = job['due'] + random.uniform(0, job['jitter_sec'])
+        return
+
+    period_sec = job['period_sec']
+    due = job['due'] + period_sec
+    if due <= time_now:
+        missed = int((time_now - due) // period_sec) + 1
+        job['stats']['missed'] += missed
+        if job['catch_up'] == "once" and not job['running']:
+            due = time_now
+        elif job['catch_up'] == "all" and not job['running']:
+            due = max(due, time_now - (job['max_catch_up'] - 1) * period_sec)
+        else:
+            # "skip", ou job encore en cours : rattrapage rejoué à la fin du run (pending_trigger)
+            due += missed * period_sec
+        logger.warning(f"[SCHEDULER] Job '{job['name']}' missed {missed} slot(s), catch-up '{job['catch_up']}'")
+    job['due'] = due
+    job['next_run'] = due + (random.uniform(0, job['jitter_sec']) if due > time_now else 0)
+
+def _launch_job(job: dict={}, time_now: float=0) -> None:
+    scheduled = job['next_run']
+    _plan_next_run(job=job, time_now=time_now)
+
+    if job['running'] and job['skip_if_running']:
+        job['stats']['skipped'] += 1
+        if job['catch_up'] != "skip":
+            job['pending_trigger'] = True
+        logger.warning(f"[SCHEDULER] Job '{job['name']}' still running, slot skipped")
+        return
+
+    job['running'] += 1
+    task = asyncio.create_task(_run_job(job=job, lag_sec=max(0.0, time_now - scheduled)))
+    job['tasks'].add(task)
+    task.add_done_callback(job['tasks'].discard)
+
+async def _run_job(job: dict={}, lag_sec: float=0) -> None:
+    stats = job['stats']
+    stats['last_lag_sec'] = lag_sec
+    stats['max_lag_sec'] = max(stats['max_lag_sec'], lag_sec)
+
+    next_delay = None
+    backoff_sec = 0.0
+    start_time = monotonic()
+    try:
+        if job['deadline_sec']:
+            with tick_budget(tick_name=job['name'], budget_sec=job['deadline_sec']):
+                next_delay = await job['func']()
+        else:
+            next_delay = await job['func']()
+
+    except asyncio.CancelledError:
+        raise
+    except Exception as E:
+        stats['failures'] += 1
+        logger.error(f"[SCHEDULER] Job '{job['name']}' failed: {str(E)} ({E})")
+        # Échecs répétés : le prochain passage est repoussé (backoff exponentiel du superviseur)
+        backoff_sec = await record_task_crash(task_name=job['name'], error=f"{type(E).__name__}: {str(E)}")
+    else:
+        record_task_recovery(task_name=job['name'])
+
+    finally:
+        time_now = monotonic()
+        duration = time_now - start_time
+        job['running'] -= 1
+        stats['runs'] += 1
+        stats['last_run_sec'] = duration
+        stats['max_run_sec'] = max(stats['max_run_sec'], duration)
+        stats['total_run_sec'] += duration
+
+        if isinstance(next_delay, (int, float)) and not isinstance(next_delay, bool):
+            job['due'] = job['next_run'] = time_now + max(0.0, next_delay)
+        if job['pending_trigger']:
+            job['pending_trigger'] = False
+            job['due'] = job['next_run'] = time_now
+        if backoff_sec and job['next_run'] < time_now + backoff_sec:
+            job['due'] = job['next_run'] = time_now + backoff_sec
+        _wake()
+
+def get_scheduler_stats() -> dict:
+    time_now = monotonic()
+    return {
+        job_name: {
+            "period_sec": job['period_sec'],
+            "deadline_sec": job['deadline_sec'],
+            "running": job['running'],
+            "next_in_sec": max(0.0, job['next_run'] - time_now),
+            "avg_run_sec": job['stats']['total_run_sec'] / job['stats']['runs'] if job['stats']['runs'] else 0.0,
+            **job['stats']
+        }
+        for job_name, job in _jobs.items()
+    }
+
+async def run_scheduler() -> None:
+    """Boucle unique : lance chaque job à son créneau puis dort jusqu'au prochain (ou un trigger)."""
+    global _wakeup
+    logger.debug(f"[SCHEDULER] -> run_scheduler")
+
+    _wakeup = asyncio.Event()
+    try:
+        while True:
+            _wakeup.clear()
+            time_now = monotonic()
+            for job in list(_jobs.values()):
+                if job['next_run'] <= time_now:
+                    _launch_job(job=job, time_now=time_now)
+
+            next_run = min((job['next_run'] for job in _jobs.values()), default=time_now + 60)
+            try:
+                await asyncio.wait_for(_wakeup.wait(), timeout=max(0.0, next_run - monotonic()))
+            except asyncio.TimeoutError:
+                pass
+
+    except BaseException as E:
+        logger.error(f"[SCHEDULER] Exception {str(E)} ({E})")
+    finally:
+        for job in _jobs.values():
+            for task in list(job['tasks']):
+                task.cancel()
+        logger.error(f"[SCHEDULER] <- Quit run_scheduler")
+
+    return
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,152 @@
+# massa_acheta_docker/remotes/stakers.py
+from loguru import logger
+from array import array
+from bisect import bisect_left, bisect_right
+from operator import mul
+
+# Table complète des stakers du réseau {address: rolls}, gardée en mémoire entre deux rafraîchissements
+stakers_table = {}
+stakers_total_rolls = 0
+
+# Index compact : rolls triés (croissant), mis à jour à partir du diff (suppressions / insertions
+# par bisection). Le Gini, qui dépend de tout le tableau, n'est calculé qu'à la lecture (une fois par version).
+stakers_index = {
+    "version": 0,
+    "rolls": array("q"),
+    "gini": None
+}
+
+# Au-delà de cette part de stakers modifiés, un tri complet coûte moins que les insertions
+INDEX_REBUILD_RATIO = 0.25
+
+def apply_stakers_table(new_table: dict={}) -> dict:
+    """
+    Remplace la table des stakers et met à jour le total de rolls à partir du diff
+    (ajouts, retraits, changements) plutôt que d'une somme complète.
+    """
+    global stakers_table, stakers_total_rolls
+
+    added = {address: rolls for address, rolls in new_table.items() if address not in stakers_table}
+    removed = {address: rolls for address, rolls in stakers_table.items() if address not in new_table}
+    changed = {
+        address: (stakers_table[address], rolls)
+        for address, rolls in new_table.items()
+        if address in stakers_table and stakers_table[address] != rolls
+    }
+
+    rolls_delta = (
+        sum(added.values()) -
+        sum(removed.values()) +
+        sum(new_rolls - old_rolls for old_rolls, new_rolls in changed.values())
+    )
+    stakers_total_rolls += rolls_delta
+    stakers_table = new_table
+
+    stakers_diff = {
+        "added": added,
+        "removed": removed,
+        "changed": changed,
+        "rolls_delta": rolls_delta
+    }
+    logger.info(
+        f"[STAKERS] Stakers table updated: {len(new_table)} stakers, {stakers_total_rolls} rolls "
+        f"(+{len(added)} / -{len(removed)} / ~{len(changed)}, {rolls_delta:+} rolls)"
+    )
+    update_stakers_index(stakers_diff=stakers_diff)
+    return stakers_diff
+
+def update_stakers_index(stakers_diff: dict={}) -> None:
+    """Reconstruit l'index (tri + sommes cumulées) si la table a changé, agrégats calculés en une passe."""
+    global stakers_index
+
+    if not (stakers_diff['added'] or stakers_diff['removed'] or stakers_diff['changed']):
+        return
+
+    rolls = array("q", sorted(stakers_table.values()))
+    cumulative = array("q", accumulate(rolls, initial=0))
+    weighted_sum = sum(map(mul, range(1, len(rolls) + 1), rolls))
+
+    # Gini sur valeurs triées : G = 2 * sum(i * x_i) / (n * sum(x)) - (n + 1) / n
+    nb_stakers = len(rolls)
+    total_rolls = cumulative[-1]
+    gini = (2 * weighted_sum) / (nb_stakers * total_rolls) - (nb_stakers + 1) / nb_stakers if nb_stakers and total_rolls else 0.0
+
+    # Nouveau dict publié d'un coup : les lecteurs gardent une vue cohérente
+    stakers_index = {
+        "version": stakers_index['version'] + 1,
+        "rolls": rolls,
+        "cumulative": cumulative,
+        "gini": gini
+    }
+
+def update_stakers_index(stakers_diff: dict={}) -> None:
+    """
+    Applique le diff au tableau trié : retrait de l'ancienne valeur et insertion de la nouvelle par bisection
+    pour chaque staker ajouté / retiré / modifié, reconstruction complète au-delà de INDEX_REBUILD_RATIO.
+    """
+    old_values = list(stakers_diff['removed'].values()) + [old_rolls for old_rolls, _ in stakers_diff['changed'].values()]
+    new_values = list(stakers_diff['added'].values()) + [new_rolls for _, new_rolls in stakers_diff['changed'].values()]
+    if not (old_values or new_values):
+        return
+
+    rolls = stakers_index['rolls']
+    if len(old_values) + len(new_values) > len(rolls) * INDEX_REBUILD_RATIO:
+        # Gros changement (ou premier chargement) : reconstruction complète
+        rolls[:] = array("q", sorted(stakers_table.values()))
+    else:
+        for old_rolls in old_values:
+            position = bisect_left(rolls, old_rolls)
+            if position < len(rolls) and rolls[position] == old_rolls:
+                del rolls[position]
+        for new_rolls in new_values:
+            rolls.insert(bisect_right(rolls, new_rolls), new_rolls)
+
+    # Pas d'await ici : les lecteurs voient l'index avant ou après la mise à jour
+    stakers_index['version'] += 1
+    stakers_index['gini'] = None
+
+def get_stakers_gini() -> float:
+    """Gini des rolls (0 = répartition égale), recalculé à la première lecture après une mise à jour."""
+    if stakers_index['gini'] is None:
+        rolls = stakers_index['rolls']
+        nb_stakers = len(rolls)
+        total_rolls = sum(rolls)
+        # Gini sur valeurs triées : G = 2 * sum(i * x_i) / (n * sum(x)) - (n + 1) / n
+        weighted_sum = sum(map(mul, range(1, nb_stakers + 1), rolls))
+        stakers_index['gini'] = (2 * weighted_sum) / (nb_stakers * total_rolls) - (nb_stakers + 1) / nb_stakers if nb_stakers and total_rolls else 0.0
+    return stakers_index['gini']
+
+def get_staker_rank(rolls: int=0) -> int:
+    """Rang (1 = plus gros staker) d'un staker possédant ce nombre de rolls."""
+    index_rolls = stakers_index['rolls']
+    return len(index_rolls) - bisect_right(index_rolls, rolls) + 1
+
+def get_staker_percentile(rolls: int=0) -> float:
+    """Pourcentage de stakers ayant strictement moins de rolls."""
+    index_rolls = stakers_index['rolls']
+    if not index_rolls:
+        return 0.0
+    return 100 * bisect_left(index_rolls, rolls) / len(index_rolls)
+
+def get_top_share(top_n: int=10) -> float:
+    """Part (%) des rolls détenue par les top_n plus gros stakers (fin du tableau trié)."""
+    index_rolls = stakers_index['rolls']
+    if not index_rolls or not stakers_total_rolls or top_n <= 0:
+        return 0.0
+    return 100 * sum(index_rolls[-top_n:]) / stakers_total_rolls
+
+def get_wallet_staking_position(wallet_address: str="") -> dict:
+    """Position d'un wallet dans le réseau (None s'il n'est pas dans la table des stakers)."""
+    wallet_rolls = stakers_table.get(wallet_address, None)
+    if wallet_rolls is None:
+        return None
+    return {
+        "rolls": wallet_rolls,
+        "rank": get_staker_rank(rolls=wallet_rolls),
+        "stakers": len(stakers_index['rolls']),
+        "percentile": get_staker_percentile(rolls=wallet_rolls),
+        "share": 100 * wallet_rolls / stakers_total_rolls if stakers_total_rolls else 0.0
+    }
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,495 @@
+# massa_acheta_docker/remotes/store.py
+from loguru import logger
+import json
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from time import time
+
+from app_config import app_config
+
+# Base SQLite embarquée (mode WAL) : nodes, wallets, séries de mesures, blocks / opérations vus,
+# crédits différés, alertes. Active si app_config['service']['storage_backend'] == "sqlite".
+# Les écritures ne portent que sur ce qui a changé depuis la dernière sauvegarde.
+
+SERIES_WALLET_STAT = "wallet_stat"
+SERIES_NETWORK_STAT = "massa_network"
+
+def get_tier_series(series: str="", tier: str="raw") -> str:
+    """Nom de série d'un palier de rétention (cf. remotes/timeseries.py) : 'wallet_stat:hour', ..."""
+    return series if tier == "raw" else f"{series}:{tier}"
+
+# Fichiers JSON repris par la migration (chemins des watchers, cf. watchers/*.py)
+JSON_WATCHER_HISTORIES = {
+    "balance": "watchers_state/balances_seen.json",
+    "rolls": "watchers_state/rolls_seen.json",
+    "missed_blocks": "watchers_state/missed_blocks_seen.json",
+    "deferred_credits": "watchers_state/deferred_credits_seen.json"
+}
+JSON_WATCHER_SEEN = {
+    "seen_blocks": "watchers_state/blocks_seen.json",
+    "seen_operations": "watchers_state/operations_seen.json"
+}
+
+STORE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS nodes (
+    node_name TEXT PRIMARY KEY,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS wallets (
+    node_name TEXT NOT NULL,
+    wallet_address TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (node_name, wallet_address)
+);
+CREATE TABLE IF NOT EXISTS samples (
+    series TEXT NOT NULL,
+    node_name TEXT NOT NULL DEFAULT '',
+    wallet_address TEXT NOT NULL DEFAULT '',
+    time REAL NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS samples_lookup ON samples (series, node_name, wallet_address, time);
+CREATE TABLE IF NOT EXISTS seen_blocks (
+    wallet_address TEXT NOT NULL,
+    block_id TEXT NOT NULL,
+    time REAL NOT NULL,
+    PRIMARY KEY (wallet_address, block_id)
+);
+CREATE TABLE IF NOT EXISTS seen_operations (
+    wallet_address TEXT NOT NULL,
+    operation_id TEXT NOT NULL,
+    time REAL NOT NULL,
+    PRIMARY KEY (wallet_address, operation_id)
+);
+CREATE TABLE IF NOT EXISTS credits (
+    wallet_address TEXT NOT NULL,
+    period INTEGER,
+    thread INTEGER,
+    amount TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS credits_lookup ON credits (wallet_address, period, thread);
+CREATE TABLE IF NOT EXISTS alerts (
+    time REAL NOT NULL,
+    alert_type TEXT NOT NULL,
+    node_name TEXT,
+    wallet_address TEXT,
+    level TEXT,
+    message TEXT
+);
+CREATE INDEX IF NOT EXISTS alerts_lookup ON alerts (alert_type, time);
+"""
+
+_store = {
+    "conn": None,
+    "path": None
+}
+# Une seule connexion partagée entre la boucle et les threads d'écriture
+_db_lock = threading.Lock()
+
+# Dernier état écrit : lignes nodes / wallets (texte JSON) et dernière mesure écrite par série
+_written_rows = {}
+_written_samples = {}
+_written_seen = {}
+
+def is_store_enabled() -> bool:
+    return app_config['service'].get("storage_backend", "json") == "sqlite"
+
+def open_store(store_path: str=None) -> sqlite3.Connection:
+    if _store['conn'] is not None:
+        return _store['conn']
+
+    store_path = store_path or app_config['service']['sqlite_path']
+    Path(store_path).parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(store_path, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(STORE_SCHEMA)
+    conn.commit()
+    _store['conn'] = conn
+    _store['path'] = store_path
+    logger.info(f"[STORE] SQLite store '{store_path}' opened (WAL)")
+    return conn
+
+def close_store() -> None:
+    with _db_lock:
+        if _store['conn'] is None:
+            return
+        try:
+            _store['conn'].execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            _store['conn'].close()
+        except Exception as E:
+            logger.warning(f"[STORE] Cannot close SQLite store cleanly ({str(E)})")
+        _store['conn'] = None
+        logger.info(f"[STORE] SQLite store '{_store['path']}' closed")
+
+def store_execute(statements: list=[]) -> bool:
+    """
+    Exécute [(sql, [params, ...]), ...] en une seule transaction (executemany par requête).
+    Une requête peut porter un 3e élément on_commit : mise à jour des caches "déjà écrit",
+    appelée seulement si la transaction est validée (sinon tout repart au prochain flush).
+    Synchrone : à lancer via asyncio.to_thread depuis la boucle.
+    """
+    commit_actions = [statement[2] for statement in statements if len(statement) > 2 and statement[2] is not None]
+    statements = [(statement[0], statement[1]) for statement in statements if statement[1]]
+
+    if statements:
+        with _db_lock:
+            conn = open_store()
+            try:
+                with conn:
+                    for sql, rows in statements:
+                        conn.executemany(sql, rows)
+            except Exception as E:
+                logger.error(f"[STORE] SQLite transaction failed ({len(statements)} statement(s)): {str(E)}")
+                return False
+        logger.debug(f"[STORE] Wrote {sum(len(rows) for _, rows in statements)} row(s)")
+
+    for commit_action in commit_actions:
+        commit_action()
+    return True
+
+def store_query(sql: str="", params: tuple=()) -> list:
+    with _db_lock:
+        return open_store().execute(sql, params).fetchall()
+
+def get_entry_time(entry: dict={}) -> float:
+    """Horodatage d'une mesure : champ 'time' (unix) ou 'datetime' (ISO) des historiques des watchers."""
+    if entry.get("time", None) is not None:
+        return float(entry['time'])
+    try:
+        return datetime.fromisoformat(entry['datetime']).timestamp()
+    except Exception:
+        return time()
+
+# --- nodes / wallets ---
+
+def build_results_statements(composed_results: dict={}, dirty_keys: set=None) -> list:
+    """
+    Upsert des seuls nodes / wallets dont le contenu a changé, suppression des disparus (séries comprises).
+    dirty_keys: {(node_name, wallet_address)} à examiner (wallet_address None = le node et ses wallets),
+    composed_results ne contenant alors que ces nodes ; None = tout examiner.
+    """
+    node_rows = []
+    wallet_rows = []
+    current_keys = set()
+    # Lignes écrites (texte) ou supprimées (None), reportées dans _written_rows après validation
+    pending_rows = {}
+
+    for node_name, node_data in composed_results.items():
+        node_fields = {k: v for k, v in node_data.items() if k != "wallets"}
+        node_text = json.dumps(obj=node_fields)
+        current_keys.add((node_name, ""))
+        if _written_rows.get((node_name, "")) != node_text:
+            node_rows.append((node_name, node_text))
+            pending_rows[(node_name, "")] = node_text
+
+        for wallet_address, wallet_data in node_data.get("wallets", {}).items():
+            wallet_text = json.dumps(obj=wallet_data)
+            current_keys.add((node_name, wallet_address))
+            if _written_rows.get((node_name, wallet_address)) != wallet_text:
+                wallet_rows.append((node_name, wallet_address, wallet_text))
+                pending_rows[(node_name, wallet_address)] = wallet_text
+
+    removed_nodes = []
+    removed_wallets = []
+    if dirty_keys is None:
+        checked_keys = list(_written_rows)
+    else:
+        whole_nodes = {node_name for node_name, wallet_address in dirty_keys if wallet_address is None}
+        checked_keys = [
+            k for k in _written_rows
+            if k[0] in whole_nodes or k in dirty_keys
+        ]
+    for key in [k for k in checked_keys if k not in current_keys]:
+        pending_rows[key] = None
+        if key[1] == "":
+            removed_nodes.append((key[0],))
+        else:
+            removed_wallets.append(key)
+
+    def commit_rows():
+        for key, row_text in pending_rows.items():
+            if row_text is None:
+                _written_rows.pop(key, None)
+            else:
+                _written_rows[key] = row_text
+        # Séries des nodes / wallets supprimés : plus rien d'écrit en base
+        removed_node_names = {node_name for (node_name,) in removed_nodes}
+        for sample_key in list(_written_samples):
+            if sample_key[1] in removed_node_names or (sample_key[1], sample_key[2]) in removed_wallets:
+                _written_samples.pop(sample_key, None)
+
+    return [
+        ("INSERT OR REPLACE INTO nodes (node_name, data) VALUES (?, ?)", node_rows),
+        ("INSERT OR REPLACE INTO wallets (node_name, wallet_address, data) VALUES (?, ?, ?)", wallet_rows),
+        ("DELETE FROM nodes WHERE node_name = ?", removed_nodes),
+        ("DELETE FROM wallets WHERE node_name = ? AND wallet_address = ?", removed_wallets),
+        # Mesures brutes, agrégats et historiques des watchers, dans la même transaction
+        ("DELETE FROM samples WHERE node_name = ?", removed_nodes),
+        ("DELETE FROM samples WHERE node_name = ? AND wallet_address = ?", removed_wallets, commit_rows)
+    ]
+
+def load_results() -> dict:
+    results = {}
+    for node_name, node_text in store_query("SELECT node_name, data FROM nodes"):
+        results[node_name] = json.loads(node_text)
+        results[node_name]['wallets'] = {}
+        _written_rows[(node_name, "")] = node_text
+    for node_name, wallet_address, wallet_text in store_query("SELECT node_name, wallet_address, data FROM wallets"):
+        if node_name in results:
+            results[node_name]['wallets'][wallet_address] = json.loads(wallet_text)
+            _written_rows[(node_name, wallet_address)] = wallet_text
+    return results
+
+# --- séries de mesures (stat wallets / réseau, historiques des watchers) ---
+
+def build_samples_statements(series: str="", node_name: str="", wallet_address: str="", entries: list=[]) -> list:
+    """
+    Mesures ajoutées depuis la dernière écriture de la série : on repart de la fin de la liste
+    jusqu'à la dernière mesure écrite (coût proportionnel aux nouveautés, listes tronquées comprises).
+    """
+    key = (series, node_name, wallet_address)
+    last_entry, last_time = _written_samples.get(key, (None, None))
+    if last_time is None:
+        rows = store_query(
+            "SELECT MAX(time) FROM samples WHERE series = ? AND node_name = ? AND wallet_address = ?",
+            (series, node_name, wallet_address)
+        )
+        last_time = rows[0][0] if rows and rows[0][0] is not None else float("-inf")
+
+    new_entries = []
+    for position in range(len(entries) - 1, -1, -1):
+        entry = entries[position]
+        if entry is last_entry or (last_entry is None and get_entry_time(entry) <= last_time):
+            break
+        new_entries.append(entry)
+    if not new_entries:
+        return []
+
+    new_entries.reverse()
+    written_sample = (new_entries[-1], get_entry_time(new_entries[-1]))
+
+    def commit_samples():
+        _written_samples[key] = written_sample
+
+    return [(
+        "INSERT INTO samples (series, node_name, wallet_address, time, data) VALUES (?, ?, ?, ?, ?)",
+        [(series, node_name, wallet_address, get_entry_time(entry), json.dumps(obj=entry)) for entry in new_entries],
+        commit_samples
+    )]
+
+def build_replace_samples_statements(series: str="", node_name: str="", wallet_address: str="", entries: list=[], on_commit=None) -> list:
+    """
+    Réécriture complète de la série d'un wallet (compactage d'un historique) : anciennes lignes supprimées
+    et mesures réinsérées dans la même transaction. on_commit : appelée en plus si la transaction est validée.
+    """
+    key = (series, node_name, wallet_address)
+    written_sample = (entries[-1], get_entry_time(entries[-1])) if entries else None
+
+    def commit_replace():
+        if written_sample is None:
+            _written_samples.pop(key, None)
+        else:
+            _written_samples[key] = written_sample
+        if on_commit is not None:
+            on_commit()
+
+    return [
+        ("DELETE FROM samples WHERE series = ? AND node_name = ? AND wallet_address = ?", [key]),
+        (
+            "INSERT INTO samples (series, node_name, wallet_address, time, data) VALUES (?, ?, ?, ?, ?)",
+            [(series, node_name, wallet_address, get_entry_time(entry), json.dumps(obj=entry)) for entry in entries],
+            commit_replace
+        )
+    ]
+
+def build_prune_statements(series: str="", before_time: float=0) -> list:
+    """Mesures d'une série (tous nodes / wallets) plus anciennes que before_time : paliers de rétention (remotes/timeseries.py)."""
+    return [("DELETE FROM samples WHERE series = ? AND time < ?", [(series, before_time)])]
+
+def build_history_statements(series: str="", history: dict={}) -> list:
+    """Historique d'un watcher {node: {wallet: [mesures]}} : nouvelles mesures de chaque wallet."""
+    statements = []
+    for node_name, node_history in history.items():
+        for wallet_address, entries in node_history.items():
+            statements += build_samples_statements(series=series, node_name=node_name, wallet_address=wallet_address, entries=entries)
+    return statements
+
+def load_samples(series: str="", node_name: str="", wallet_address: str="", limit: int=None) -> list:
+    """Mesures d'une série dans l'ordre chronologique (les 'limit' plus récentes si précisé)."""
+    sql = "SELECT data FROM samples WHERE series = ? AND node_name = ? AND wallet_address = ? ORDER BY time DESC, rowid DESC"
+    params = (series, node_name, wallet_address)
+    if limit is not None:
+        sql += " LIMIT ?"
+        params += (int(limit),)
+    entries = [json.loads(data) for (data,) in store_query(sql, params)]
+    entries.reverse()
+    if entries:
+        _written_samples[(series, node_name, wallet_address)] = (entries[-1], get_entry_time(entries[-1]))
+    return entries
+
+def load_history(series: str="") -> dict:
+    history = {}
+    for node_name, wallet_address in store_query(
+        "SELECT DISTINCT node_name, wallet_address FROM samples WHERE series = ?", (series,)
+    ):
+        history.setdefault(node_name, {})[wallet_address] = load_samples(series=series, node_name=node_name, wallet_address=wallet_address)
+    return history
+
+# --- blocks / opérations déjà vus (watchers blocks, operations) ---
+
+SEEN_COLUMNS = {
+    "seen_blocks": "block_id",
+    "seen_operations": "operation_id"
+}
+
+def build_seen_statements(table: str="", seen: dict={}) -> list:
+    """Identifiants {wallet: [ids]} pas encore enregistrés (la table garde tout ce qui a été vu)."""
+    written = _written_seen.setdefault(table, {})
+    time_now = time()
+    rows = []
+    pending_ids = set()
+    for wallet_address, item_ids in seen.items():
+        wallet_written = written.get(wallet_address, set())
+        for item_id in item_ids:
+            if item_id not in wallet_written and (wallet_address, item_id) not in pending_ids:
+                pending_ids.add((wallet_address, item_id))
+                rows.append((wallet_address, item_id, time_now))
+
+    def commit_seen():
+        for wallet_address, item_id in pending_ids:
+            written.setdefault(wallet_address, set()).add(item_id)
+
+    return [(f"INSERT OR IGNORE INTO {table} (wallet_address, {SEEN_COLUMNS[table]}, time) VALUES (?, ?, ?)", rows, commit_seen)]
+
+def load_seen(table: str="") -> dict:
+    seen = {}
+    for wallet_address, item_id in store_query(
+        f"SELECT wallet_address, {SEEN_COLUMNS[table]} FROM {table} ORDER BY time, rowid"
+    ):
+        seen.setdefault(wallet_address, []).append(item_id)
+    _written_seen[table] = {wallet_address: set(item_ids) for wallet_address, item_ids in seen.items()}
+    return seen
+
+# --- crédits différés ---
+
+def build_credits_statements(all_credits: dict={}, previous_credits: dict={}) -> list:
+    """Remplace les crédits des seuls wallets modifiés (ou disparus)."""
+    changed_wallets = [
+        wallet_address for wallet_address in set(all_credits) | set(previous_credits)
+        if all_credits.get(wallet_address, None) != previous_credits.get(wallet_address, None)
+    ]
+    credit_rows = []
+    for wallet_address in changed_wallets:
+        for credit in all_credits.get(wallet_address, []) or []:
+            credit_slot = credit.get("slot", None) or {}
+            credit_rows.append((
+                wallet_address,
+                credit_slot.get("period", credit.get("period", None)),
+                credit_slot.get("thread", None),
+                str(credit.get("amount", 0)),
+                json.dumps(obj=credit)
+            ))
+    return [
+        ("DELETE FROM credits WHERE wallet_address = ?", [(wallet_address,) for wallet_address in changed_wallets]),
+        ("INSERT INTO credits (wallet_address, period, thread, amount, data) VALUES (?, ?, ?, ?, ?)", credit_rows)
+    ]
+
+def load_credits() -> dict:
+    all_credits = {}
+    for wallet_address, credit_text in store_query("SELECT wallet_address, data FROM credits ORDER BY rowid"):
+        all_credits.setdefault(wallet_address, []).append(json.loads(credit_text))
+    return all_credits
+
+# --- alertes ---
+
+def build_alert_statements(alert_type: str="", node_name: str=None, wallet_address: str=None, level: str="info", message: str="") -> list:
+    return [(
+        "INSERT INTO alerts (time, alert_type, node_name, wallet_address, level, message) VALUES (?, ?, ?, ?, ?, ?)",
+        [(time(), alert_type, node_name, wallet_address, level, message)]
+    )]
+
+# --- migration JSON -> SQLite ---
+
+def _load_json_file(file_path: str="", default=None):
+    file_obj = Path(file_path)
+    if not file_obj.exists():
+        return default
+    try:
+        with open(file=file_obj, mode="rt") as input_file:
+            return json.load(fp=input_file)
+    except Exception as E:
+        logger.error(f"[STORE] Cannot read '{file_obj}' for migration ({str(E)})")
+        return default
+
+def migrate_json_to_store() -> bool:
+    """
+    Reprise unique des fichiers JSON existants (résultats, stats, crédits, état des watchers)
+    dans la base, en une transaction. Les fichiers sont laissés en place (sauvegarde).
+    Retourne False si la reprise a déjà été faite ; lève une exception si la transaction échoue
+    (démarrer sur une base vide écraserait ensuite l'état connu).
+    """
+    open_store()
+    if store_query("SELECT value FROM meta WHERE key = 'json_migrated'"):
+        return False
+
+    logger.info(f"[STORE] Migrating JSON files into SQLite store '{_store['path']}'...")
+    statements = []
+
+    app_results = _load_json_file(app_config['service']['results_path'], default={}) or {}
+    statements += build_results_statements(composed_results=app_results)
+
+    def build_stat_file_statements(series: str="", stat_data: dict={}, **series_key) -> list:
+        # Mesures brutes ('stat') et agrégats figés de chaque palier ('stat_hour', 'stat_day')
+        stat_statements = []
+        for stat_key, entries in (stat_data or {}).items():
+            if stat_key != "stat" and not stat_key.startswith("stat_"):
+                continue
+            stat_statements += build_samples_statements(
+                series=get_tier_series(series=series, tier=stat_key[len("stat_"):] or "raw"),
+                entries=[m for m in entries or [] if isinstance(m, dict)],
+                **series_key
+            )
+        return stat_statements
+
+    app_stat = _load_json_file(app_config['service']['stat_path'], default={}) or {}
+    for node_name, node_stat in (app_stat.get("app_results", {}) or {}).items():
+        for wallet_address, wallet_stat in (node_stat or {}).items():
+            statements += build_stat_file_statements(
+                series=SERIES_WALLET_STAT,
+                stat_data=wallet_stat,
+                node_name=node_name,
+                wallet_address=wallet_address
+            )
+    statements += build_stat_file_statements(series=SERIES_NETWORK_STAT, stat_data=app_stat.get("massa_network", {}))
+
+    deferred_credits = _load_json_file(app_config['service']['deferred_credits_path'], default={}) or {}
+    statements += build_credits_statements(all_credits=deferred_credits, previous_credits={})
+
+    for series, file_path in JSON_WATCHER_HISTORIES.items():
+        history = _load_json_file(file_path, default={})
+        if isinstance(history, dict):
+            statements += build_history_statements(series=series, history=history)
+    for table, file_path in JSON_WATCHER_SEEN.items():
+        seen = _load_json_file(file_path, default={})
+        if isinstance(seen, dict):
+            statements += build_seen_statements(table=table, seen=seen)
+
+    statements.append(("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", [("json_migrated", str(int(time())))]))
+    if not store_execute(statements=statements):
+        # Caches "déjà écrit" inchangés (mis à jour seulement après validation)
+        raise Exception("JSON migration into SQLite store failed, nothing written")
+
+    nb_rows = sum(len(statement[1]) for statement in statements)
+    logger.success(f"[STORE] JSON migration done ({nb_rows} row(s)), JSON files kept as backup")
+    return True
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,127 @@
+# massa_acheta_docker/remotes/supervisor.py
+from loguru import logger
+import asyncio
+from collections import deque
+from time import monotonic
+
+from app_config import app_config
+from alert_manager import send_alert
+
+# Tâches de fond suivies : redémarrages, erreurs, détection de crash en boucle
+_supervised = {}
+
+def _get_task_state(task_name: str="") -> dict:
+    task_state = _supervised.get(task_name, None)
+    if task_state is None:
+        task_state = {
+            "task": None,
+            "restarts": 0,
+            "crashes": 0,
+            "consecutive_crashes": 0,
+            "crash_times": deque(maxlen=100),
+            "last_error": None,
+            "last_start": None,
+            "crash_looping": False
+        }
+        _supervised[task_name] = task_state
+    return task_state
+
+def get_backoff_sec(consecutive_crashes: int=0) -> float:
+    """Attente avant redémarrage : base * 2^(n-1), plafonnée."""
+    if consecutive_crashes <= 0:
+        return 0.0
+    return min(
+        app_config['service']['supervisor_backoff_base_sec'] * 2 ** (consecutive_crashes - 1),
+        app_config['service']['supervisor_backoff_max_sec']
+    )
+
+async def record_task_crash(task_name: str="", error: str="") -> float:
+    """
+    Enregistre un crash et retourne le délai de backoff à appliquer.
+    Une seule alerte tant que la tâche reste en crash en boucle (N crashs sur la fenêtre).
+    """
+    task_state = _get_task_state(task_name=task_name)
+    time_now = monotonic()
+    task_state['crashes'] += 1
+    task_state['restarts'] += 1
+    task_state['consecutive_crashes'] += 1
+    task_state['crash_times'].append(time_now)
+    task_state['last_error'] = error
+
+    window_start = time_now - app_config['service']['supervisor_crash_loop_window_sec']
+    recent_crashes = sum(1 for crash_time in task_state['crash_times'] if crash_time >= window_start)
+    if recent_crashes >= app_config['service']['supervisor_crash_loop_count'] and not task_state['crash_looping']:
+        task_state['crash_looping'] = True
+        logger.critical(f"[SUPERVISOR] Task '{task_name}' is crash-looping ({recent_crashes} crashes in {app_config['service']['supervisor_crash_loop_window_sec']}s): {error}")
+        await send_alert(
+            alert_type="task_crash_loop",
+            level="critical",
+            extra=task_name,
+            html=(
+                f"💥 <b>Background task crash-looping:</b> <code>{task_name}</code>\n\n"
+                f"🔁 {recent_crashes} crashes in the last {app_config['service']['supervisor_crash_loop_window_sec'] // 60} min\n"
+                f"⚠️ Last error: <code>{error}</code>\n\n"
+                f"☝ Restarts continue with backoff up to {app_config['service']['supervisor_backoff_max_sec']}s"
+            ),
+            disable_web_page_preview=True
+        )
+
+    return get_backoff_sec(consecutive_crashes=task_state['consecutive_crashes'])
+
+def record_task_recovery(task_name: str="") -> None:
+    """La tâche a tourné (ou réussi) : le backoff repart de zéro et l'alerte pourra être renvoyée."""
+    task_state = _get_task_state(task_name=task_name)
+    if task_state['crash_looping']:
+        logger.success(f"[SUPERVISOR] Task '{task_name}' recovered after {task_state['consecutive_crashes']} consecutive crash(es)")
+    task_state['consecutive_crashes'] = 0
+    task_state['crash_looping'] = False
+
+async def supervise(task_name: str="", coro_factory=None) -> None:
+    """
+    Lance coro_factory() et la relance si elle lève une exception ou se termine
+    (une boucle de fond ne doit jamais rendre la main), avec backoff exponentiel.
+    """
+    logger.debug(f"[SUPERVISOR] -> supervise '{task_name}'")
+    task_state = _get_task_state(task_name=task_name)
+
+    while True:
+        task_state['last_start'] = monotonic()
+        try:
+            await coro_factory()
+            error = "task returned"
+        except asyncio.CancelledError:
+            raise
+        except Exception as E:
+            error = f"{type(E).__name__}: {str(E)}"
+
+        # Les boucles du service interceptent souvent CancelledError : on ne relance pas à l'arrêt
+        current_task = asyncio.current_task()
+        if current_task is not None and current_task.cancelling():
+            raise asyncio.CancelledError()
+
+        if monotonic() - task_state['last_start'] >= app_config['service']['supervisor_stable_sec']:
+            record_task_recovery(task_name=task_name)
+
+        backoff_sec = await record_task_crash(task_name=task_name, error=error)
+        logger.error(f"[SUPERVISOR] Task '{task_name}' stopped ({error}), restart #{task_state['restarts']} in {backoff_sec:.0f}s")
+        await asyncio.sleep(backoff_sec)
+
+def start_supervised_task(task_name: str="", coro_factory=None) -> asyncio.Task:
+    task_state = _get_task_state(task_name=task_name)
+    task_state['task'] = asyncio.create_task(supervise(task_name=task_name, coro_factory=coro_factory), name=task_name)
+    return task_state['task']
+
+async def stop_supervised_tasks() -> None:
+    tasks = [task_state['task'] for task_state in _supervised.values() if task_state['task'] is not None]
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+def get_supervisor_stats() -> dict:
+    return {
+        task_name: {k: v for k, v in task_state.items() if k not in ("task", "crash_times", "last_start")}
+        for task_name, task_state in _supervised.items()
+    }
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,191 @@
+# massa_acheta_docker/remotes/timeseries.py
+from bisect import bisect_left
+from collections import deque
+from time import time
+
+from app_config import app_config
+from remotes.store import SERIES_WALLET_STAT, SERIES_NETWORK_STAT, get_tier_series
+from remotes.chainclock import format_chain_times
+
+# Séries de mesures (stat des wallets, stat réseau) en paliers de rétention :
+#   raw  : mesures brutes (deque 'stat'), gardées stat_raw_retention_hours
+#   hour : agrégats horaires, gardés stat_hour_retention_days
+#   day  : agrégats journaliers, gardés pour toujours
+# Agrégats calculés au fil des mesures : un bucket ouvert par palier, figé (immuable, donc écrit une
+# seule fois) dès qu'une mesure tombe dans le bucket suivant. Les buckets ouverts ne sont pas
+# sauvegardés, ils se reconstruisent au démarrage depuis les mesures brutes.
+
+ROLLUP_TIERS = {
+    "hour": 3600,
+    "day": 86400
+}
+
+# Champs cumulés sur le bucket, les autres gardent la dernière valeur
+ROLLUP_SUM_FIELDS = {
+    SERIES_WALLET_STAT: ("ok_blocks", "nok_blocks"),
+    SERIES_NETWORK_STAT: ()
+}
+
+TIER_LABEL_FORMATS = {
+    "hour": "%d/%m %Hh",
+    "day": "%d/%m/%y"
+}
+
+# (series, node_name, wallet_address) -> {"hour": [buckets figés], "day": [...], "open": {tier: bucket ouvert}}
+_rollups = {}
+
+def get_tier_retention_sec(tier: str="raw") -> float:
+    """Rétention du palier en secondes, None pour les agrégats journaliers (gardés pour toujours)."""
+    if tier == "raw":
+        return app_config['service']['stat_raw_retention_hours'] * 3600
+    if tier == "hour":
+        return app_config['service']['stat_hour_retention_days'] * 86400
+    return None
+
+def _get_rollups(series: str="", node_name: str="", wallet_address: str="") -> dict:
+    return _rollups.setdefault(
+        (series, node_name, wallet_address),
+        {tier: [] for tier in ROLLUP_TIERS} | {"open": {tier: None for tier in ROLLUP_TIERS}}
+    )
+
+def _add_tier_sample(state: dict={}, tier: str="", entry: dict={}, sum_fields: tuple=()) -> int:
+    """Ajoute la mesure au bucket ouvert du palier ; retourne 1 si le bucket précédent a été figé."""
+    bucket_sec = ROLLUP_TIERS[tier]
+    bucket_time = int(entry['time'] // bucket_sec * bucket_sec)
+    closed_buckets = state[tier]
+    if closed_buckets and bucket_time <= closed_buckets[-1]['time']:
+        # Déjà agrégée (rejeu au démarrage) ou mesure en retard sur un bucket figé
+        return 0
+
+    nb_closed = 0
+    open_bucket = state['open'][tier]
+    if open_bucket is not None and bucket_time > open_bucket['time']:
+        closed_buckets.append(open_bucket)
+        open_bucket = None
+        nb_closed = 1
+    if open_bucket is None:
+        open_bucket = {"time": bucket_time, "count": 0, "first_cycle": entry.get("cycle", 0)}
+        state['open'][tier] = open_bucket
+
+    for field, value in entry.items():
+        if field == "time":
+            continue
+        if field in sum_fields:
+            open_bucket[field] = open_bucket.get(field, 0) + value
+        else:
+            open_bucket[field] = value
+    open_bucket['count'] += 1
+    open_bucket['last_time'] = entry['time']
+    return nb_closed
+
+def _prune_tier(entries: list=[], tier: str="", time_now: float=0) -> None:
+    retention_sec = get_tier_retention_sec(tier=tier)
+    if retention_sec is None:
+        return
+    del entries[:bisect_left(entries, time_now - retention_sec, key=lambda entry: entry['time'])]
+
+def prune_raw_stat(stat: deque=None, time_now: float=0) -> None:
+    retention_sec = get_tier_retention_sec(tier="raw")
+    while stat and stat[0].get("time", 0) < time_now - retention_sec:
+        stat.popleft()
+
+def add_rollup_sample(series: str="", node_name: str="", wallet_address: str="", entry: dict={}) -> int:
+    """Met à jour les agrégats de la série avec une nouvelle mesure ; retourne le nombre de buckets figés."""
+    state = _get_rollups(series=series, node_name=node_name, wallet_address=wallet_address)
+    nb_closed = 0
+    for tier in ROLLUP_TIERS:
+        nb_closed += _add_tier_sample(state=state, tier=tier, entry=entry, sum_fields=ROLLUP_SUM_FIELDS.get(series, ()))
+        _prune_tier(entries=state[tier], tier=tier, time_now=entry['time'])
+    return nb_closed
+
+def append_stat_sample(stat: deque=None, entry: dict={}, series: str="", node_name: str="", wallet_address: str="") -> None:
+    """Ajoute une mesure brute (déjà horodatée) : agrégats mis à jour, mesures brutes expirées retirées."""
+    stat.append(entry)
+    add_rollup_sample(series=series, node_name=node_name, wallet_address=wallet_address, entry=entry)
+    prune_raw_stat(stat=stat, time_now=entry['time'])
+
+def restore_rollups(series: str="", node_name: str="", wallet_address: str="", stat: deque=None, tiers: dict={}) -> None:
+    """
+    Au démarrage : buckets figés sauvegardés, puis rejeu des mesures brutes plus récentes
+    (reconstruit les buckets ouverts, ou tous les agrégats si la série n'en avait pas encore).
+    """
+    state = _get_rollups(series=series, node_name=node_name, wallet_address=wallet_address)
+    for tier in ROLLUP_TIERS:
+        state[tier] = [bucket for bucket in tiers.get(tier, None) or [] if isinstance(bucket, dict)]
+        state['open'][tier] = None
+    for entry in sorted(stat, key=lambda entry: entry.get("time", 0)):
+        if entry.get("time", None) is None:
+            continue
+        for tier in ROLLUP_TIERS:
+            _add_tier_sample(state=state, tier=tier, entry=entry, sum_fields=ROLLUP_SUM_FIELDS.get(series, ()))
+
+    time_now = time()
+    for tier in ROLLUP_TIERS:
+        _prune_tier(entries=state[tier], tier=tier, time_now=time_now)
+    prune_raw_stat(stat=stat, time_now=time_now)
+
+def get_closed_rollups(series: str="", node_name: str="", wallet_address: str="") -> dict:
+    """Buckets figés de chaque palier (à sauvegarder), listes vides si la série n'a pas d'agrégats."""
+    state = _rollups.get((series, node_name, wallet_address), None)
+    if state is None:
+        return {tier: [] for tier in ROLLUP_TIERS}
+    return {tier: state[tier] for tier in ROLLUP_TIERS}
+
+def drop_rollups(node_name: str="", wallet_address: str=None) -> None:
+    """Oubli des agrégats d'un wallet, ou de tous les wallets d'un node (wallet_address=None)."""
+    for key in list(_rollups):
+        if key[1] == node_name and (wallet_address is None or key[2] == wallet_address):
+            _rollups.pop(key)
+
+def select_tier(range_sec: float=None) -> str:
+    """Palier le plus fin qui couvre toute la plage demandée (None : tout l'historique)."""
+    if range_sec is None:
+        return "day"
+    if range_sec <= get_tier_retention_sec(tier="raw"):
+        return "raw"
+    if range_sec <= get_tier_retention_sec(tier="hour"):
+        return "hour"
+    return "day"
+
+def get_stat_range(series: str="", node_name: str="", wallet_address: str="", stat: deque=None, range_sec: float=None, time_now: float=0) -> tuple:
+    """(palier, mesures ou buckets de la plage [time_now - range_sec, time_now]) par ordre chronologique."""
+    tier = select_tier(range_sec=range_sec)
+    if tier == "raw":
+        entries = list(stat)
+    else:
+        state = _rollups.get((series, node_name, wallet_address), None)
+        if state is None:
+            return tier, []
+        entries = state[tier] + ([state['open'][tier]] if state['open'][tier] is not None else [])
+    if range_sec is None:
+        return tier, entries
+    return tier, entries[bisect_left(entries, time_now - range_sec, key=lambda entry: entry.get("time", 0)):]
+
+def get_tier_labels(tier: str="", entries: list=[]) -> list:
+    """Libellés d'axe des agrégats (date UTC du bucket)."""
+    return format_chain_times(unix_times=[entry['time'] for entry in entries], date_format=TIER_LABEL_FORMATS[tier])
+
+def parse_stat_range(text: str="") -> float:
+    """'48h', '7d', '2w', 'all' -> secondes (None pour tout l'historique). ValueError si illisible."""
+    text = text.strip().lower()
+    if text == "all":
+        return None
+    units = {"h": 3600, "d": 86400, "w": 7 * 86400}
+    if len(text) < 2 or text[-1] not in units or not text[:-1].isdigit() or int(text[:-1]) == 0:
+        raise ValueError(f"Unknown range '{text}'")
+    return int(text[:-1]) * units[text[-1]]
+
+def get_command_range(text: str="") -> float:
+    """Plage passée en argument d'une commande (/chart_wallet 30d), chart_default_range sinon (boutons du menu compris)."""
+    args = text.split() if text.startswith("/") else []
+    return parse_stat_range(text=args[1] if len(args) > 1 else app_config['service']['chart_default_range'])
+
+def format_stat_range(range_sec: float=None) -> str:
+    if range_sec is None:
+        return "all"
+    if range_sec % 86400 == 0:
+        return f"{int(range_sec // 86400)}d"
+    return f"{int(range_sec // 3600)}h"
+
+if __name__ == "__main__":
+    pass
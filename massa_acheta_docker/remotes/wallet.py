@@ -1,11 +1,13 @@
 from loguru import logger
 
-import json
 from alert_manager import send_alert
 from app_config import app_config
 import app_globals
 
-from remotes_utils import pull_http_api, get_short_address, t_now
+from remotes_utils import get_short_address, t_now, set_results_fields
+from remotes.addresses import get_wallet_address_info
+from remotes.endpoints import is_node_reachable
+from remotes.deadline import is_late
 
 def format_html_message(lines):
     return "\n".join(lines)
@@ -16,158 +18,210 @@ def code(text):
 def bold(text):
     return f"<b>{text}</b>"
 
-@logger.catch
-async def check_wallet(node_name: str="", wallet_address: str="") -> None:
-    logger.debug(f"[WALLET] -> check_wallet")
+async def probe_wallet(node_name: str="", wallet_address: str="", node_online: bool=None) -> dict:
+    """
+    Phase 1 (hors results_lock) : lit le wallet et retourne un résultat figé,
+    sans toucher à app_results (appliqué ensuite par apply_wallet_probe).
+    node_online: statut du node issu de son probe (None = dernier statut connu).
+    """
+    logger.debug(f"[WALLET] -> probe_wallet")
 
-    if app_globals.app_results[node_name]['last_status'] != True:
-        logger.warning(f"[WALLET] Will not watch wallet '{wallet_address}'@'{node_name}' because of its offline")
+    wallet_probe = {
+        "node_name": node_name,
+        "wallet_address": wallet_address,
+        "time": await t_now(),
+        "late": False,
+        "node_offline": False,
+        "status": False,
+        "error": None,
+        "answer": None
+    }
 
-        app_globals.app_results[node_name]['wallets'][wallet_address]['last_status'] = False
-        app_globals.app_results[node_name]['wallets'][wallet_address]['last_result'] = {"error": "Host node is offline"}
-        return
+    if node_online is None:
+        node_online = app_globals.app_results.get(node_name, {}).get("last_status", False) == True
 
-    payload = json.dumps({
-        "id": 0,
-        "jsonrpc": "2.0",
-        "method": "get_addresses",
-        "params": [[wallet_address]]
-    })
+    # Disjoncteur partagé avec check_node : un node mort est ignoré sans attendre de timeout
+    if not node_online or not is_node_reachable(node_name=node_name):
+        wallet_probe['node_offline'] = True
+        wallet_probe['answer'] = {"error": "Host node is offline"}
+        return wallet_probe
 
     wallet_answer = {"error": "No response from remote HTTP API"}
     try:
-        wallet_answer = await pull_http_api(
-            api_url=app_globals.app_results[node_name]['url'],
-            api_method="POST",
-            api_payload=payload,
-            api_root_element="result"
-        )
+        # Lu depuis le snapshot get_addresses partagé (remotes/addresses.py)
+        wallet_answer = await get_wallet_address_info(node_name=node_name, wallet_address=wallet_address)
+        if is_late(wallet_answer):
+            wallet_probe['late'] = True
+            return wallet_probe
 
         wallet_result = wallet_answer.get("result", None)
         if not wallet_result:
             raise Exception(f"Wrong answer from MASSA node API ({wallet_answer})")
 
-        wallet_result = wallet_result[0]
         wallet_result_address = wallet_result.get("address", None)
         if wallet_result_address != wallet_address:
             raise Exception(f"Bad address received from MASSA node API: '{wallet_result_address}' (expected '{wallet_address}')")
 
-        wallet_final_balance = float(wallet_result.get("final_balance", 0))
-        wallet_final_balance = round(wallet_final_balance, 4)
-        wallet_candidate_rolls = int(wallet_result.get("candidate_roll_count", 0))
         wallet_cycle_infos = wallet_result.get("cycle_infos", [])
         if not wallet_cycle_infos:
             raise Exception(f"Bad cycle_infos for wallet '{wallet_address}'")
 
-        wallet_active_rolls = wallet_cycle_infos[-1].get("active_rolls", 0)
-        wallet_operated_blocks = sum(ci.get("ok_count", 0) for ci in wallet_cycle_infos)
-        wallet_missed_blocks = sum(ci.get("nok_count", 0) for ci in wallet_cycle_infos)
+        wallet_probe.update({
+            "final_balance": round(float(wallet_result.get("final_balance", 0)), 4),
+            "candidate_rolls": int(wallet_result.get("candidate_roll_count", 0)),
+            "active_rolls": wallet_cycle_infos[-1].get("active_rolls", 0),
+            "operated_blocks": sum(ci.get("ok_count", 0) for ci in wallet_cycle_infos),
+            "missed_blocks": sum(ci.get("nok_count", 0) for ci in wallet_cycle_infos)
+        })
+
+    except Exception as E:
+        wallet_probe['error'] = str(E)
+        wallet_probe['answer'] = wallet_answer
+
+    else:
+        wallet_probe['status'] = True
+        wallet_probe['answer'] = wallet_result
+
+    return wallet_probe
+
+def apply_wallet_probe(wallet_probe: dict={}) -> list:
+    """
+    Phase 2 (sous results_lock, sans await) : compare avec le dernier état, met à jour app_results
+    et retourne les alertes à envoyer une fois le verrou relâché.
+    """
+    node_name = wallet_probe['node_name']
+    wallet_address = wallet_probe['wallet_address']
+    if wallet_address not in app_globals.app_results.get(node_name, {}).get("wallets", {}):
+        # Node ou wallet supprimé pendant le probe
+        return []
+
+    node_url = app_globals.app_results[node_name]['url']
+    prev = app_globals.app_results[node_name]['wallets'][wallet_address]
+    wallet_alerts = []
+
+    if wallet_probe['node_offline']:
+        logger.warning(f"[WALLET] Will not watch wallet '{wallet_address}'@'{node_name}' because of its offline")
+        set_results_fields(
+            target=prev,
+            fields={"last_status": False, "last_result": wallet_probe['answer']},
+            node_name=node_name,
+            wallet_address=wallet_address
+        )
+        return wallet_alerts
+
+    if wallet_probe['late']:
+        # Budget du tick épuisé : pas de verdict, on garde le dernier état connu
+        logger.warning(f"[WALLET] Wallet '{wallet_address}'@'{node_name}' check is late, keeping last status")
+        return wallet_alerts
 
-    except BaseException as E:
-        logger.warning(f"[WALLET] Error watching wallet '{wallet_address}' on '{node_name}': ({E})")
+    if not wallet_probe['status']:
+        logger.warning(f"[WALLET] Error watching wallet '{wallet_address}' on '{node_name}': ({wallet_probe['error']})")
 
-        if app_globals.app_results[node_name]['wallets'][wallet_address]['last_status'] != False:
+        if prev['last_status'] != False:
             message_lines = [
                 f"🏠 Node: \"{node_name}\"",
-                f"📍 {app_globals.app_results[node_name]['url']}",
+                f"📍 {node_url}",
                 f"🚨 Cannot get info for wallet: <code>{wallet_address}</code>",
-                f"💥 Exception: {code(str(E))}",
+                f"💥 Exception: {code(wallet_probe['error'])}",
                 "⚠ Check wallet address or node settings!"
             ]
-            logger.warning(f"[WALLET] Wallet '{wallet_address}'@'{node_name}' RPC error: {str(E)}")
-            await send_alert(
-                alert_type="wallet_rpc_error",
-                node=node_name,
-                wallet=wallet_address,
-                level="warning",
-                html=format_html_message(message_lines),
-                disable_web_page_preview=True
-            )
-
-        app_globals.app_results[node_name]['wallets'][wallet_address]['last_status'] = False
-        app_globals.app_results[node_name]['wallets'][wallet_address]['last_result'] = wallet_answer
-        return
+            logger.warning(f"[WALLET] Wallet '{wallet_address}'@'{node_name}' RPC error: {wallet_probe['error']}")
+            wallet_alerts.append({
+                "alert_type": "wallet_rpc_error",
+                "node": node_name,
+                "wallet": wallet_address,
+                "level": "warning",
+                "html": format_html_message(message_lines),
+                "disable_web_page_preview": True
+            })
+
+        set_results_fields(
+            target=prev,
+            fields={"last_status": False, "last_result": wallet_probe['answer']},
+            node_name=node_name,
+            wallet_address=wallet_address
+        )
+        return wallet_alerts
 
     # ------ WALLET OK : on compare les stats avec la dernière fois ------
-    prev = app_globals.app_results[node_name]['wallets'][wallet_address]
-    changed = False
+    wallet_final_balance = wallet_probe['final_balance']
+    wallet_candidate_rolls = wallet_probe['candidate_rolls']
+    wallet_active_rolls = wallet_probe['active_rolls']
+    wallet_missed_blocks = wallet_probe['missed_blocks']
+    wallet_operated_blocks = wallet_probe['operated_blocks']
 
     # 1) Balance a baissé ?
     if wallet_final_balance < prev['final_balance']:
-        changed = True
         message_lines = [
             f"🏠 Node: \"{node_name}\"",
-            f"📍 {app_globals.app_results[node_name]['url']}",
+            f"📍 {node_url}",
             f"💸 <b>Balance decreased!</b>",
             f"👛 Wallet: <code>{wallet_address}</code>",
             f"💰 {prev['final_balance']} → {wallet_final_balance} MAS"
         ]
-        await send_alert(
-            alert_type="wallet_balance_drop",
-            node=node_name,
-            wallet=wallet_address,
-            level="warning",
-            html=format_html_message(message_lines),
-            disable_web_page_preview=True
-        )
+        wallet_alerts.append({
+            "alert_type": "wallet_balance_drop",
+            "node": node_name,
+            "wallet": wallet_address,
+            "level": "warning",
+            "html": format_html_message(message_lines),
+            "disable_web_page_preview": True
+        })
 
     # 2) Candidate rolls changé ?
     if wallet_candidate_rolls != prev['candidate_rolls']:
-        changed = True
         message_lines = [
             f"🏠 Node: \"{node_name}\"",
-            f"📍 {app_globals.app_results[node_name]['url']}",
+            f"📍 {node_url}",
             f"🗞 <b>Candidate rolls changed</b>",
             f"👛 Wallet: <code>{wallet_address}</code>",
             f"{prev['candidate_rolls']} → {wallet_candidate_rolls}"
         ]
-        await send_alert(
-            alert_type="wallet_roll_change",
-            node=node_name,
-            wallet=wallet_address,
-            level="info",
-            html=format_html_message(message_lines),
-            disable_web_page_preview=True
-        )
+        wallet_alerts.append({
+            "alert_type": "wallet_roll_change",
+            "node": node_name,
+            "wallet": wallet_address,
+            "level": "info",
+            "html": format_html_message(message_lines),
+            "disable_web_page_preview": True
+        })
 
     # 3) Active rolls changé ?
     if wallet_active_rolls != prev['active_rolls']:
-        changed = True
         message_lines = [
             f"🏠 Node: \"{node_name}\"",
-            f"📍 {app_globals.app_results[node_name]['url']}",
+            f"📍 {node_url}",
             f"🗞 <b>Active rolls changed</b>",
             f"👛 Wallet: <code>{wallet_address}</code>",
             f"{prev['active_rolls']} → {wallet_active_rolls}"
         ]
-        await send_alert(
-            alert_type="wallet_roll_change",
-            node=node_name,
-            wallet=wallet_address,
-            level="info",
-            html=format_html_message(message_lines),
-            disable_web_page_preview=True
-        )
+        wallet_alerts.append({
+            "alert_type": "wallet_roll_change",
+            "node": node_name,
+            "wallet": wallet_address,
+            "level": "info",
+            "html": format_html_message(message_lines),
+            "disable_web_page_preview": True
+        })
 
     # 4) Nouveaux blocs manqués ?
     if wallet_missed_blocks > prev['missed_blocks']:
         delta = wallet_missed_blocks - prev['missed_blocks']
-        changed = True
         message_lines = [
             f"🏠 Node: \"{node_name}\"",
-            f"📍 {app_globals.app_results[node_name]['url']}",
+            f"📍 {node_url}",
             f"🥊 <b>{delta} New missed block(s)</b>",
             f"👛 Wallet: <code>{wallet_address}</code>",
             f"Total missed: {wallet_missed_blocks}"
         ]
-        await send_alert(
-            alert_type="wallet_block_miss",
-            node=node_name,
-            wallet=wallet_address,
-            level="warning",
-            html=format_html_message(message_lines),
-            disable_web_page_preview=True
-        )
+        wallet_alerts.append({
+            "alert_type": "wallet_block_miss",
+            "node": node_name,
+            "wallet": wallet_address,
+            "level": "warning",
+            "html": format_html_message(message_lines),
+            "disable_web_page_preview": True
+        })
 
     # 5) Nouveaux blocs produits ?
     if 'produced_blocks' in prev:
@@ -178,52 +232,54 @@ async def check_wallet(node_name: str="", wallet_address: str="") -> None:
         delta = wallet_operated_blocks - prev_blocks
         message_lines = [
             f"🏠 Node: \"{node_name}\"",
-            f"📍 {app_globals.app_results[node_name]['url']}",
+            f"📍 {node_url}",
             f"✅ <b>{delta} New block(s) produced</b>",
             f"👛 Wallet: <code>{wallet_address}</code>",
             f"Total produced: {wallet_operated_blocks}"
         ]
         logger.info(f"[WALLET] Wallet '{wallet_address}'@'{node_name}' produced {delta} new block(s)")
-        await send_alert(
-            alert_type="wallet_block_produced",
-            node=node_name,
-            wallet=wallet_address,
-            level="info",
-            html=format_html_message(message_lines),
-            disable_web_page_preview=True
-        )
+        wallet_alerts.append({
+            "alert_type": "wallet_block_produced",
+            "node": node_name,
+            "wallet": wallet_address,
+            "level": "info",
+            "html": format_html_message(message_lines),
+            "disable_web_page_preview": True
+        })
 
     # --- Mise à jour des valeurs (toujours, même si rien n’a changé) ---
-    time_now = await t_now()
-    w = app_globals.app_results[node_name]['wallets'][wallet_address]
-    w['last_status'] = True
-    w['last_update'] = time_now
-    w['final_balance'] = wallet_final_balance
-    w['candidate_rolls'] = wallet_candidate_rolls
-    w['active_rolls'] = wallet_active_rolls
-    w['missed_blocks'] = wallet_missed_blocks
-    w['produced_blocks'] = wallet_operated_blocks
-    w['last_result'] = wallet_result
-
-    # Ajout au stat historique
-    final_cycle = wallet_cycle_infos[-2] if len(wallet_cycle_infos) > 1 else wallet_cycle_infos[-1]
-    wallet_last_cycle = final_cycle.get("cycle", 0)
-    wallet_last_cycle_operated_blocks = final_cycle.get("ok_count", 0)
-    wallet_last_cycle_missed_blocks = final_cycle.get("nok_count", 0)
-
-    w['stat'].append({
-        "time": time_now,
-        "cycle": wallet_last_cycle,
-        "balance": wallet_final_balance,
-        "rolls": wallet_active_rolls,
-        "total_rolls": app_globals.massa_network['values']['total_staked_rolls'],
-        "ok_blocks": wallet_last_cycle_operated_blocks,
-        "nok_blocks": wallet_last_cycle_missed_blocks,
-        "produced_blocks": wallet_operated_blocks
-    })
-
-    logger.info(f"[WALLET] Stat updated for wallet '{wallet_address}'@'{node_name}'")
+    set_results_fields(
+        target=prev,
+        fields={
+            "last_status": True,
+            "last_update": wallet_probe['time'],
+            "final_balance": wallet_final_balance,
+            "candidate_rolls": wallet_candidate_rolls,
+            "active_rolls": wallet_active_rolls,
+            "missed_blocks": wallet_missed_blocks,
+            "produced_blocks": wallet_operated_blocks,
+            "last_result": wallet_probe['answer']
+        },
+        node_name=node_name,
+        wallet_address=wallet_address
+    )
+
+    # Historique 'stat' : une mesure par cycle clôturé, ajoutée par remotes/cycles.py
+    logger.info(f"[WALLET] Values updated for wallet '{wallet_address}'@'{node_name}'")
+    return wallet_alerts
+
+@logger.catch
+async def check_wallet(node_name: str="", wallet_address: str="") -> None:
+    """Vérification isolée d'un wallet : probe hors verrou, application sous verrou court, alertes après."""
+    logger.debug(f"[WALLET] -> check_wallet")
+
+    wallet_probe = await probe_wallet(node_name=node_name, wallet_address=wallet_address)
+    async with app_globals.results_lock:
+        wallet_alerts = apply_wallet_probe(wallet_probe=wallet_probe)
+    for wallet_alert in wallet_alerts:
+        await send_alert(**wallet_alert)
     return
 
+
 if __name__ == "__main__":
     pass
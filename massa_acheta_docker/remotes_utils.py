@@ -1,14 +1,115 @@
 # massa_acheta_docker/remotes_utils.py
 from loguru import logger
 import aiohttp
+import asyncio
 import json
-from time import time
+from time import time, monotonic
 from pathlib import Path
-import requests
+from urllib.parse import urlsplit
 import traceback
+import os
 
 from app_config import app_config
 import app_globals
+from remotes.limiter import node_slot
+from remotes.breaker import breaker_allow_request, breaker_record_result, breaker_release_probe
+from remotes.deadline import get_remaining_budget, get_call_timeout, get_late_result, is_late
+from remotes.endpoints import record_endpoint_result, select_node_endpoints, get_endpoint_p95, endpoint_stats
+from remotes.credits import publish_credits_index
+from remotes.store import (
+    is_store_enabled, store_execute, build_results_statements, build_samples_statements, build_credits_statements,
+    build_prune_statements, SERIES_WALLET_STAT, SERIES_NETWORK_STAT
+)
+from remotes.timeseries import ROLLUP_TIERS, get_closed_rollups, get_tier_series, get_tier_retention_sec
+from remotes.persistence import register_persistence, write_json_file, write_store_statements
+
+# --- Sessions HTTP partagées, une par endpoint (scheme://host:port) ---
+_http_sessions = {}
+_http_sessions_lock = asyncio.Lock()
+
+def get_endpoint_key(api_url: str="") -> str:
+    url_parts = urlsplit(api_url)
+    return f"{url_parts.scheme}://{url_parts.netloc}"
+
+async def get_http_session(api_url: str="", api_session_timeout: int=app_config['service']['http_session_timeout_sec']) -> aiohttp.ClientSession:
+    endpoint_key = get_endpoint_key(api_url=api_url)
+
+    session = _http_sessions.get(endpoint_key, None)
+    if session is not None and not session.closed:
+        return session
+
+    async with _http_sessions_lock:
+        session = _http_sessions.get(endpoint_key, None)
+        if session is not None and not session.closed:
+            return session
+
+        connector = aiohttp.TCPConnector(
+            limit=app_config['service']['http_pool_limit_total'],
+            limit_per_host=app_config['service']['http_pool_limit_per_host'],
+            keepalive_timeout=app_config['service']['http_keepalive_timeout_sec'],
+            ttl_dns_cache=app_config['service']['http_dns_cache_ttl_sec'],
+            use_dns_cache=True
+        )
+        session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=api_session_timeout)
+        )
+        _http_sessions[endpoint_key] = session
+        logger.info(f"[REMOTES] Opened new HTTP session for endpoint '{endpoint_key}' ({len(_http_sessions)} session(s) in pool)")
+        return session
+
+async def close_http_sessions() -> None:
+    logger.debug(f"[REMOTES] -> close_http_sessions")
+
+    async with _http_sessions_lock:
+        for endpoint_key, session in list(_http_sessions.items()):
+            try:
+                if not session.closed:
+                    await session.close()
+            except Exception as E:
+                logger.warning(f"[REMOTES] Cannot close HTTP session for endpoint '{endpoint_key}' ({str(E)})")
+        _http_sessions.clear()
+
+    # Laisse aiohttp fermer proprement les transports SSL
+    await asyncio.sleep(0.250)
+    logger.info(f"[REMOTES] All HTTP sessions closed")
+
+# --- Single-flight : une seule requête réseau pour des appels identiques concurrents ---
+_http_inflight = {}
+_http_results_cache = {}
+http_singleflight_stats = {
+    "calls": 0,
+    "network_calls": 0,
+    "deduplicated": 0,
+    "cache_hits": 0,
+    "fast_failed": 0,
+    "late": 0
+}
+
+def get_http_request_key(api_url: str=None, api_method: str="GET", api_payload: object={}, api_content_type: str="application/json", api_root_element: str=None) -> tuple:
+    if isinstance(api_payload, str):
+        payload_key = api_payload
+    else:
+        payload_key = json.dumps(obj=api_payload, sort_keys=True)
+    return (api_url, api_method, payload_key, api_content_type, api_root_element)
+
+def get_http_stats() -> dict:
+    return dict(
+        http_singleflight_stats,
+        inflight=len(_http_inflight),
+        cached=len(_http_results_cache),
+        sessions=len(_http_sessions)
+    )
+
+def cache_http_result(request_key: tuple=(), api_result: object=None, api_cache_ttl: float=0) -> None:
+    """Garde un résultat réussi api_cache_ttl secondes (entrées expirées purgées au passage)."""
+    if api_cache_ttl <= 0 or not isinstance(api_result, dict) or "result" not in api_result:
+        return
+    time_now = time()
+    for cached_key, (cached_time, _) in list(_http_results_cache.items()):
+        if time_now - cached_time > api_cache_ttl:
+            _http_results_cache.pop(cached_key, None)
+    _http_results_cache[request_key] = (time_now, api_result)
 
 @logger.catch
 async def pull_http_api(api_url: str=None,
@@ -18,46 +119,169 @@ async def pull_http_api(api_url: str=None,
                         api_content_type: str="application/json",
                         api_root_element: str=None,
                         api_session_timeout: int=app_config['service']['http_session_timeout_sec'],
-                        api_probe_timeout: int=app_config['service']['http_probe_timeout_sec']) -> object:
-
+                        api_probe_timeout: int=app_config['service']['http_probe_timeout_sec'],
+                        api_cache_ttl: float=None) -> object:
+    """
+    Les appels identiques (url, méthode, payload) en vol partagent un seul appel réseau
+    et le même résultat décodé (à ne pas modifier). Un résultat réussi reste servi pendant
+    api_cache_ttl secondes (http_singleflight_ttl_sec par défaut, 0 = pas de cache).
+    Dans un tick (remotes/deadline.py), l'appel hérite du budget restant : s'il ne peut pas
+    finir à temps, il retourne {"error": ..., "late": True} au lieu de bloquer le tick suivant.
+    La requête abandonnée continue en arrière-plan et, si elle réussit, alimente le cache.
+    Un appel qui rejoint une requête en vol attend au plus son propre budget, mais la requête
+    partagée garde le timeout réseau calculé sur le budget du premier appelant : si celui-ci est
+    plus court, l'appel qui la rejoint reçoit ce même résultat "late" ou d'erreur.
+    """
     logger.debug(f"[REMOTES] -> pull_http_api")
 
-    api_session_timeout = aiohttp.ClientTimeout(total=api_session_timeout)
+    if api_cache_ttl is None:
+        api_cache_ttl = app_config['service']['http_singleflight_ttl_sec']
+
+    http_singleflight_stats['calls'] += 1
+    request_key = get_http_request_key(
+        api_url=api_url,
+        api_method=api_method,
+        api_payload=api_payload,
+        api_content_type=api_content_type,
+        api_root_element=api_root_element
+    )
+
+    if api_cache_ttl > 0:
+        cached_result = _http_results_cache.get(request_key, None)
+        if cached_result is not None:
+            cached_time, api_result = cached_result
+            if time() - cached_time <= api_cache_ttl:
+                http_singleflight_stats['cache_hits'] += 1
+                return api_result
+            _http_results_cache.pop(request_key, None)
+
+    remaining_budget = get_remaining_budget()
+    if remaining_budget is not None and remaining_budget <= 0:
+        http_singleflight_stats['late'] += 1
+        return get_late_result(what=f"call to '{api_url}'")
+
+    inflight_task = _http_inflight.get(request_key, None)
+    if inflight_task is not None:
+        http_singleflight_stats['deduplicated'] += 1
+        logger.debug(f"[REMOTES] Joined in-flight request to '{api_url}'")
+        try:
+            return await asyncio.wait_for(asyncio.shield(inflight_task), timeout=get_call_timeout())
+        except asyncio.TimeoutError:
+            http_singleflight_stats['late'] += 1
+            return get_late_result(what=f"call to '{api_url}'")
+
+    # Node considéré mort : échec immédiat au lieu d'attendre api_probe_timeout
+    if not breaker_allow_request(node_url=api_url):
+        http_singleflight_stats['fast_failed'] += 1
+        logger.debug(f"[REMOTES] Circuit open for '{api_url}', fast-failing")
+        return {"error": f"Circuit open for '{api_url}' (node considered down)"}
+
+    async def fetch_http_api_limited() -> object:
+        api_result = {"error": "No response from remote HTTP API"}
+        try:
+            # Chaque appel réseau passe par le limiteur du node (concurrence + req/s adaptatifs)
+            async with node_slot(endpoint_key=get_endpoint_key(api_url=api_url)) as slot:
+                start_time = monotonic()
+                api_result = await fetch_http_api(
+                    api_url=api_url,
+                    api_method=api_method,
+                    api_header=api_header,
+                    api_payload=api_payload,
+                    api_content_type=api_content_type,
+                    api_root_element=api_root_element,
+                    api_session_timeout=api_session_timeout,
+                    api_probe_timeout=get_call_timeout(timeout=api_probe_timeout)
+                )
+                slot['success'] = isinstance(api_result, dict) and "result" in api_result
+                record_endpoint_result(
+                    api_url=api_url,
+                    latency=monotonic() - start_time,
+                    success=isinstance(api_result, dict) and not isinstance(api_result.get("error", None), str)
+                )
+        finally:
+            node_answered = isinstance(api_result, dict) and not isinstance(api_result.get("error", None), str)
+            budget_left = get_remaining_budget()
+            if not node_answered and budget_left is not None and budget_left <= 0:
+                # Coupé par le budget du tick : ne dit rien de la santé du node
+                breaker_release_probe(node_url=api_url)
+            else:
+                # Une erreur JSON-RPC (dict) vient d'un node vivant : seuls les échecs transport comptent
+                breaker_record_result(node_url=api_url, success=node_answered)
+        return api_result
+
+    inflight_task = asyncio.create_task(fetch_http_api_limited())
+    _http_inflight[request_key] = inflight_task
+    http_singleflight_stats['network_calls'] += 1
+
+    try:
+        api_result = await asyncio.wait_for(asyncio.shield(inflight_task), timeout=get_call_timeout())
+    except asyncio.TimeoutError:
+        # La requête continue en arrière-plan : un résultat réussi arrivé en retard alimente le cache
+        http_singleflight_stats['late'] += 1
+        api_result = get_late_result(what=f"call to '{api_url}'")
+
+        def cache_late_result(task: asyncio.Task) -> None:
+            if task.cancelled() or task.exception() is not None:
+                return
+            cache_http_result(request_key=request_key, api_result=task.result(), api_cache_ttl=api_cache_ttl)
+
+        inflight_task.add_done_callback(cache_late_result)
+    finally:
+        if inflight_task.done():
+            _http_inflight.pop(request_key, None)
+        else:
+            # L'appelant a été annulé : on libère la clé quand la requête se termine
+            inflight_task.add_done_callback(lambda _: _http_inflight.pop(request_key, None))
+
+    cache_http_result(request_key=request_key, api_result=api_result, api_cache_ttl=api_cache_ttl)
+    return api_result
+
+async def fetch_http_api(api_url: str=None,
+                         api_method: str="GET",
+                         api_header: object={"Content-Type": "application/json"},
+                         api_payload: object={},
+                         api_content_type: str="application/json",
+                         api_root_element: str=None,
+                         api_session_timeout: int=app_config['service']['http_session_timeout_sec'],
+                         api_probe_timeout: int=app_config['service']['http_probe_timeout_sec']) -> object:
+
+    logger.debug(f"[REMOTES] -> fetch_http_api")
+
     api_probe_timeout = aiohttp.ClientTimeout(total=api_probe_timeout)
 
     api_response_text = "No response from remote HTTP API"
     api_response_obj = {"error": "No response from remote HTTP API"}
 
     try:
-        async with aiohttp.ClientSession(timeout=api_session_timeout) as session:
-            if api_method == "GET":
-                async with session.get(url=api_url, headers=api_header, timeout=api_probe_timeout) as api_response:
-                    if api_response.status != 200:
-                        raise Exception(f"Remote HTTP API Error '{str(api_response.status)}'")
-                    if api_response.content_type != api_content_type:
-                        raise Exception(f"Remote HTTP API wrong content type '{str(api_response.content_type)}'")
-                    api_response_text = await api_response.text()
-            elif api_method == "POST":
-              # payload : str (déjà json.dumps) ou dict (idéalement)
-              if isinstance(api_payload, str):
-                  post_args = dict(data=api_payload)
-              else:
-                  post_args = dict(json=api_payload)
-
-              logger.debug(f"API POST to {api_url}: type={type(api_payload)}, payload={api_payload}")
-              async with session.post(
-                  url=api_url,
-                  headers=api_header,
-                  timeout=api_probe_timeout,
-                  **post_args
-              ) as api_response:
-                    if api_response.status != 200:
-                        raise Exception(f"Remote HTTP API Error '{str(api_response.status)}'")
-                    if api_response.content_type != api_content_type:
-                        raise Exception(f"Remote API wrong content type '{str(api_response.content_type)}'")
-                    api_response_text = await api_response.text()
+        session = await get_http_session(api_url=api_url, api_session_timeout=api_session_timeout)
+        if api_method == "GET":
+            async with session.get(url=api_url, headers=api_header, timeout=api_probe_timeout) as api_response:
+                if api_response.status != 200:
+                    raise Exception(f"Remote HTTP API Error '{str(api_response.status)}'")
+                if api_response.content_type != api_content_type:
+                    raise Exception(f"Remote HTTP API wrong content type '{str(api_response.content_type)}'")
+                api_response_text = await api_response.text()
+        elif api_method == "POST":
+            # payload : str (déjà json.dumps) ou dict (idéalement)
+            if isinstance(api_payload, str):
+                post_args = dict(data=api_payload)
             else:
-                raise Exception(f"Unknown HTTP API method '{api_method}'")
+                post_args = dict(json=api_payload)
+
+            logger.debug(f"API POST to {api_url}: type={type(api_payload)}, payload={api_payload}")
+            async with session.post(
+                url=api_url,
+                headers=api_header,
+                timeout=api_probe_timeout,
+                **post_args
+            ) as api_response:
+                if api_response.status != 200:
+                    raise Exception(f"Remote HTTP API Error '{str(api_response.status)}'")
+                if api_response.content_type != api_content_type:
+                    raise Exception(f"Remote API wrong content type '{str(api_response.content_type)}'")
+                api_response_text = await api_response.text()
+        else:
+            raise Exception(f"Unknown HTTP API method '{api_method}'")
 
         if api_content_type == "application/json":
             api_response_obj = json.loads(s=api_response_text)
@@ -88,99 +312,412 @@ async def pull_http_api(api_url: str=None,
         return api_result
 
 @logger.catch
-def save_app_results() -> bool:
-    logger.debug(f"[REMOTES] -> save_app_results")
+async def pull_node_api(node_name: str="", read_only: bool=False, api_hedge: bool=None, **pull_args) -> object:
+    """
+    pull_http_api vers le meilleur endpoint du node (le plus rapide parmi les sains).
+    En cas d'échec transport, bascule sur l'endpoint suivant. Si api_hedge, la même requête
+    est doublée vers le deuxième endpoint quand le premier dépasse son p95 : la première réponse gagne.
+    read_only: autorise le repli sur mainnet_rpc_url (données publiques des wallets).
+    """
+    logger.debug(f"[REMOTES] -> pull_node_api")
 
-    composed_results = {}
+    if api_hedge is None:
+        api_hedge = app_config['service']['node_hedge_enabled']
+
+    node_endpoints = select_node_endpoints(node_name=node_name, read_only=read_only)
+    if not node_endpoints:
+        return {"error": f"No RPC endpoint configured for node '{node_name}'"}
 
+    pending_tasks = {}
+    next_endpoint = 0
+    hedge_delay = get_endpoint_p95(api_url=node_endpoints[0]) if api_hedge else None
+    hedged_url = None
+    api_result = {"error": f"No response from node '{node_name}'"}
+
+    def launch_next() -> None:
+        nonlocal next_endpoint
+        api_url = node_endpoints[next_endpoint]
+        next_endpoint += 1
+        pending_tasks[asyncio.create_task(pull_http_api(api_url=api_url, **pull_args))] = api_url
+
+    launch_next()
     try:
-        for node_name, node_data in app_globals.app_results.items():
-            composed_results[node_name] = {}
-            # Save node static and dynamic fields (except stats)
-            for field in [
-                "url",
+        while pending_tasks:
+            wait_timeout = hedge_delay if next_endpoint == 1 and next_endpoint < len(node_endpoints) else None
+            done_tasks, _ = await asyncio.wait(pending_tasks.keys(), timeout=wait_timeout, return_when=asyncio.FIRST_COMPLETED)
+
+            if not done_tasks:
+                # Premier endpoint plus lent que son p95 : requête doublée vers le suivant
+                endpoint_stats['hedged'] += 1
+                hedged_url = node_endpoints[next_endpoint]
+                logger.debug(f"[REMOTES] Hedging request for node '{node_name}' to '{hedged_url}'")
+                launch_next()
+                continue
+
+            for done_task in done_tasks:
+                api_url = pending_tasks.pop(done_task)
+                api_result = done_task.result()
+                node_answered = isinstance(api_result, dict) and not isinstance(api_result.get("error", None), str)
+                if node_answered or is_late(api_result):
+                    if node_answered and api_url == hedged_url:
+                        endpoint_stats['hedge_wins'] += 1
+                    return api_result
+
+            if not pending_tasks and next_endpoint < len(node_endpoints):
+                endpoint_stats['failovers'] += 1
+                logger.info(f"[REMOTES] Node '{node_name}' failing over to '{node_endpoints[next_endpoint]}'")
+                launch_next()
+
+    finally:
+        for pending_task in pending_tasks:
+            pending_task.cancel()
+
+    return api_result
+
+def get_node_read_url(node_name: str="") -> str:
+    """Endpoint préféré du node pour les lectures (batchs JSON-RPC des watchers)."""
+    node_endpoints = select_node_endpoints(node_name=node_name, read_only=True)
+    return node_endpoints[0] if node_endpoints else app_config['service']['mainnet_rpc_url']
+
+@logger.catch
+async def pull_http_api_batch(api_url: str=None,
+                              api_calls: list=[],
+                              api_probe_timeout: int=app_config['service']['http_probe_timeout_sec']) -> list:
+    """
+    Envoie plusieurs appels JSON-RPC dans un seul POST (tableau batch).
+    api_calls: liste de (method, params).
+    Retourne une liste alignée sur api_calls, chaque élément valant {"result": ...} ou {"error": ...}.
+    """
+    logger.debug(f"[REMOTES] -> pull_http_api_batch")
+
+    batch_results = [{"error": "No response from remote HTTP API"} for _ in api_calls]
+    if not api_calls:
+        return batch_results
+
+    batch_max_calls = app_config['service']['rpc_batch_max_calls']
+    batch_chunks = [
+        list(range(chunk_start, min(chunk_start + batch_max_calls, len(api_calls))))
+        for chunk_start in range(0, len(api_calls), batch_max_calls)
+    ]
+
+    async def pull_chunk(call_ids: list) -> None:
+        batch_payload = [
+            {
+                "jsonrpc": "2.0",
+                "id": call_id,
+                "method": api_calls[call_id][0],
+                "params": api_calls[call_id][1]
+            }
+            for call_id in call_ids
+        ]
+        batch_answer = await pull_http_api(
+            api_url=api_url,
+            api_method="POST",
+            api_payload=batch_payload,
+            api_probe_timeout=api_probe_timeout
+        )
+        if not batch_answer or "result" not in batch_answer:
+            batch_error = batch_answer.get("error", "No response from remote HTTP API") if batch_answer else "No response from remote HTTP API"
+            for call_id in call_ids:
+                batch_results[call_id] = dict(batch_answer, error=batch_error) if batch_answer else {"error": batch_error}
+            return
+
+        batch_response = batch_answer['result']
+        if not isinstance(batch_response, list):
+            # Le node a répondu par un objet unique (batch refusé ou erreur globale)
+            batch_error = batch_response.get("error", batch_response) if isinstance(batch_response, dict) else batch_response
+            for call_id in call_ids:
+                batch_results[call_id] = {"error": batch_error}
+            return
+
+        answered_ids = set()
+        for call_answer in batch_response:
+            if not isinstance(call_answer, dict):
+                continue
+            call_id = call_answer.get("id", None)
+            if call_id not in call_ids:
+                logger.warning(f"[REMOTES] Unexpected id '{call_id}' in JSON-RPC batch answer from '{api_url}'")
+                continue
+            answered_ids.add(call_id)
+            if "result" in call_answer:
+                batch_results[call_id] = {"result": call_answer['result']}
+            else:
+                batch_results[call_id] = {"error": call_answer.get("error", f"No result for call '{api_calls[call_id][0]}'")}
+
+        for call_id in call_ids:
+            if call_id not in answered_ids:
+                batch_results[call_id] = {"error": f"No answer for call id {call_id} ('{api_calls[call_id][0]}') in JSON-RPC batch"}
+
+    await asyncio.gather(*[pull_chunk(call_ids=call_ids) for call_ids in batch_chunks])
+
+    nb_errors = sum(1 for r in batch_results if "error" in r)
+    logger.info(f"[REMOTES] JSON-RPC batch to '{api_url}': {len(api_calls)} call(s), {nb_errors} error(s)")
+    return batch_results
+
+def compose_app_results(node_names: set=None) -> dict:
+    """
+    Champs persistés de app_results (sans les stats), à appeler sans await au milieu : vue cohérente.
+    node_names: limite la composition à ces nodes (sauvegarde des seules entrées modifiées).
+    """
+    composed_results = {}
+
+    for node_name, node_data in app_globals.app_results.items():
+        if node_names is not None and node_name not in node_names:
+            continue
+        composed_results[node_name] = {}
+        # Save node static and dynamic fields (except stats)
+        for field in [
+            "url",
+            "urls",
+            "last_status",
+            "last_update",
+            "start_time",
+            "last_chain_id",
+            "last_cycle",
+            "last_result",
+        ]:
+            composed_results[node_name][field] = node_data.get(field, None)
+
+        composed_results[node_name]["wallets"] = {}
+
+        for wallet_address, wallet_data in node_data.get("wallets", {}).items():
+            composed_results[node_name]["wallets"][wallet_address] = {}
+            for w_field in [
                 "last_status",
                 "last_update",
-                "start_time",
-                "last_chain_id",
+                "final_balance",
+                "candidate_rolls",
+                "active_rolls",
+                "missed_blocks",
                 "last_cycle",
+                "last_ok_count",
+                "last_nok_count",
+                "produced_blocks",
                 "last_result",
             ]:
-                composed_results[node_name][field] = node_data.get(field, None)
-
-            composed_results[node_name]["wallets"] = {}
-
-            for wallet_address, wallet_data in node_data.get("wallets", {}).items():
-                composed_results[node_name]["wallets"][wallet_address] = {}
-                for w_field in [
-                    "last_status",
-                    "last_update",
-                    "final_balance",
-                    "candidate_rolls",
-                    "active_rolls",
-                    "missed_blocks",
-                    "last_cycle",
-                    "last_ok_count",
-                    "last_nok_count",
-                    "produced_blocks",
-                    "last_result",
-                ]:
-                    composed_results[node_name]["wallets"][wallet_address][w_field] = wallet_data.get(
-                        w_field, None
-                    )
-
-        app_results_obj = Path(app_config['service']['results_path'])
-        with open(file=app_results_obj, mode="wt") as output_results:
-            output_results.write(json.dumps(obj=composed_results, indent=4))
+                composed_results[node_name]["wallets"][wallet_address][w_field] = wallet_data.get(
+                    w_field, None
+                )
+
+    return composed_results
+
+# Persistance de app_results : entrées (node, wallet) modifiées depuis la dernière écriture,
+# écritures regroupées (au plus une par results_flush_interval_sec), atomiques, hors boucle
+_results_persist = {
+    "dirty": set(),
+    "volatile": set(),
+    "last_flush": 0.0,
+    "flush_task": None,
+    "flushes": 0,
+    "coalesced": 0,
+    "last_flush_sec": 0.0
+}
+_results_flush_lock = asyncio.Lock()
+
+def mark_results_dirty(node_name: str="", wallet_address: str=None) -> None:
+    """wallet_address=None : le node et tous ses wallets (ajout, suppression, reset)."""
+    _results_persist['dirty'].add((node_name, wallet_address))
+
+# Champs rafraîchis à chaque passage (horodatage du probe, réponse brute) : mis à jour en mémoire sans
+# rendre l'entrée sale, écrits avec le prochain changement réel de l'entrée ou à l'arrêt du service
+VOLATILE_RESULTS_FIELDS = ("last_update", "last_result")
+
+def set_results_fields(target: dict={}, fields: dict={}, node_name: str="", wallet_address: str="") -> bool:
+    """Met à jour les champs d'un node / wallet ; l'entrée n'est à sauvegarder que si une valeur non volatile change."""
+    changed = False
+    volatile_changed = False
+    for field, value in fields.items():
+        if field not in target or target[field] != value:
+            target[field] = value
+            if field in VOLATILE_RESULTS_FIELDS:
+                volatile_changed = True
+            else:
+                changed = True
+    if changed:
+        _results_persist['dirty'].add((node_name, wallet_address))
+    elif volatile_changed:
+        _results_persist['volatile'].add((node_name, wallet_address))
+    return changed
+
+def get_results_persist_stats() -> dict:
+    return {k: v for k, v in _results_persist.items() if k not in ("dirty", "volatile", "flush_task")} | {
+        "pending": len(_results_persist['dirty']),
+        "volatile_pending": len(_results_persist['volatile'])
+    }
+
+def write_app_results(composed_results: dict={}) -> bool:
+    """Sérialise et écrit app_results.json de façon atomique (fichier temporaire + rename). Synchrone : thread."""
+    app_results_obj = Path(app_config['service']['results_path'])
+    tmp_results_obj = app_results_obj.with_name(app_results_obj.name + ".tmp")
+    try:
+        results_text = json.dumps(obj=composed_results, indent=4)
+        with open(file=tmp_results_obj, mode="wt") as output_results:
+            output_results.write(results_text)
             output_results.flush()
-                    
+            os.fsync(output_results.fileno())
+        os.replace(tmp_results_obj, app_results_obj)
+
     except BaseException as E:
         logger.error(f"[REMOTES] Cannot save app_results into '{app_results_obj}' file: ({str(E)})")
         return False
-        
+
     else:
         logger.info(f"[REMOTES] Successfully saved app_results into '{app_results_obj}' file!")
         return True
 
-@logger.catch
-def save_app_stat() -> bool:
-    logger.debug(f"[REMOTES] -> save_app_stat")
-
-    composed_results = {
-        "app_results": {},
-        "massa_network": {
-            "stat": []
-        }
-    }
-
-    for node_name in app_globals.app_results:
-        composed_results['app_results'][node_name] = {}
-
-        for wallet_address in app_globals.app_results[node_name]['wallets']:
-            composed_results['app_results'][node_name][wallet_address] = {
-                "stat": []
-            }
-
-            for measure in app_globals.app_results[node_name]['wallets'][wallet_address]['stat']:
-                composed_results['app_results'][node_name][wallet_address]['stat'].append(measure)
+def build_app_results_write(dirty_keys: set=None):
+    """
+    Prépare l'écriture (sans await : vue cohérente de app_results) et retourne (fonction, argument)
+    à exécuter dans un thread : fichier JSON complet, ou lignes modifiées seulement en base SQLite.
+    """
+    if is_store_enabled():
+        node_names = None if dirty_keys is None else {node_name for node_name, _ in dirty_keys}
+        statements = build_results_statements(
+            composed_results=compose_app_results(node_names=node_names),
+            dirty_keys=dirty_keys
+        )
+        return store_execute, statements
+    return write_app_results, compose_app_results()
 
-    for measure in app_globals.massa_network['stat']:
-        composed_results['massa_network']['stat'].append(measure)
+@logger.catch
+def save_app_results() -> bool:
+    """
+    Écriture immédiate et synchrone (création du fichier au démarrage, arrêt du service),
+    champs volatils compris.
+    """
+    logger.debug(f"[REMOTES] -> save_app_results")
 
+    dirty_keys = _results_persist['dirty'] | _results_persist['volatile']
+    if not dirty_keys and (is_store_enabled() or Path(app_config['service']['results_path']).exists()):
+        return True
+    _results_persist['dirty'] = set()
     try:
-        app_stat_obj = Path(app_config['service']['stat_path'])
-        with open(file=app_stat_obj, mode="wt") as output_stat:
-            output_stat.write(json.dumps(obj=composed_results, indent=4))
-            output_stat.flush()
-                    
+        write_func, write_arg = build_app_results_write(dirty_keys=dirty_keys)
     except BaseException as E:
-        logger.error(f"[REMOTES] Cannot save app_stat into '{app_stat_obj}' file: ({str(E)})")
+        logger.error(f"[REMOTES] Cannot compose app_results: ({str(E)})")
+        _results_persist['dirty'] |= dirty_keys
         return False
-        
+
+    saved = write_func(write_arg)
+    if saved:
+        _results_persist['volatile'] -= dirty_keys
     else:
-        logger.info(f"[REMOTES] Successfully saved app_stat into '{app_stat_obj}' file!")
+        _results_persist['dirty'] |= dirty_keys
+    return saved
+
+async def flush_app_results() -> bool:
+    """Écrit les entrées modifiées : composition dans la boucle, sérialisation et écriture dans un thread."""
+    async with _results_flush_lock:
+        dirty_keys = _results_persist['dirty']
+        if not dirty_keys:
+            return True
+        _results_persist['dirty'] = set()
+
+        time_start = monotonic()
+        try:
+            write_func, write_arg = build_app_results_write(dirty_keys=dirty_keys)
+            saved = await asyncio.to_thread(write_func, write_arg)
+        except BaseException as E:
+            logger.error(f"[REMOTES] Cannot save app_results: ({str(E)})")
+            saved = False
+
+        if saved:
+            # Entrées écrites avec leurs valeurs courantes, champs volatils compris
+            _results_persist['volatile'] -= dirty_keys
+        else:
+            # Rien de perdu : les entrées repartiront au prochain flush
+            _results_persist['dirty'] |= dirty_keys
+        _results_persist['last_flush'] = monotonic()
+        _results_persist['last_flush_sec'] = round(_results_persist['last_flush'] - time_start, 3)
+        _results_persist['flushes'] += 1
+        logger.debug(f"[REMOTES] app_results flush: {len(dirty_keys)} dirty entries in {_results_persist['last_flush_sec']}s")
+        return saved
+
+async def flush_app_results_later(delay_sec: float=0) -> None:
+    try:
+        await asyncio.sleep(delay_sec)
+        await flush_app_results()
+    finally:
+        _results_persist['flush_task'] = None
+
+async def save_app_results_async() -> bool:
+    """
+    Sauvegarde regroupée : rien à faire si aucune entrée n'a changé, écriture immédiate si la
+    précédente date de plus de results_flush_interval_sec, sinon un seul flush différé.
+    """
+    logger.debug(f"[REMOTES] -> save_app_results_async")
+
+    if not _results_persist['dirty']:
         return True
 
+    wait_sec = _results_persist['last_flush'] + app_config['service']['results_flush_interval_sec'] - monotonic()
+    if wait_sec <= 0 and _results_persist['flush_task'] is None:
+        return await flush_app_results()
+
+    _results_persist['coalesced'] += 1
+    if _results_persist['flush_task'] is None:
+        _results_persist['flush_task'] = asyncio.create_task(flush_app_results_later(delay_sec=max(wait_sec, 0)))
+    return True
+
+def build_stat_series_statements(series: str="", node_name: str="", wallet_address: str="", stat: list=[]) -> list:
+    """Mesures brutes et buckets figés (remotes/timeseries.py) pas encore écrits d'une série."""
+    statements = build_samples_statements(series=series, node_name=node_name, wallet_address=wallet_address, entries=stat)
+    closed_rollups = get_closed_rollups(series=series, node_name=node_name, wallet_address=wallet_address)
+    for tier in ROLLUP_TIERS:
+        statements += build_samples_statements(
+            series=get_tier_series(series=series, tier=tier),
+            node_name=node_name,
+            wallet_address=wallet_address,
+            entries=closed_rollups[tier]
+        )
+    return statements
+
+def collect_app_stat():
+    """
+    Collecteur "app_stat" de remotes/persistence.py : mesures et agrégats ajoutés depuis la dernière écriture,
+    puis purge des paliers expirés (SQLite), ou copie des stats wallets / réseau à sérialiser dans app_stat.json.
+    """
+    if is_store_enabled():
+        statements = build_stat_series_statements(series=SERIES_NETWORK_STAT, stat=app_globals.massa_network['stat'])
+        for node_name, node_data in app_globals.app_results.items():
+            for wallet_address, wallet_data in node_data['wallets'].items():
+                statements += build_stat_series_statements(
+                    series=SERIES_WALLET_STAT,
+                    node_name=node_name,
+                    wallet_address=wallet_address,
+                    stat=wallet_data['stat']
+                )
+        time_now = time()
+        for series in (SERIES_NETWORK_STAT, SERIES_WALLET_STAT):
+            for tier in ("raw", *ROLLUP_TIERS):
+                retention_sec = get_tier_retention_sec(tier=tier)
+                if retention_sec is not None:
+                    statements += build_prune_statements(series=get_tier_series(series=series, tier=tier), before_time=time_now - retention_sec)
+        return write_store_statements, (statements,)
+
+    def compose_stat(stat: list=[], **series_key) -> dict:
+        closed_rollups = get_closed_rollups(**series_key)
+        return {"stat": list(stat)} | {f"stat_{tier}": list(closed_rollups[tier]) for tier in ROLLUP_TIERS}
+
+    composed_results = {
+        "app_results": {
+            node_name: {
+                wallet_address: compose_stat(
+                    stat=wallet_data['stat'],
+                    series=SERIES_WALLET_STAT,
+                    node_name=node_name,
+                    wallet_address=wallet_address
+                )
+                for wallet_address, wallet_data in node_data['wallets'].items()
+            }
+            for node_name, node_data in app_globals.app_results.items()
+        },
+        "massa_network": compose_stat(stat=app_globals.massa_network['stat'], series=SERIES_NETWORK_STAT)
+    }
+    return write_json_file, (app_config['service']['stat_path'], composed_results)
+
+register_persistence(name="app_stat", collect_func=collect_app_stat)
+
 @logger.catch
 async def t_now() -> int:
     logger.debug(f"[REMOTES] -> t_now")
@@ -311,65 +848,97 @@ async def get_rewards_blocks_cycle(rolls_number: int=0, total_rolls: int=0) -> f
 
     return my_blocks
 
-import requests
+@logger.catch
+def normalize_deferred_credits(raw_credits: object=[]) -> list:
+    # Correction si le format est dict au lieu de liste (compatibilité Massa node)
+    if isinstance(raw_credits, dict):
+        credits_list = []
+        for period, values in raw_credits.items():
+            for value in values:
+                credit = value.copy()
+                credit["period"] = period  # Ajout utile si nécessaire
+                credits_list.append(credit)
+        return credits_list
+    return list(raw_credits or [])
+
+def write_deferred_credits(all_credits: dict={}, previous_credits: dict={}) -> None:
+    if is_store_enabled():
+        # Base SQLite : seuls les wallets dont les crédits ont changé sont réécrits
+        if not store_execute(statements=build_credits_statements(all_credits=all_credits, previous_credits=previous_credits)):
+            raise Exception("SQLite store write failed")
+        return
+    write_json_file(app_config['service']['deferred_credits_path'], all_credits)
 
 @logger.catch
-def update_deferred_credits_from_node():
+async def update_deferred_credits_from_node() -> bool:
     """
-    Récupère les crédits différés pour tous les wallets présents dans app_globals.app_results
-    et sauvegarde deferred_credits.json au format attendu.
+    Récupère les crédits différés de tous les wallets (adresses uniques) via get_addresses en batch
+    sur mainnet_rpc_url, compare avec app_globals.deferred_credits et ne publie / sauvegarde
+    deferred_credits.json que si quelque chose a changé.
+    Retourne True si les crédits ont changé et ont été sauvegardés.
     """
-    RPC_URL = app_config['service']['mainnet_rpc_url']  # ex : "http://127.0.0.1:33035"
-    OUTPUT_PATH = app_config['service']['deferred_credits_path']  # ex : "deferred_credits.json"
+    logger.debug(f"[REMOTES] -> update_deferred_credits_from_node")
 
-    # Collecte toutes les adresses wallet du projet
+    # Collecte toutes les adresses wallet du projet (unicité, ordre stable)
     wallets = []
-    for node_data in app_globals.app_results.values():
-        if 'wallets' in node_data:
-            wallets.extend(node_data['wallets'].keys())
-    wallets = list(set(wallets))  # unicité
-
-    all_credits = {}
-    for addr in wallets:
-        payload = {
-            "jsonrpc": "2.0",
-            "method": "get_addresses",
-            "params": [[addr]],
-            "id": 0
-        }
-        try:
-            response = requests.post(RPC_URL, json=payload, timeout=5)
-            response.raise_for_status()
-            result = response.json()
-            if "error" in result:
-                logger.error(f"[REMOTES] Erreur RPC pour {addr}: {result['error']}")
-                all_credits[addr] = []
-            else:
-                raw_credits = result['result'][0].get('deferred_credits', [])
-                # Correction si le format est dict au lieu de liste (compatibilité Massa node)
-                if isinstance(raw_credits, dict):
-                    credits_list = []
-                    for period, values in raw_credits.items():
-                        for value in values:
-                            credit = value.copy()
-                            credit["period"] = period  # Ajout utile si nécessaire
-                            credits_list.append(credit)
-                    all_credits[addr] = credits_list
-                else:
-                    all_credits[addr] = raw_credits
-        except Exception as e:
-            logger.error(f"[REMOTES] Exception pour {addr}: {e}")
-            all_credits[addr] = []
+    for node_data in list(app_globals.app_results.values()):
+        for wallet_address in node_data.get('wallets', {}):
+            if wallet_address not in wallets:
+                wallets.append(wallet_address)
+    if not wallets:
+        return False
+
+    batch_max_calls = app_config['service']['rpc_batch_max_calls']
+    wallet_chunks = [wallets[i:i + batch_max_calls] for i in range(0, len(wallets), batch_max_calls)]
+    chunk_answers = await asyncio.gather(
+        *[
+            pull_http_api(
+                api_url=app_config['service']['mainnet_rpc_url'],
+                api_method="POST",
+                api_payload={
+                    "jsonrpc": "2.0",
+                    "id": 0,
+                    "method": "get_addresses",
+                    "params": [wallet_chunk]
+                },
+                api_root_element="result"
+            )
+            for wallet_chunk in wallet_chunks
+        ]
+    )
+
+    # On part des crédits connus : une adresse non reçue garde sa dernière valeur
+    previous_credits = app_globals.deferred_credits
+    all_credits = {addr: previous_credits[addr] for addr in wallets if addr in previous_credits}
+    nb_received = 0
+    for wallet_chunk, chunk_answer in zip(wallet_chunks, chunk_answers):
+        chunk_result = chunk_answer.get("result", None) if chunk_answer else None
+        if not isinstance(chunk_result, list):
+            logger.error(f"[REMOTES] Erreur RPC get_addresses pour {len(wallet_chunk)} wallet(s): {chunk_answer.get('error', chunk_answer) if chunk_answer else 'no answer'}")
+            continue
+        for address_info in chunk_result:
+            if not isinstance(address_info, dict) or address_info.get("address", None) not in wallet_chunk:
+                continue
+            all_credits[address_info['address']] = normalize_deferred_credits(raw_credits=address_info.get("deferred_credits", []))
+            nb_received += 1
+
+    if all_credits == previous_credits:
+        logger.info(f"[REMOTES] Deferred credits unchanged ({nb_received}/{len(wallets)} wallet(s) received)")
+        return False
 
-    # Sauvegarde le fichier au format attendu
+    # Sauvegarde d'abord : en cas d'échec rien n'est publié, le prochain refresh voit encore
+    # la différence et réessaie l'écriture
     try:
-        with open(OUTPUT_PATH, "w") as f:
-            json.dump(all_credits, f, indent=4)
+        await asyncio.to_thread(write_deferred_credits, all_credits, previous_credits)
         logger.info(f"[REMOTES] ✅ deferred_credits.json mis à jour avec {len(all_credits)} wallet(s) !")
     except Exception as e:
-        logger.error(f"[REMOTES] Erreur lors de la sauvegarde du fichier {OUTPUT_PATH}: {e}")
-
+        logger.error(f"[REMOTES] Erreur lors de la sauvegarde du fichier {app_config['service']['deferred_credits_path']}: {e}")
+        return False
 
+    # Publication atomique : les lecteurs voient l'ancien ou le nouveau dict, jamais un mélange
+    app_globals.deferred_credits = all_credits
+    publish_credits_index(deferred_credits=all_credits)
+    return True
 
 if __name__ == "__main__":
     pass
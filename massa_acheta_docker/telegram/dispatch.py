@@ -13,6 +13,7 @@ from telegram.handlers.delete_node import cmd_delete_node
 from telegram.handlers.delete_wallet import cmd_delete_wallet
 from telegram.handlers.massa_info import cmd_massa_info
 from telegram.handlers.massa_chart import cmd_massa_chart
+from telegram.handlers.view_stakers import cmd_view_stakers
 from telegram.handlers.acheta_release import cmd_acheta_release
 from telegram.handlers.view_id import cmd_view_id
 from telegram.handlers.cancel import cmd_cancel
@@ -50,6 +51,8 @@ async def dispatch_command(cmd: str, msg, state: FSMContext):
         await cmd_massa_info(msg, state) 
     elif cmd == "/massa_chart":
         await cmd_massa_chart(msg, state)
+    elif cmd == "/view_stakers":
+        await cmd_view_stakers(msg, state)
     elif cmd == "/acheta_release":
         await cmd_acheta_release(msg, state)
     elif cmd == "/view_id":
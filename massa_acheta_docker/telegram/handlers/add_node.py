@@ -10,6 +10,7 @@ from aiogram.fsm.state import State, StatesGroup
 from app_config import app_config
 import app_globals
 from remotes.node import check_node
+from remotes_utils import mark_results_dirty, save_app_results_async
 from telegram.menu_utils import build_menu_keyboard
 
 class NodeAdder(StatesGroup):
@@ -59,7 +60,8 @@ async def input_nodename_to_add(message: Message, state: FSMContext) -> None:
         await message.reply(
             text=(
                 f"❓ Please enter API URL for the new node {node_name} with leading http(s)://... or /cancel to quit.\n"
-                "☝ Typically API URL looks like: http://ip.ad.dre.ss:33035/api/v2"
+                "☝ Typically API URL looks like: http://ip.ad.dre.ss:33035/api/v2\n"
+                "🔀 Several endpoints for the same node (LAN, public IP...) can be given separated by spaces."
             ),
             parse_mode="HTML",
             reply_markup=build_menu_keyboard(),
@@ -78,7 +80,11 @@ async def add_node(message: Message, state: FSMContext) -> None:
     try:
         user_state = await state.get_data()
         node_name = user_state['node_name']
-        node_url = message.text.strip()
+        node_urls = []
+        for node_url in message.text.replace(",", " ").split():
+            if node_url.startswith("http") and node_url not in node_urls:
+                node_urls.append(node_url)
+        node_url = node_urls[0]
     except Exception as e:
         logger.error(f"[ADD_NODE] Cannot read state: {e}")
         await state.clear()
@@ -89,15 +95,19 @@ async def add_node(message: Message, state: FSMContext) -> None:
         async with app_globals.results_lock:
             app_globals.app_results[node_name] = {
                 'url': node_url,
+                'urls': node_urls[1:],
                 'last_status': "unknown",
                 'last_update': 0,
                 'start_time': 0,
                 'last_result': {"unknown": "Never updated before"},
                 'wallets': {}
             }
+            mark_results_dirty(node_name=node_name)
+        # Écriture regroupée, hors verrou
+        await save_app_results_async()
         await message.reply(
             text=(
-                f"✅ Successfully added node <b>{node_name}</b> with API URL: <code>{node_url}</code>\n"
+                f"✅ Successfully added node <b>{node_name}</b> with API URL: <code>{' '.join(node_urls)}</code>\n"
                 "👁 Please note that bot will update info for this node a bit later.\n"
                 "☝️ You can add wallet to node using /add_wallet command."
             ),
@@ -121,7 +131,7 @@ async def add_node(message: Message, state: FSMContext) -> None:
     # Lance check_node pour peupler les infos du node tout de suite
     try:
         if app_globals.app_results[node_name]['last_status'] != True:
-            async with app_globals.results_lock:
-                await asyncio.gather(check_node(node_name=node_name))
+            # check_node ne prend results_lock que pour appliquer le résultat
+            await check_node(node_name=node_name)
     except Exception as e:
         logger.warning(f"[ADD_NODE] check_node failed after node add: {e}")
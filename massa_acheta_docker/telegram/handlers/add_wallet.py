@@ -14,7 +14,7 @@ import app_globals
 
 from remotes.wallet import check_wallet
 from telegram.keyboards.kb_nodes import kb_nodes
-from remotes_utils import get_short_address, save_app_results
+from remotes_utils import get_short_address, mark_results_dirty, save_app_results_async
 from telegram.menu_utils import build_menu_keyboard
 
 class WalletAdder(StatesGroup):
@@ -137,13 +137,11 @@ async def add_wallet(message: Message, state: FSMContext) -> None:
                 'last_status': "unknown",
                 'last_update': 0,
                 'last_result': {"unknown": "Never updated before"},
-                'stat': deque(
-                    maxlen=int(
-                        24 * 60 / app_config['service']['main_loop_period_min']
-                    )
-                )
+                'stat': deque()
             }
-            save_app_results()
+            mark_results_dirty(node_name=node_name, wallet_address=wallet_address)
+        # Écriture regroupée, hors verrou
+        await save_app_results_async()
 
     except Exception as E:
         short_addr = await get_short_address(wallet_address)
@@ -185,5 +183,5 @@ async def add_wallet(message: Message, state: FSMContext) -> None:
     await state.clear()
 
     if app_globals.app_results[node_name]['wallets'][wallet_address]['last_status'] != True:
-        async with app_globals.results_lock:
-            await asyncio.gather(check_wallet(node_name=node_name, wallet_address=wallet_address))
+        # check_wallet ne prend results_lock que pour appliquer le résultat
+        await check_wallet(node_name=node_name, wallet_address=wallet_address)
@@ -13,7 +13,9 @@ import app_globals
 
 from telegram.keyboards.kb_nodes import kb_nodes
 from telegram.keyboards.kb_wallets import kb_wallets
-from remotes_utils import get_short_address, get_rewards_mas_day, get_rewards_blocks_cycle
+from remotes_utils import get_short_address, get_rewards_mas_day, get_rewards_blocks_cycle, t_now
+from remotes.store import SERIES_WALLET_STAT
+from remotes.timeseries import get_command_range, get_stat_range, get_tier_labels, format_stat_range
 from telegram.menu_utils import build_menu_keyboard
 
 class ChartWalletViewer(StatesGroup):
@@ -29,6 +31,19 @@ async def cmd_chart_wallet(message: Message, state: FSMContext) -> None:
     if message.chat.id != app_globals.ACHETA_CHAT:
         return
 
+    try:
+        range_sec = get_command_range(text=message.text or "")
+    except ValueError:
+        await message.reply(
+            text="‼️ <b>Error:</b> Unknown chart range\n\n👉 Try /chart_wallet 48h, /chart_wallet 30d, /chart_wallet 2w or /chart_wallet all",
+            parse_mode="HTML",
+            reply_markup=build_menu_keyboard(),
+            request_timeout=app_config['telegram']['sending_timeout_sec']
+        )
+        await state.clear()
+        return
+    await state.set_data(data={"range_sec": range_sec})
+
     if len(app_globals.app_results) == 0:
         await message.reply(
             text="⭕ Node list is empty\n\n👉 Use the command menu to learn how to add a node to bot",
@@ -90,7 +105,7 @@ async def select_wallet_interactive(message: Message, state: FSMContext, node_na
         return
 
     await state.set_state(ChartWalletViewer.waiting_wallet_address)
-    await state.set_data(data={"node_name": node_name})
+    await state.update_data(node_name=node_name)
     await message.reply(
         text="❓ Tap the wallet to select or /cancel to quit the scenario:",
         parse_mode="HTML",
@@ -129,7 +144,17 @@ async def show_wallet_chart(message: Message, state: FSMContext, node_name: str,
         return
 
     try:
-        stats = app_globals.app_results[node_name]['wallets'][wallet_address].get("stat", {})
+        # Palier de rétention adapté à la plage demandée (mesures par cycle, agrégats horaires ou journaliers)
+        user_state = await state.get_data()
+        range_sec = user_state['range_sec'] if "range_sec" in user_state else get_command_range()
+        tier, stats = get_stat_range(
+            series=SERIES_WALLET_STAT,
+            node_name=node_name,
+            wallet_address=wallet_address,
+            stat=app_globals.app_results[node_name]['wallets'][wallet_address]['stat'],
+            range_sec=range_sec,
+            time_now=await t_now()
+        )
 
         cycles, balances, rolls, total_rolls, ok_blocks, nok_blocks = [], [], [], [], [], []
         est_rewards_per_day, est_blocks_per_cycle = [], []
@@ -157,18 +182,27 @@ async def show_wallet_chart(message: Message, state: FSMContext, node_name: str,
             return
 
         short_addr = await get_short_address(wallet_address)
-        cycle_min, cycle_max = min(cycles), max(cycles)
-        all_cycles = list(range(cycle_min, cycle_max + 1))
-        idx_map = {c: i for i, c in enumerate(cycles)}
-
-        def fill(data):
-            return [data[idx_map[c]] if c in idx_map else 0 for c in all_cycles]
+        if tier == "raw":
+            cycle_min, cycle_max = min(cycles), max(cycles)
+            all_cycles = list(range(cycle_min, cycle_max + 1))
+            idx_map = {c: i for i, c in enumerate(cycles)}
+            labels = [str(c) for c in all_cycles]
+            points_collected = f"Cycles collected: {len(all_cycles):,}"
+
+            def fill(data):
+                return [data[idx_map[c]] if c in idx_map else 0 for c in all_cycles]
+        else:
+            labels = get_tier_labels(tier=tier, entries=stats)
+            points_collected = f"{'Hours' if tier == 'hour' else 'Days'} collected: {len(labels):,} (cycles {stats[0].get('first_cycle', cycles[0])}-{cycles[-1]})"
+
+            def fill(data):
+                return data
 
         # -------- Staking Chart --------
         staking_chart_config = {
             "type": "line",
             "data": {
-                "labels": [str(c) for c in all_cycles],
+                "labels": labels,
                 "datasets": [
                     {
                         "label": "Rolls staked",
@@ -215,7 +249,8 @@ async def show_wallet_chart(message: Message, state: FSMContext, node_name: str,
         staking_chart_url = staking_chart.get_url()
         staking_img_bytes = download_chart_image(staking_chart_url)
         caption_staking = (
-            f"Cycles collected: {len(all_cycles):,}\n"
+            f"{points_collected}\n"
+            f"Range: {format_stat_range(range_sec=range_sec)}\n"
             f"Current balance: {balances[-1] if balances else 0:,} MAS\n"
             f"Number of rolls: {rolls[-1] if rolls else 0:,}\n"
             f"Wallet: <code>{short_addr}</code>"
@@ -237,7 +272,7 @@ async def show_wallet_chart(message: Message, state: FSMContext, node_name: str,
         blocks_chart_config = {
             "type": "bar",
             "data": {
-                "labels": [str(c) for c in all_cycles],
+                "labels": labels,
                 "datasets": [
                     {
                         "label": "OK blocks",
@@ -294,7 +329,8 @@ async def show_wallet_chart(message: Message, state: FSMContext, node_name: str,
         blocks_chart_url = blocks_chart.get_url()
         blocks_img_bytes = download_chart_image(blocks_chart_url)
         caption_blocks = (
-            f"Cycles collected: {len(all_cycles):,}\n"
+            f"{points_collected}\n"
+            f"Range: {format_stat_range(range_sec=range_sec)}\n"
             f"Operated blocks: {sum(ok_blocks_filled)+sum(nok_blocks_filled):,}\n"
             f"Estimated Blocks / Cycle: {round(sum(est_blocks_per_cycle_filled)/len(est_blocks_per_cycle_filled), 2) if est_blocks_per_cycle_filled else 0}\n"
             f"Estimated Rewards / Cycle: {round(sum(est_rewards_per_day_filled)/len(est_rewards_per_day_filled), 2) if est_rewards_per_day_filled else 0}\n"
@@ -11,7 +11,9 @@ import app_globals
 
 from telegram.keyboards.kb_nodes import kb_nodes
 from telegram.menu_utils import build_menu_keyboard
-from remotes_utils import get_short_address, save_app_results
+from remotes_utils import get_short_address, mark_results_dirty, save_app_results_async
+from remotes.timeseries import drop_rollups
+from watcher_utils import forget_watcher_history
 
 class NodeRemover(StatesGroup):
     waiting_node_name = State()
@@ -64,7 +66,11 @@ async def delete_node(message: Message, state: FSMContext) -> None:
     try:
         async with app_globals.results_lock:
             app_globals.app_results.pop(node_name, None)
-            save_app_results()
+            drop_rollups(node_name=node_name)
+            forget_watcher_history(node_name=node_name)
+            mark_results_dirty(node_name=node_name)
+        # Écriture regroupée, hors verrou
+        await save_app_results_async()
     except Exception as E:
         logger.error(f"[DELETE_NODE] Cannot remove node '{node_name}': ({str(E)})")
         short_name = await get_short_address(node_name)
@@ -11,7 +11,9 @@ import app_globals
 
 from telegram.keyboards.kb_nodes import kb_nodes
 from telegram.keyboards.kb_wallets import kb_wallets
-from remotes_utils import get_short_address, save_app_results
+from remotes_utils import get_short_address, mark_results_dirty, save_app_results_async
+from remotes.timeseries import drop_rollups
+from watcher_utils import forget_watcher_history
 from telegram.menu_utils import build_menu_keyboard
 
 class WalletRemover(StatesGroup):
@@ -118,7 +120,11 @@ async def delete_wallet(message: Message, state: FSMContext) -> None:
     try:
         async with app_globals.results_lock:
             app_globals.app_results[node_name]['wallets'].pop(wallet_address, None)
-            save_app_results()
+            drop_rollups(node_name=node_name, wallet_address=wallet_address)
+            forget_watcher_history(node_name=node_name, wallet_address=wallet_address)
+            mark_results_dirty(node_name=node_name, wallet_address=wallet_address)
+        # Écriture regroupée, hors verrou
+        await save_app_results_async()
     except Exception as e:
         logger.error(f"[DELETE_WALLET] Cannot remove wallet '{wallet_address}' from node '{node_name}': ({str(e)})")
         short_addr = await get_short_address(wallet_address)
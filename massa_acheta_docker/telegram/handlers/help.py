@@ -15,7 +15,7 @@ async def cmd_help(message: Message, state: FSMContext):
         "All main features are available via the menu or the main screen:\n"
         "──────────────────────────────\n"
         "• <b>📈 MAS Network Chart</b>\n"
-        "    <i>Display a global chart of the Massa mainnet (stakers, rolls, stats)</i>\n\n"
+        "    <i>Display a global chart of the Massa mainnet (stakers, rolls, stats), e.g. /massa_chart 30d</i>\n\n"
         "• <b>💼 Wallet Stats</b>\n"
         "    <i>View detailed stats and staking history for your wallet</i>\n\n"
         "• <b>🏦 View Credits</b>\n"
@@ -41,7 +41,9 @@ async def cmd_help(message: Message, state: FSMContext):
         "• <b>🌐 Massa Network Info</b>\n"
         "    <i>Show live information from the Massa mainnet</i>\n\n"
         "• <b>📊 Mainnet Chart</b>\n"
-        "    <i>Display mainnet evolution charts</i>\n\n"
+        "    <i>Display mainnet evolution charts over a range: 48h, 30d, 2w or all</i>\n\n"
+        "• <b>🏅 Stakers Rank</b>\n"
+        "    <i>Rank and percentile of your wallets among all stakers, rolls concentration</i>\n\n"
         "• <b>⬆️ Latest Release</b>\n"
         "    <i>Check for the latest Acheta and Massa node versions</i>\n\n"
         "• <b>🆔 Your Telegram ID</b>\n"
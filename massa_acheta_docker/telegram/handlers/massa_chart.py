@@ -7,6 +7,9 @@ from app_config import app_config
 import app_globals
 from quickchart import QuickChart
 from telegram.menu_utils import build_menu_keyboard
+from remotes_utils import t_now
+from remotes.store import SERIES_NETWORK_STAT
+from remotes.timeseries import get_command_range, get_stat_range, get_tier_labels, format_stat_range
 
 router = Router()
 
@@ -18,9 +21,26 @@ async def cmd_massa_chart(message: Message, state: FSMContext) -> None:
         return
 
     try:
-        # --- Préparation des données ---
+        range_sec = get_command_range(text=message.text or "")
+    except ValueError:
+        await message.reply(
+            text="‼️ <b>Error:</b> Unknown chart range\n\n👉 Try /massa_chart 48h, /massa_chart 30d, /massa_chart 2w or /massa_chart all",
+            parse_mode="HTML",
+            reply_markup=build_menu_keyboard(),
+            request_timeout=app_config['telegram']['sending_timeout_sec']
+        )
+        return
+
+    try:
+        # --- Préparation des données : palier de rétention adapté à la plage demandée ---
+        tier, stats = get_stat_range(
+            series=SERIES_NETWORK_STAT,
+            stat=app_globals.massa_network['stat'],
+            range_sec=range_sec,
+            time_now=await t_now()
+        )
         massa_stat_keytime_unsorted = {}
-        for measure in app_globals.massa_network.get("stat", {}):
+        for measure in stats if tier == "raw" else []:
             measure_time = measure.get("time", 0)
             measure_cycle = measure.get("cycle", 0)
             measure_stakers = measure.get("stakers", 0)
@@ -43,7 +63,14 @@ async def cmd_massa_chart(message: Message, state: FSMContext) -> None:
             }
 
         massa_stat_keycycle_sorted = dict(sorted(massa_stat_keycycle_unsorted.items()))
-        total_cycles = len(massa_stat_keycycle_sorted)
+        if tier == "raw":
+            # Mesures brutes : une valeur par cycle
+            chart_points = [(str(cycle), values) for cycle, values in massa_stat_keycycle_sorted.items()]
+            points_collected = f"Cycles collected: {len(chart_points):,}"
+        else:
+            # Agrégats horaires / journaliers : dernière valeur de chaque bucket
+            chart_points = list(zip(get_tier_labels(tier=tier, entries=stats), stats))
+            points_collected = f"{'Hours' if tier == 'hour' else 'Days'} collected: {len(chart_points):,}"
         delta_stakers, delta_rolls = 0, 0
         last_stakers, last_rolls = 0, 0
 
@@ -51,20 +78,20 @@ async def cmd_massa_chart(message: Message, state: FSMContext) -> None:
         stakers_list = []
         rolls_list = []
 
-        for cycle in massa_stat_keycycle_sorted:
-            stakers = massa_stat_keycycle_sorted[cycle].get("stakers", 0)
+        for label, values in chart_points:
+            stakers = values.get("stakers", 0)
             if last_stakers == 0:
                 last_stakers = stakers
             delta_stakers += stakers - last_stakers
             last_stakers = stakers
 
-            rolls = massa_stat_keycycle_sorted[cycle].get("rolls", 0)
+            rolls = values.get("rolls", 0)
             if last_rolls == 0:
                 last_rolls = rolls
             delta_rolls += rolls - last_rolls
             last_rolls = rolls
 
-            chart_labels.append(str(cycle))  # To ensure label is a string
+            chart_labels.append(label)
             stakers_list.append(stakers)
             rolls_list.append(rolls)
 
@@ -159,7 +186,8 @@ async def cmd_massa_chart(message: Message, state: FSMContext) -> None:
             delta_rolls_str = f"{delta_rolls:,}"
 
         caption_massa = (
-            f"Cycles collected: {total_cycles:,}\n"
+            f"{points_collected}\n"
+            f"Range: {format_stat_range(range_sec=range_sec)}\n"
             f"Total stakers: {stakers_list[-1] if stakers_list else 0:,} (d: {delta_stakers_str})\n"
             f"Total staked rolls: {rolls_list[-1] if rolls_list else 0:,} (d: {delta_rolls_str})\n"
             f"{'⚠️ Not enough data for a curve.' if len(chart_labels) < 2 else ''}"
@@ -8,7 +8,9 @@ from aiogram.fsm.state import State, StatesGroup
 
 from app_config import app_config
 import app_globals
-from remotes_utils import save_app_results
+from remotes_utils import mark_results_dirty, save_app_results_async
+from remotes.timeseries import drop_rollups
+from watcher_utils import forget_watcher_history
 from telegram.menu_utils import build_menu_keyboard
 
 class ResetState(StatesGroup):
@@ -66,8 +68,13 @@ async def do_reset(message: Message, state: FSMContext) -> None:
 
     try:
         async with app_globals.results_lock:
+            for node_name in app_globals.app_results:
+                mark_results_dirty(node_name=node_name)
+                drop_rollups(node_name=node_name)
+                forget_watcher_history(node_name=node_name)
             app_globals.app_results = {}
-            save_app_results()
+        # Écriture regroupée, hors verrou
+        await save_app_results_async()
     except Exception as e:
         msg = (
             "‼️ <b>Error: Could not reset configuration</b>\n"
@@ -9,6 +9,7 @@ from aiogram.fsm.state import State, StatesGroup
 from app_config import app_config
 import app_globals
 from remotes_utils import get_short_address, get_last_seen
+from remotes.endpoints import get_node_urls
 from telegram.menu_utils import build_menu_keyboard
 from telegram.keyboards.kb_nodes import kb_nodes
 
@@ -70,9 +71,10 @@ async def select_node_to_show(message: Message, state: FSMContext) -> None:
 
 async def show_node_config(message: Message, node_name: str, state: FSMContext) -> None:
     node = app_globals.app_results[node_name]
+    node_urls_html = "".join(f"📍 <code>{node_url}</code>\n" for node_url in get_node_urls(node_name=node_name))
     config_html = (
         f"🏠 <b>Node:</b> \"{node_name}\"\n"
-        f"📍 <code>{node['url']}</code>\n"
+        f"{node_urls_html}"
     )
 
     if len(node['wallets']) == 0:
@@ -1,7 +1,6 @@
 # massa_acheta_docker/telegram/handlers/view_credits.py
 
 from loguru import logger
-from datetime import datetime
 from aiogram import Router, F
 from aiogram.types import Message
 from aiogram.filters import Command, StateFilter
@@ -11,6 +10,8 @@ from aiogram.fsm.state import State, StatesGroup
 from app_config import app_config
 import app_globals
 from remotes_utils import get_short_address, t_now
+from remotes.credits import get_wallet_credits, get_credits_next_days, get_credits_pending
+from remotes.chainclock import format_chain_times
 from telegram.menu_utils import build_menu_keyboard
 from telegram.keyboards.kb_nodes import kb_nodes
 from telegram.keyboards.kb_wallets import kb_wallets
@@ -32,8 +33,9 @@ async def get_credits(wallet_address: str=""):
         )
         return False, msg
 
-    wallet_credits = app_globals.deferred_credits.get(wallet_address, None)
-    if not wallet_credits or not isinstance(wallet_credits, list) or len(wallet_credits) == 0:
+    # Index en mémoire trié par slot, republié par le rafraîchissement des crédits
+    wallet_credits = get_wallet_credits(wallet_address=wallet_address)
+    if len(wallet_credits) == 0:
         short_addr = await get_short_address(wallet_address)
         msg = (
             f"👛 Wallet: <a href=\"{app_config['service']['mainnet_explorer_url']}/address/{wallet_address}\">{short_addr}</a>\n"
@@ -43,20 +45,10 @@ async def get_credits(wallet_address: str=""):
 
     deferred_credits_html = ["💳 <b>Deferred credits:</b>\n"]
     now_unix = int(await t_now())
-    for wallet_credit in wallet_credits:
-        try:
-            credit_amount = float(wallet_credit.get("amount", 0))
-            credit_amount = round(credit_amount, 4)
-            credit_slot = wallet_credit.get("slot", None)
-            credit_period = credit_slot.get("period", None) if credit_slot else None
-            credit_unix = 1705312800 + (int(credit_period) * 16) if credit_period is not None else None
-            credit_date = datetime.utcfromtimestamp(credit_unix).strftime("%b %d, %Y") if credit_unix else "?"
-        except Exception as E:
-            logger.warning(f"Cannot compute deferred credit ({str(E)}) for credit '{wallet_credit}'")
-            continue
-        if credit_unix is None:
-            logger.warning(f"Deferred credit slot period missing for credit '{wallet_credit}'")
-            continue
+    credit_dates = format_chain_times(unix_times=[c['unix'] for c in wallet_credits], date_format="%b %d, %Y")
+    for wallet_credit, credit_date in zip(wallet_credits, credit_dates):
+        credit_amount = round(wallet_credit['amount'], 4)
+        credit_unix = wallet_credit['unix']
         # Strikethrough si crédit expiré
         if credit_unix < now_unix:
             deferred_credits_html.append(
@@ -67,6 +59,14 @@ async def get_credits(wallet_address: str=""):
                 f"⦙ … {credit_date}: {credit_amount:,} MAS\n"
             )
 
+    summary_days = app_config['service']['credits_summary_days']
+    next_count, next_amount = get_credits_next_days(wallet_address=wallet_address, now_unix=now_unix, days=summary_days)
+    pending_count, pending_amount = get_credits_pending(wallet_address=wallet_address, now_unix=now_unix)
+    deferred_credits_html.append(
+        f"\n📅 Next {summary_days} days: {round(next_amount, 4):,} MAS ({next_count} credit(s))\n"
+        f"⏳ Total pending: {round(pending_amount, 4):,} MAS ({pending_count} credit(s))\n"
+    )
+
     short_addr = await get_short_address(wallet_address)
     msg = (
         f"👛 Wallet: <a href=\"{app_config['service']['mainnet_explorer_url']}/address/{wallet_address}\">{short_addr}</a>\n"
@@ -13,6 +13,7 @@ import app_globals
 from telegram.keyboards.kb_nodes import kb_nodes
 from telegram.menu_utils import build_menu_keyboard
 from remotes_utils import get_last_seen, get_short_address, get_duration
+from remotes.endpoints import get_node_urls
 
 class NodeViewer(StatesGroup):
     waiting_node_name = State()
@@ -97,6 +98,7 @@ async def show_node_info(message: Message, state: FSMContext, node_name: str) ->
     else:
         wallets_attached = f"👛 Wallets attached: {len(node_data['wallets'])}"
 
+    node_urls_html = "".join(f"📍 <code>{node_url}</code>\n" for node_url in get_node_urls(node_name=node_name))
     last_seen = await get_last_seen(last_time=node_data['last_update'])
     node_uptime = await get_duration(start_time=node_data.get('start_time', 0), show_days=True)
 
@@ -107,7 +109,7 @@ async def show_node_info(message: Message, state: FSMContext, node_name: str) ->
         last_result_str = str(last_result)
         text = (
             f"🏠 <b>Node:</b> {node_name}\n"
-            f"📍 <code>{node_data['url']}</code>\n"
+            f"{node_urls_html}"
             f"{wallets_attached}\n"
             f"{node_status}\n"
             f"💻 <b>Result:</b> <code>{last_result_str}</code>\n"
@@ -133,7 +135,7 @@ async def show_node_info(message: Message, state: FSMContext, node_name: str) ->
 
         text = (
             f"🏠 <b>Node:</b> {node_name}\n"
-            f"📍 <code>{node_data['url']}</code>\n"
+            f"{node_urls_html}"
             f"{wallets_attached}\n"
             f"{node_status}\n"
             f"🆔: <code>{await get_short_address(node_id)}</code>\n"
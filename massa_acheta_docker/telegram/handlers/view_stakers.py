@@ -0,0 +1,71 @@
+# massa_acheta_docker/telegram/handlers/view_stakers.py
+from loguru import logger
+from aiogram import Router
+from aiogram.filters import Command, StateFilter
+from aiogram.types import Message
+from aiogram.enums import ParseMode
+from aiogram.fsm.context import FSMContext
+
+from app_config import app_config
+import app_globals
+from remotes_utils import get_short_address, get_last_seen
+from remotes import stakers
+from remotes.stakers import get_wallet_staking_position, get_top_share, get_stakers_gini
+from telegram.menu_utils import build_menu_keyboard
+
+router = Router()
+
+@router.message(StateFilter(None), Command("view_stakers"))
+@logger.catch
+async def cmd_view_stakers(message: Message, state: FSMContext) -> None:
+    logger.debug(f"[VIEW_STAKERS] -> cmd_view_stakers")
+    logger.info(f"[VIEW_STAKERS] -> Got '{message.text}' command from '{message.from_user.id}'@'{message.chat.id}'")
+
+    if message.chat.id != app_globals.ACHETA_CHAT:
+        return
+
+    if not stakers.stakers_index['rolls']:
+        msg = (
+            "⁉️ Stakers table is not loaded yet\n\n"
+            f"☝ Service checks updates: every {app_config['service']['massa_network_update_period_min']} mins"
+        )
+    else:
+        info_last_update = await get_last_seen(
+            last_time=app_globals.massa_network['values']['last_updated']
+        )
+        wallets_html = []
+        for node_name in app_globals.app_results:
+            for wallet_address in app_globals.app_results[node_name]['wallets']:
+                short_addr = await get_short_address(address=wallet_address)
+                staking_position = get_wallet_staking_position(wallet_address=wallet_address)
+                if not staking_position:
+                    wallets_html.append(f"⦙ … <code>{short_addr}</code>: not in stakers table\n")
+                    continue
+                wallets_html.append(
+                    f"⦙ … <code>{short_addr}</code>: {staking_position['rolls']:,} rolls, "
+                    f"rank <b>{staking_position['rank']:,}</b> / {staking_position['stakers']:,} "
+                    f"(top {100 - staking_position['percentile']:.1f}%, {staking_position['share']:.3f}% of rolls)\n"
+                )
+        if not wallets_html:
+            wallets_html.append("⭕ No wallets attached\n")
+
+        msg = (
+            f"👥 <b>Total stakers:</b> {len(stakers.stakers_index['rolls']):,}\n"
+            f"🗞 <b>Total staked rolls:</b> {stakers.stakers_total_rolls:,}\n"
+            f"🔝 <b>Top 10 / 100 share:</b> {get_top_share(top_n=10):.1f}% / {get_top_share(top_n=100):.1f}%\n"
+            f"⚖️ <b>Gini concentration:</b> {get_stakers_gini():.3f}\n\n"
+            f"🏅 <b>Your wallets:</b>\n"
+            + "".join(wallets_html) +
+            f"\n👁 <b>Info updated:</b> {info_last_update}\n"
+            f"☝ Service checks updates: every {app_config['service']['massa_network_update_period_min']} mins"
+        )
+
+    try:
+        await message.reply(
+            text=msg,
+            parse_mode=ParseMode.HTML,
+            reply_markup=build_menu_keyboard(),
+            request_timeout=app_config['telegram']['sending_timeout_sec']
+        )
+    except Exception as e:
+        logger.error(f"[VIEW_STAKERS] Could not send message to user '{message.from_user.id}' in chat '{message.chat.id}' ({str(e)})")
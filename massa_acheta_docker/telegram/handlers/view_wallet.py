@@ -1,6 +1,5 @@
 # massa_acheta_docker/telegram/handlers/view_wallet.py
 from loguru import logger
-from datetime import datetime
 from aiogram import Router, F
 from aiogram.filters import Command, StateFilter
 from aiogram.types import Message, ReplyKeyboardRemove
@@ -14,7 +13,10 @@ import app_globals
 from telegram.keyboards.kb_nodes import kb_nodes
 from telegram.keyboards.kb_wallets import kb_wallets
 from telegram.menu_utils import build_menu_keyboard
-from remotes_utils import get_short_address, get_last_seen, get_rewards_mas_day
+from remotes_utils import get_short_address, get_last_seen, get_rewards_mas_day, t_now
+from remotes.credits import get_wallet_credits
+from remotes.draws import get_wallet_draws_timeline
+from remotes.chainclock import format_chain_times
 
 class WalletViewer(StatesGroup):
     waiting_node_name = State()
@@ -276,35 +278,30 @@ async def show_wallet(message: Message, state: FSMContext) -> None:
                 nok_count = wallet_cycle.get("nok_count", 0)
                 cycles_html += f"&nbsp;&nbsp;⋅ Cycle {cycle_num}: ( {ok_count} / {nok_count} )\n"
 
-        logger.debug(f"last_result content: {w_data['last_result']}")
-        wallet_credits = w_data['last_result'].get("deferred_credits", [])
+        # Crédits lus depuis l'index en mémoire (trié par slot)
+        wallet_credits = get_wallet_credits(wallet_address=wallet_address)
         if not wallet_credits:
             credits_html = "💳 Deferred credits: No data\n"
         else:
             credits_html = "💳 Deferred credits:\n"
-            for wallet_credit in wallet_credits:
-                try:
-                    credit_amount = float(wallet_credit.get('amount', 0) or 0)
-                    credit_slot = wallet_credit.get('slot')
-                    if not isinstance(credit_slot, dict) or 'period' not in credit_slot:
-                        logger.warning(f"Deferred credit slot/period missing for credit '{wallet_credit}'")
-                        continue
+            credit_dates = format_chain_times(unix_times=[c['unix'] for c in wallet_credits], date_format="%b %d, %Y")
+            for wallet_credit, credit_date in zip(wallet_credits, credit_dates):
+                credits_html += f"  ⋅ {credit_date}: {wallet_credit['amount']:,.4f} MAS\n"
 
-                    credit_period = credit_slot['period']
-                    try:
-                        period_int = int(credit_period)
-                    except Exception as e:
-                        logger.warning(f"Invalid period '{credit_period}' in deferred credit: {e}")
-                        continue
-
-                    credit_unix = 1705312800 + (period_int * 16)
-                    credit_date = datetime.utcfromtimestamp(credit_unix).strftime("%b %d, %Y")
-
-                    credits_html += f"  ⋅ {credit_date}: {credit_amount:,.4f} MAS\n"
-
-                except Exception as e:
-                    logger.warning(f"Cannot compute deferred credit: {e} for credit '{wallet_credit}'")
-                    continue
+        # Prochains slots tirés (next_block_draws), convertis en heure UTC
+        draws_timeline = get_wallet_draws_timeline(
+            snapshot=app_globals.address_snapshot,
+            node_name=node_name,
+            wallet_address=wallet_address,
+            time_now=await t_now()
+        )
+        if not draws_timeline:
+            draws_html = "🎯 Next block slots: None scheduled\n"
+        else:
+            draws_html = "🎯 Next block slots:\n"
+            draw_dates = format_chain_times(unix_times=[d['time'] for d in draws_timeline[:5]], date_format="%b %d, %H:%M:%S UTC")
+            for draw, draw_date in zip(draws_timeline[:5], draw_dates):
+                draws_html += f"  ⋅ {draw_date} (period {draw['period']}, thread {draw['thread']})\n"
 
         text = (
             f"🏠 <b>Node:</b> {node_name}\n"
@@ -321,6 +318,7 @@ async def show_wallet(message: Message, state: FSMContext) -> None:
             f"🧵 Thread: {wallet_thread}\n"
             f"{cycles_html}"
             f"{credits_html}"
+            f"{draws_html}"
             f"☝️ Service checks updates: every {app_config['service']['main_loop_period_min']} minutes"
         )
 
@@ -18,6 +18,7 @@ PRIVATE_COMMANDS = [
     ("/delete_wallet", "Delete wallet from bot", "Delete wallet"),
     ("/massa_info", "Show MASSA network info", "MASSA info"),
     ("/massa_chart", "Show MASSA network chart", "MASSA chart"),
+    ("/view_stakers", "Show wallets staking rank", "Stakers rank"),
     ("/acheta_release", "Actual Acheta release", "Acheta release"),
     ("/view_id", "Show your TG ID", "My ID"),
     ("/watchers", "Show watchers menu", "Watchers"),
@@ -6,6 +6,27 @@ from aiogram.enums import ParseMode
 from app_config import app_config
 import app_globals
 
+def split_telegram_message(message_text: str="", max_length: int=4096) -> list:
+    """Découpe un message trop long pour Telegram aux fins de ligne (balises HTML fermées sur chaque ligne)."""
+    parts = []
+    current = ""
+    for line in message_text.split("\n"):
+        while len(line) > max_length:
+            # Ligne seule trop longue : coupure franche
+            if current:
+                parts.append(current)
+                current = ""
+            parts.append(line[:max_length])
+            line = line[max_length:]
+        candidate = f"{current}\n{line}" if current else line
+        if len(candidate) > max_length:
+            parts.append(current)
+            candidate = line
+        current = candidate
+    if current or not parts:
+        parts.append(current)
+    return parts
+
 @logger.catch
 async def queue_telegram_message(chat_id=None, message_text: str = "", disable_web_page_preview: bool = False) -> bool:
     logger.debug("-> queue_telegram_message")
@@ -14,11 +35,16 @@ async def queue_telegram_message(chat_id=None, message_text: str = "", disable_w
         chat_id = app_globals.ACHETA_CHAT
 
     try:
-        app_globals.telegram_queue.append({
-            "chat_id": chat_id,
-            "message_text": message_text,
-            "disable_web_page_preview": disable_web_page_preview
-        })
+        # Au-delà de la limite Telegram, l'envoi échouerait en boucle et bloquerait la file
+        for message_part in split_telegram_message(
+            message_text=message_text,
+            max_length=app_config['telegram']['max_message_length']
+        ):
+            app_globals.telegram_queue.append({
+                "chat_id": chat_id,
+                "message_text": message_part,
+                "disable_web_page_preview": disable_web_page_preview
+            })
     except Exception as e:
         logger.error(f"Cannot add telegram message to queue: ({str(e)})")
         return False
@@ -0,0 +1,28 @@
+# massa_acheta_docker/tests/conftest.py
+import sys
+import types
+from collections import deque
+from pathlib import Path
+
+import pytest
+
+# Les modules du service s'importent depuis la racine du projet (from app_config import ...)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# app_globals charge l'état du service à l'import (.env, fichiers de résultats, release GitHub) :
+# les tests des fonctions pures utilisent un module d'état minimal à la place
+test_globals = types.ModuleType("app_globals")
+test_globals.app_results = {}
+test_globals.massa_network = {"values": {}, "stat": deque()}
+test_globals.deferred_credits = {}
+test_globals.deferred_credits_index = None
+sys.modules.setdefault("app_globals", test_globals)
+
+import app_globals
+
+@pytest.fixture
+def network_values():
+    """Paramètres réseau (get_status) vides au début de chaque test : valeurs mainnet par défaut."""
+    app_globals.massa_network['values'] = {}
+    yield app_globals.massa_network['values']
+    app_globals.massa_network['values'] = {}
@@ -0,0 +1,99 @@
+# massa_acheta_docker/tests/test_breaker.py
+import pytest
+
+from app_config import app_config
+from remotes import breaker
+
+NODE_URL = "http://node.test:33035/api/v2"
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Horloge monotone pilotée par le test."""
+    clock = {"now": 1000.0}
+    monkeypatch.setattr(breaker, "monotonic", lambda: clock['now'])
+    monkeypatch.setitem(app_config['service'], "node_breaker_failure_threshold", 3)
+    monkeypatch.setitem(app_config['service'], "node_breaker_open_sec", 60)
+    breaker._node_breakers.clear()
+    yield clock
+    breaker._node_breakers.clear()
+
+def fail(times: int=1) -> None:
+    for _ in range(times):
+        assert breaker.breaker_allow_request(node_url=NODE_URL)
+        breaker.breaker_record_result(node_url=NODE_URL, success=False)
+
+def test_stays_closed_below_threshold(clock):
+    fail(times=2)
+
+    assert breaker.get_node_breaker(node_url=NODE_URL)['state'] == "closed"
+    assert breaker.breaker_allow_request(node_url=NODE_URL)
+    assert not breaker.is_node_circuit_open(node_url=NODE_URL)
+
+def test_success_resets_failure_count(clock):
+    fail(times=2)
+    breaker.breaker_record_result(node_url=NODE_URL, success=True)
+    fail(times=2)
+
+    assert breaker.get_node_breaker(node_url=NODE_URL)['state'] == "closed"
+
+def test_opens_at_threshold_and_fast_fails(clock):
+    fail(times=3)
+    node_breaker = breaker.get_node_breaker(node_url=NODE_URL)
+
+    assert node_breaker['state'] == "open"
+    assert node_breaker['opened_count'] == 1
+    assert breaker.is_node_circuit_open(node_url=NODE_URL)
+    assert not breaker.breaker_allow_request(node_url=NODE_URL)
+    assert node_breaker['fast_failed'] == 1
+
+def test_half_open_allows_a_single_probe(clock):
+    fail(times=3)
+    clock['now'] += 60
+
+    assert not breaker.is_node_circuit_open(node_url=NODE_URL)
+    assert breaker.breaker_allow_request(node_url=NODE_URL)
+    assert breaker.get_node_breaker(node_url=NODE_URL)['state'] == "half_open"
+    # Requête de test en vol : les autres échouent tout de suite
+    assert breaker.is_node_circuit_open(node_url=NODE_URL)
+    assert not breaker.breaker_allow_request(node_url=NODE_URL)
+
+def test_successful_probe_closes_circuit(clock):
+    fail(times=3)
+    clock['now'] += 60
+    assert breaker.breaker_allow_request(node_url=NODE_URL)
+
+    breaker.breaker_record_result(node_url=NODE_URL, success=True)
+
+    node_breaker = breaker.get_node_breaker(node_url=NODE_URL)
+    assert node_breaker['state'] == "closed"
+    assert node_breaker['failures'] == 0
+    assert breaker.breaker_allow_request(node_url=NODE_URL)
+
+def test_failed_probe_reopens_circuit_for_a_new_period(clock):
+    fail(times=3)
+    clock['now'] += 60
+    assert breaker.breaker_allow_request(node_url=NODE_URL)
+
+    breaker.breaker_record_result(node_url=NODE_URL, success=False)
+
+    node_breaker = breaker.get_node_breaker(node_url=NODE_URL)
+    assert node_breaker['state'] == "open"
+    assert node_breaker['opened_at'] == clock['now']
+    assert node_breaker['opened_count'] == 2
+    clock['now'] += 59
+    assert not breaker.breaker_allow_request(node_url=NODE_URL)
+
+def test_released_probe_lets_next_request_probe(clock):
+    fail(times=3)
+    clock['now'] += 60
+    assert breaker.breaker_allow_request(node_url=NODE_URL)
+
+    breaker.breaker_release_probe(node_url=NODE_URL)
+
+    assert breaker.get_node_breaker(node_url=NODE_URL)['state'] == "half_open"
+    assert breaker.breaker_allow_request(node_url=NODE_URL)
+
+def test_breakers_are_per_node_url(clock):
+    fail(times=3)
+
+    assert breaker.breaker_allow_request(node_url="http://other.test:33035/api/v2")
@@ -0,0 +1,78 @@
+# massa_acheta_docker/tests/test_chainclock.py
+import pytest
+
+from remotes import chainclock
+from remotes.chainclock import MAINNET_GENESIS_TIMESTAMP, MAINNET_T0_SEC, MAINNET_THREAD_COUNT, MAINNET_PERIODS_PER_CYCLE
+
+def test_mainnet_defaults_when_status_is_unknown(network_values):
+    assert chainclock.get_chain_params() == {
+        "genesis_sec": MAINNET_GENESIS_TIMESTAMP,
+        "t0_sec": MAINNET_T0_SEC,
+        "thread_count": MAINNET_THREAD_COUNT,
+        "periods_per_cycle": MAINNET_PERIODS_PER_CYCLE
+    }
+
+def test_status_values_are_in_milliseconds(network_values):
+    network_values.update({"genesis_timestamp": 1_000_000, "t0": 500, "thread_count": 4, "periods_per_cycle": 10})
+
+    assert chainclock.get_chain_params() == {"genesis_sec": 1000, "t0_sec": 0.5, "thread_count": 4, "periods_per_cycle": 10}
+
+def test_bad_status_values_fall_back_to_mainnet(network_values):
+    network_values['t0'] = "not a number"
+
+    assert chainclock.get_chain_params()['t0_sec'] == MAINNET_T0_SEC
+
+def test_slot_timestamp(network_values):
+    slot_unix = chainclock.get_slot_timestamp(slot={"period": 10, "thread": 16})
+
+    assert slot_unix == MAINNET_GENESIS_TIMESTAMP + 10 * MAINNET_T0_SEC + 16 * MAINNET_T0_SEC / MAINNET_THREAD_COUNT
+    assert chainclock.get_slots_timestamps(slots=[{"period": 10, "thread": 16}, {"period": 11}]) == [
+        slot_unix,
+        MAINNET_GENESIS_TIMESTAMP + 11 * MAINNET_T0_SEC
+    ]
+
+@pytest.mark.parametrize("period, thread", [(0, 0), (1, 31), (12345, 7), (987654, 0)])
+def test_slot_time_round_trip(network_values, period, thread):
+    slot_unix = chainclock.get_slot_timestamp(slot={"period": period, "thread": thread})
+
+    assert chainclock.get_timestamp_slot(unix_time=slot_unix) == {"period": period, "thread": thread}
+    # Juste avant le slot suivant : toujours le même slot
+    assert chainclock.get_timestamp_slot(unix_time=slot_unix + MAINNET_T0_SEC / MAINNET_THREAD_COUNT - 0.01) == {"period": period, "thread": thread}
+
+def test_timestamp_before_genesis_is_slot_zero(network_values):
+    assert chainclock.get_timestamp_slot(unix_time=MAINNET_GENESIS_TIMESTAMP - 100) == {"period": 0, "thread": 0}
+    assert chainclock.get_period_at(unix_time=MAINNET_GENESIS_TIMESTAMP - 100) == 0
+
+def test_slot_timestamp_follows_network_timing(network_values):
+    before = chainclock.get_slot_timestamp(slot={"period": 10, "thread": 0})
+
+    network_values['t0'] = 8000
+
+    assert chainclock.get_slot_timestamp(slot={"period": 10, "thread": 0}) == before - 10 * 8
+
+def test_cycle_boundaries(network_values):
+    cycle_sec = MAINNET_PERIODS_PER_CYCLE * MAINNET_T0_SEC
+    cycle_start = chainclock.get_cycle_start(cycle=5)
+
+    assert cycle_start == MAINNET_GENESIS_TIMESTAMP + 5 * cycle_sec
+    assert chainclock.get_cycle_end(cycle=5) == cycle_start + cycle_sec
+    assert chainclock.get_cycle_at(unix_time=cycle_start) == 5
+    assert chainclock.get_cycle_at(unix_time=cycle_start - 0.001) == 4
+
+def test_next_cycle_boundary_with_offset(network_values):
+    cycle_end = chainclock.get_cycle_end(cycle=5)
+
+    assert chainclock.get_next_cycle_boundary(unix_time=cycle_end - 1, offset_sec=30) == cycle_end + 30
+    assert chainclock.get_next_cycle_boundary(unix_time=cycle_end + 29, offset_sec=30) == cycle_end + 30
+    # Instant exact déjà atteint : fin du cycle suivant
+    assert chainclock.get_next_cycle_boundary(unix_time=cycle_end + 30, offset_sec=30) == chainclock.get_cycle_end(cycle=6) + 30
+
+def test_next_period_boundary(network_values):
+    period_start = chainclock.get_period_start(period=40)
+
+    assert chainclock.get_next_period_boundary(unix_time=period_start, every_periods=1) == chainclock.get_period_start(period=41)
+    assert chainclock.get_next_period_boundary(unix_time=period_start + 1, every_periods=8) == chainclock.get_period_start(period=48)
+
+def test_format_chain_times():
+    assert chainclock.format_chain_times(unix_times=[0, 86400 + 3600], date_format="%d/%m/%y") == ["01/01/70", "02/01/70"]
+    assert chainclock.format_chain_time(unix_time=86400 + 3600, date_format="%d/%m %Hh") == "02/01 01h"
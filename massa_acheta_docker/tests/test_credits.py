@@ -0,0 +1,71 @@
+# massa_acheta_docker/tests/test_credits.py
+import pytest
+
+import app_globals
+from remotes import credits
+from remotes.chainclock import MAINNET_GENESIS_TIMESTAMP, MAINNET_T0_SEC, MAINNET_THREAD_COUNT
+
+def slot_unix(period: int=0, thread: int=0) -> float:
+    return MAINNET_GENESIS_TIMESTAMP + period * MAINNET_T0_SEC + thread * MAINNET_T0_SEC / MAINNET_THREAD_COUNT
+
+def credit(period: int=0, thread: int=0, amount: str="0") -> dict:
+    return {"slot": {"period": period, "thread": thread}, "amount": amount}
+
+@pytest.fixture
+def credits_index(network_values, monkeypatch):
+    monkeypatch.setattr(app_globals, "deferred_credits_index", None)
+    credits.publish_credits_index(deferred_credits={
+        "AU1": [credit(period=300, amount="30"), credit(period=100, amount="10"), credit(period=200, thread=5, amount="20")],
+        "AU2": [credit(period=150, amount="1.5"), credit(period=100, thread=1, amount="2")]
+    })
+    return app_globals.deferred_credits_index
+
+def test_wallet_credits_are_sorted_by_slot(credits_index):
+    wallet_credits = credits.get_wallet_credits(wallet_address="AU1")
+
+    assert [(c['period'], c['thread']) for c in wallet_credits] == [(100, 0), (200, 5), (300, 0)]
+    assert [c['unix'] for c in wallet_credits] == [slot_unix(100), slot_unix(200, 5), slot_unix(300)]
+    assert credits_index['version'] == 1
+
+def test_credits_between_is_half_open(credits_index):
+    assert credits.get_credits_between(wallet_address="AU1", start_unix=slot_unix(100), end_unix=slot_unix(300)) == (2, 30.0)
+    assert credits.get_credits_between(wallet_address="AU1", start_unix=slot_unix(100) + 1, end_unix=slot_unix(300) + 1) == (2, 50.0)
+
+def test_credits_between_without_end(credits_index):
+    assert credits.get_credits_between(wallet_address="AU1", start_unix=slot_unix(150)) == (2, 50.0)
+
+def test_credits_between_empty_ranges(credits_index):
+    assert credits.get_credits_between(wallet_address="AU1", start_unix=slot_unix(300), end_unix=slot_unix(100)) == (0, 0.0)
+    assert credits.get_credits_between(wallet_address="AU1", start_unix=slot_unix(301)) == (0, 0.0)
+    assert credits.get_credits_between(wallet_address="AU9", start_unix=0) == (0, 0.0)
+
+def test_credits_between_all_wallets(credits_index):
+    count, amount = credits.get_credits_between(start_unix=slot_unix(100), end_unix=slot_unix(200))
+
+    assert count == 3
+    assert amount == pytest.approx(13.5)
+
+def test_pending_and_released_split(credits_index):
+    now_unix = slot_unix(200, 5)
+
+    assert credits.get_credits_released(wallet_address="AU1", now_unix=now_unix) == (1, 10.0)
+    assert credits.get_credits_pending(wallet_address="AU1", now_unix=now_unix) == (2, 50.0)
+
+def test_credits_next_days(credits_index):
+    assert credits.get_credits_next_days(wallet_address="AU1", now_unix=slot_unix(100), days=1) == (3, 60.0)
+
+def test_period_only_credit_format_is_indexed(network_values):
+    credits_entries = credits.build_credits_entries(wallet_credits=[{"period": "42", "amount": 5}, {"amount": 1}])
+
+    assert [(c['period'], c['thread'], c['amount']) for c in credits_entries['credits']] == [(42, 0, 5.0)]
+    assert credits_entries['cumulative'] == [0.0, 5.0]
+
+def test_index_is_rebuilt_when_chain_timing_changes(credits_index, network_values, monkeypatch):
+    monkeypatch.setattr(app_globals, "deferred_credits", {"AU1": [credit(period=100, amount="10")]})
+    assert not credits.refresh_credits_index_timing()
+
+    network_values['genesis_timestamp'] = (MAINNET_GENESIS_TIMESTAMP + 1000) * 1000
+
+    assert credits.refresh_credits_index_timing()
+    assert credits.get_wallet_credits(wallet_address="AU1")[0]['unix'] == slot_unix(100) + 1000
+    assert app_globals.deferred_credits_index['version'] == 2
@@ -0,0 +1,110 @@
+# massa_acheta_docker/tests/test_singleflight.py
+import asyncio
+
+import pytest
+
+import remotes_utils
+from remotes import breaker, limiter
+from remotes.deadline import tick_budget
+
+API_URL = "http://node.test:33035/api/v2"
+
+@pytest.fixture
+def fake_network(monkeypatch):
+    """Remplace l'appel réseau : compte les appels, répond après 'delay' secondes."""
+    network = {"calls": 0, "delay": 0.05, "result": {"result": "ok"}}
+
+    async def fake_fetch_http_api(**kwargs):
+        network['calls'] += 1
+        await asyncio.sleep(network['delay'])
+        return network['result']
+
+    monkeypatch.setattr(remotes_utils, "fetch_http_api", fake_fetch_http_api)
+    remotes_utils._http_inflight.clear()
+    remotes_utils._http_results_cache.clear()
+    for stat_name in remotes_utils.http_singleflight_stats:
+        remotes_utils.http_singleflight_stats[stat_name] = 0
+    breaker._node_breakers.clear()
+    limiter._node_limiters.clear()
+    yield network
+    remotes_utils._http_inflight.clear()
+    remotes_utils._http_results_cache.clear()
+
+def pull(payload: dict={"method": "get_status"}, **kwargs):
+    return remotes_utils.pull_http_api(api_url=API_URL, api_method="POST", api_payload=payload, **kwargs)
+
+def test_request_key_ignores_payload_key_order():
+    key_1 = remotes_utils.get_http_request_key(api_url=API_URL, api_payload={"a": 1, "b": 2})
+    key_2 = remotes_utils.get_http_request_key(api_url=API_URL, api_payload={"b": 2, "a": 1})
+    assert key_1 == key_2
+
+def test_concurrent_identical_calls_share_one_request(fake_network):
+    async def scenario():
+        return await asyncio.gather(*[pull(api_cache_ttl=0) for _ in range(5)])
+
+    results = asyncio.run(scenario())
+
+    assert fake_network['calls'] == 1
+    assert all(result == {"result": "ok"} for result in results)
+    assert remotes_utils.http_singleflight_stats['deduplicated'] == 4
+    assert not remotes_utils._http_inflight
+
+def test_different_payloads_are_not_shared(fake_network):
+    async def scenario():
+        return await asyncio.gather(pull(payload={"id": 1}, api_cache_ttl=0), pull(payload={"id": 2}, api_cache_ttl=0))
+
+    asyncio.run(scenario())
+
+    assert fake_network['calls'] == 2
+
+def test_successful_result_is_cached_for_ttl(fake_network):
+    async def scenario():
+        first = await pull(api_cache_ttl=60)
+        second = await pull(api_cache_ttl=60)
+        return first, second
+
+    first, second = asyncio.run(scenario())
+
+    assert first == second == {"result": "ok"}
+    assert fake_network['calls'] == 1
+    assert remotes_utils.http_singleflight_stats['cache_hits'] == 1
+
+def test_error_is_not_cached(fake_network):
+    fake_network['result'] = {"error": "boom"}
+
+    async def scenario():
+        await pull(api_cache_ttl=60)
+        await pull(api_cache_ttl=60)
+
+    asyncio.run(scenario())
+
+    assert fake_network['calls'] == 2
+    assert not remotes_utils._http_results_cache
+
+def test_late_call_returns_late_result_and_caches_background_answer(fake_network):
+    fake_network['delay'] = 0.2
+
+    async def scenario():
+        with tick_budget(tick_name="test", budget_sec=0.05):
+            late_result = await pull(api_cache_ttl=60)
+        # La requête abandonnée finit en arrière-plan
+        await asyncio.sleep(0.3)
+        cached_result = await pull(api_cache_ttl=60)
+        return late_result, cached_result
+
+    late_result, cached_result = asyncio.run(scenario())
+
+    assert late_result.get("late", False) is True
+    assert cached_result == {"result": "ok"}
+    assert fake_network['calls'] == 1
+    assert remotes_utils.http_singleflight_stats['cache_hits'] == 1
+
+def test_call_without_budget_left_is_late_without_network(fake_network):
+    async def scenario():
+        with tick_budget(tick_name="test", budget_sec=0):
+            return await pull(api_cache_ttl=0)
+
+    result = asyncio.run(scenario())
+
+    assert result.get("late", False) is True
+    assert fake_network['calls'] == 0
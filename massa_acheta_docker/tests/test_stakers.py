@@ -0,0 +1,105 @@
+# massa_acheta_docker/tests/test_stakers.py
+import random
+from array import array
+
+import pytest
+
+from remotes import stakers
+
+@pytest.fixture(autouse=True)
+def empty_stakers(monkeypatch):
+    monkeypatch.setattr(stakers, "stakers_table", {})
+    monkeypatch.setattr(stakers, "stakers_total_rolls", 0)
+    monkeypatch.setattr(stakers, "stakers_index", {"version": 0, "rolls": array("q"), "gini": None})
+
+def brute_force_gini(rolls: list=[]) -> float:
+    nb_stakers = len(rolls)
+    return sum(abs(x - y) for x in rolls for y in rolls) / (2 * nb_stakers * sum(rolls))
+
+def test_rank_and_percentile():
+    stakers.apply_stakers_table(new_table={"AU1": 10, "AU2": 50, "AU3": 50, "AU4": 100})
+
+    assert stakers.get_staker_rank(rolls=100) == 1
+    # Ex aequo : même rang
+    assert stakers.get_staker_rank(rolls=50) == 2
+    assert stakers.get_staker_rank(rolls=10) == 4
+    assert stakers.get_staker_percentile(rolls=10) == 0.0
+    assert stakers.get_staker_percentile(rolls=50) == 25.0
+    assert stakers.get_staker_percentile(rolls=100) == 75.0
+
+def test_top_share_and_wallet_position():
+    stakers.apply_stakers_table(new_table={"AU1": 10, "AU2": 30, "AU3": 60})
+
+    assert stakers.get_top_share(top_n=1) == pytest.approx(60.0)
+    assert stakers.get_top_share(top_n=2) == pytest.approx(90.0)
+    assert stakers.get_top_share(top_n=10) == pytest.approx(100.0)
+    assert stakers.get_wallet_staking_position(wallet_address="AU2") == {
+        "rolls": 30,
+        "rank": 2,
+        "stakers": 3,
+        "percentile": pytest.approx(100 / 3),
+        "share": pytest.approx(30.0)
+    }
+    assert stakers.get_wallet_staking_position(wallet_address="AU9") is None
+
+def test_gini_bounds():
+    stakers.apply_stakers_table(new_table={f"AU{i}": 7 for i in range(10)})
+    assert stakers.get_stakers_gini() == pytest.approx(0.0)
+
+    stakers.apply_stakers_table(new_table={f"AU{i}": (1000 if i == 0 else 0) for i in range(10)})
+    assert stakers.get_stakers_gini() == pytest.approx(0.9)
+
+def test_empty_table():
+    assert stakers.get_staker_rank(rolls=5) == 1
+    assert stakers.get_staker_percentile(rolls=5) == 0.0
+    assert stakers.get_top_share(top_n=10) == 0.0
+    assert stakers.get_stakers_gini() == 0.0
+
+def test_diff_and_total_rolls():
+    stakers.apply_stakers_table(new_table={"AU1": 10, "AU2": 20})
+
+    stakers_diff = stakers.apply_stakers_table(new_table={"AU2": 25, "AU3": 5})
+
+    assert stakers_diff['added'] == {"AU3": 5}
+    assert stakers_diff['removed'] == {"AU1": 10}
+    assert stakers_diff['changed'] == {"AU2": (20, 25)}
+    assert stakers_diff['rolls_delta'] == 0
+    assert stakers.stakers_total_rolls == 30
+    assert list(stakers.stakers_index['rolls']) == [5, 25]
+
+def test_unchanged_table_keeps_index_version():
+    stakers.apply_stakers_table(new_table={"AU1": 10, "AU2": 20})
+    version = stakers.stakers_index['version']
+
+    stakers.apply_stakers_table(new_table={"AU1": 10, "AU2": 20})
+
+    assert stakers.stakers_index['version'] == version
+
+def test_incremental_updates_match_full_rebuild():
+    random_gen = random.Random(42)
+    table = {f"AU{i}": random_gen.randint(1, 1000) for i in range(2000)}
+    stakers.apply_stakers_table(new_table=dict(table))
+
+    for _ in range(25):
+        # Petit diff (sous INDEX_REBUILD_RATIO) : chemin par bisection
+        table = dict(table)
+        for address in random_gen.sample(sorted(table), 20):
+            table[address] = random_gen.randint(1, 1000)
+        for address in random_gen.sample(sorted(table), 3):
+            del table[address]
+        for _ in range(3):
+            table[f"AU{random_gen.random()}"] = random_gen.randint(1, 1000)
+        stakers.apply_stakers_table(new_table=table)
+
+        sorted_rolls = sorted(table.values())
+        assert list(stakers.stakers_index['rolls']) == sorted_rolls
+        assert stakers.stakers_total_rolls == sum(sorted_rolls)
+    assert stakers.get_stakers_gini() == pytest.approx(brute_force_gini(rolls=sorted_rolls))
+
+def test_gini_is_recomputed_after_update():
+    stakers.apply_stakers_table(new_table={"AU1": 10, "AU2": 10})
+    assert stakers.get_stakers_gini() == pytest.approx(0.0)
+
+    stakers.apply_stakers_table(new_table={"AU1": 10, "AU2": 30})
+
+    assert stakers.get_stakers_gini() == pytest.approx(brute_force_gini(rolls=[10, 30]))
@@ -0,0 +1,150 @@
+# massa_acheta_docker/tests/test_timeseries.py
+from collections import deque
+from time import time
+
+import pytest
+
+from app_config import app_config
+from remotes import timeseries
+from remotes.store import SERIES_WALLET_STAT, SERIES_NETWORK_STAT, get_tier_series
+
+# Début d'un jour UTC récent : les paliers ne sont pas purgés par leur rétention pendant le test
+DAY_START = int(time() // 86400 * 86400) - 2 * 86400
+SERIES_KEY = {"series": SERIES_WALLET_STAT, "node_name": "node", "wallet_address": "AU1"}
+
+@pytest.fixture(autouse=True)
+def empty_rollups(monkeypatch):
+    monkeypatch.setattr(timeseries, "_rollups", {})
+    monkeypatch.setitem(app_config['service'], "stat_raw_retention_hours", 48)
+    monkeypatch.setitem(app_config['service'], "stat_hour_retention_days", 90)
+
+def wallet_measure(offset_sec: int=0, ok_blocks: int=1, nok_blocks: int=0, balance: float=0) -> dict:
+    return {"time": DAY_START + offset_sec, "cycle": offset_sec // 2000, "ok_blocks": ok_blocks, "nok_blocks": nok_blocks, "balance": balance}
+
+def test_tier_series_names():
+    assert get_tier_series(series=SERIES_WALLET_STAT, tier="raw") == SERIES_WALLET_STAT
+    assert get_tier_series(series=SERIES_WALLET_STAT, tier="hour") == f"{SERIES_WALLET_STAT}:hour"
+
+def test_hour_bucket_sums_counters_and_keeps_last_values():
+    stat = deque()
+    for offset_sec, balance in ((0, 1.0), (600, 2.0), (1800, 3.0)):
+        timeseries.append_stat_sample(stat=stat, entry=wallet_measure(offset_sec=offset_sec, ok_blocks=2, nok_blocks=1, balance=balance), **SERIES_KEY)
+
+    _, entries = timeseries.get_stat_range(stat=stat, range_sec=30 * 86400, time_now=DAY_START + 3600, **SERIES_KEY)
+
+    assert len(entries) == 1
+    bucket = entries[0]
+    assert bucket['time'] == DAY_START
+    assert bucket['count'] == 3
+    assert bucket['ok_blocks'] == 6
+    assert bucket['nok_blocks'] == 3
+    assert bucket['balance'] == 3.0
+    assert bucket['first_cycle'] == 0
+    assert bucket['last_time'] == DAY_START + 1800
+
+def test_bucket_is_closed_by_next_bucket_sample():
+    nb_closed = timeseries.add_rollup_sample(entry=wallet_measure(offset_sec=0), **SERIES_KEY)
+    assert nb_closed == 0
+    assert timeseries.get_closed_rollups(**SERIES_KEY) == {"hour": [], "day": []}
+
+    nb_closed = timeseries.add_rollup_sample(entry=wallet_measure(offset_sec=3600), **SERIES_KEY)
+
+    assert nb_closed == 1
+    closed_rollups = timeseries.get_closed_rollups(**SERIES_KEY)
+    assert [bucket['time'] for bucket in closed_rollups['hour']] == [DAY_START]
+    assert closed_rollups['day'] == []
+
+    nb_closed = timeseries.add_rollup_sample(entry=wallet_measure(offset_sec=86400), **SERIES_KEY)
+
+    assert nb_closed == 2
+    assert [bucket['time'] for bucket in timeseries.get_closed_rollups(**SERIES_KEY)['day']] == [DAY_START]
+
+def test_late_sample_for_closed_bucket_is_ignored():
+    timeseries.add_rollup_sample(entry=wallet_measure(offset_sec=0, ok_blocks=1), **SERIES_KEY)
+    timeseries.add_rollup_sample(entry=wallet_measure(offset_sec=3600, ok_blocks=1), **SERIES_KEY)
+
+    timeseries.add_rollup_sample(entry=wallet_measure(offset_sec=60, ok_blocks=5), **SERIES_KEY)
+
+    assert timeseries.get_closed_rollups(**SERIES_KEY)['hour'][0]['ok_blocks'] == 1
+
+def test_network_series_keeps_last_values_only():
+    network_key = {"series": SERIES_NETWORK_STAT}
+    timeseries.add_rollup_sample(entry={"time": DAY_START, "stakers": 10}, **network_key)
+    timeseries.add_rollup_sample(entry={"time": DAY_START + 60, "stakers": 12}, **network_key)
+    timeseries.add_rollup_sample(entry={"time": DAY_START + 3600, "stakers": 13}, **network_key)
+
+    assert timeseries.get_closed_rollups(**network_key)['hour'][0]['stakers'] == 12
+
+def test_restore_rebuilds_same_rollups_from_saved_buckets_and_raw_samples():
+    measures = [wallet_measure(offset_sec=offset_sec, ok_blocks=offset_sec % 3) for offset_sec in range(0, 2 * 86400, 1800)]
+    live_stat = deque()
+    for measure in measures:
+        timeseries.append_stat_sample(stat=live_stat, entry=dict(measure), **SERIES_KEY)
+    live_state = timeseries._rollups[tuple(SERIES_KEY.values())]
+    saved_tiers = {tier: [dict(bucket) for bucket in buckets] for tier, buckets in timeseries.get_closed_rollups(**SERIES_KEY).items()}
+    expected_open = {tier: dict(live_state['open'][tier]) for tier in timeseries.ROLLUP_TIERS}
+    expected_closed = {tier: [dict(bucket) for bucket in buckets] for tier, buckets in saved_tiers.items()}
+
+    # Redémarrage : buckets figés sauvegardés + mesures brutes rejouées
+    timeseries._rollups.clear()
+    restored_stat = deque(dict(measure) for measure in measures)
+    timeseries.restore_rollups(stat=restored_stat, tiers=saved_tiers, **SERIES_KEY)
+
+    restored_state = timeseries._rollups[tuple(SERIES_KEY.values())]
+    assert {tier: restored_state[tier] for tier in timeseries.ROLLUP_TIERS} == expected_closed
+    assert restored_state['open'] == expected_open
+
+def test_restore_without_saved_buckets_rebuilds_them_from_raw_samples():
+    stat = deque(wallet_measure(offset_sec=offset_sec) for offset_sec in (0, 1800, 3600, 5400))
+
+    timeseries.restore_rollups(stat=stat, tiers={}, **SERIES_KEY)
+
+    closed_rollups = timeseries.get_closed_rollups(**SERIES_KEY)
+    assert [(bucket['time'], bucket['count']) for bucket in closed_rollups['hour']] == [(DAY_START, 2)]
+    assert timeseries._rollups[tuple(SERIES_KEY.values())]['open']['hour']['count'] == 2
+
+def test_raw_samples_expire_after_raw_retention():
+    stat = deque()
+    timeseries.append_stat_sample(stat=stat, entry=wallet_measure(offset_sec=0), **SERIES_KEY)
+    timeseries.append_stat_sample(stat=stat, entry=wallet_measure(offset_sec=48 * 3600 + 1), **SERIES_KEY)
+
+    assert [measure['time'] for measure in stat] == [DAY_START + 48 * 3600 + 1]
+
+def test_select_tier():
+    assert timeseries.select_tier(range_sec=48 * 3600) == "raw"
+    assert timeseries.select_tier(range_sec=48 * 3600 + 1) == "hour"
+    assert timeseries.select_tier(range_sec=90 * 86400) == "hour"
+    assert timeseries.select_tier(range_sec=91 * 86400) == "day"
+    assert timeseries.select_tier(range_sec=None) == "day"
+
+def test_get_stat_range_filters_raw_samples():
+    stat = deque(wallet_measure(offset_sec=offset_sec) for offset_sec in (0, 3600, 7200))
+
+    tier, entries = timeseries.get_stat_range(stat=stat, range_sec=3600, time_now=DAY_START + 7200, **SERIES_KEY)
+
+    assert tier == "raw"
+    assert [entry['time'] for entry in entries] == [DAY_START + 3600, DAY_START + 7200]
+
+@pytest.mark.parametrize("text, range_sec", [
+    ("48h", 48 * 3600),
+    ("7d", 7 * 86400),
+    (" 2W ", 14 * 86400),
+    ("all", None)
+])
+def test_parse_stat_range(text, range_sec):
+    assert timeseries.parse_stat_range(text=text) == range_sec
+
+@pytest.mark.parametrize("text", ["", "h", "0d", "1.5d", "10m", "-3d"])
+def test_parse_stat_range_rejects_bad_input(text):
+    with pytest.raises(ValueError):
+        timeseries.parse_stat_range(text=text)
+
+def test_command_range_and_format(monkeypatch):
+    monkeypatch.setitem(app_config['service'], "chart_default_range", "48h")
+
+    assert timeseries.get_command_range(text="/chart_wallet 30d") == 30 * 86400
+    assert timeseries.get_command_range(text="/chart_wallet") == 48 * 3600
+    assert timeseries.get_command_range(text="📊 Chart wallet") == 48 * 3600
+    assert timeseries.format_stat_range(range_sec=30 * 86400) == "30d"
+    assert timeseries.format_stat_range(range_sec=36 * 3600) == "36h"
+    assert timeseries.format_stat_range(range_sec=None) == "all"
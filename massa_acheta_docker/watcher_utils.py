@@ -2,6 +2,8 @@
 import os
 import json
 
+from remotes.persistence import forget_wallet_state
+
 def load_json_watcher(filename, default=None):
     if not os.path.exists(filename):
         return default if default is not None else {}
@@ -11,3 +13,11 @@ def load_json_watcher(filename, default=None):
 def save_json_watcher(filename, data):
     with open(filename, "wt") as f:
         json.dump(data, f, indent=2, ensure_ascii=False)
+
+def forget_watcher_history(node_name, wallet_address=None):
+    """
+    Oubli de l'historique en mémoire d'un wallet (ou de tous les wallets d'un node) dans les watchers
+    à historique (forget_wallet déclaré à remotes/persistence.py) : un wallet supprimé puis ré-ajouté
+    repart de zéro. En base, les lignes sont supprimées avec le wallet (remotes/store.py).
+    """
+    return forget_wallet_state(node_name=node_name, wallet_address=wallet_address)
@@ -3,16 +3,22 @@
 import asyncio
 import json
 import os
+from bisect import bisect_right
 from datetime import datetime
 from loguru import logger
-from remotes_utils import pull_http_api
+from app_config import app_config
+from remotes_utils import t_now
+from remotes.addresses import get_snapshot_wallet
+from remotes.store import is_store_enabled, build_history_statements, build_replace_samples_statements, load_history, get_entry_time
+from remotes.persistence import register_persistence, mark_dirty, write_json_file, write_store_statements, copy_nested
 import app_globals
 from alert_manager import send_alert
 
 WATCH_FILE = "watchers_state/balances_seen.json"
-_save_lock = asyncio.Lock()
 
 def load_json_history():
+    if is_store_enabled():
+        return load_history(series="balance")
     if os.path.exists(WATCH_FILE):
         try:
             with open(WATCH_FILE, "rt") as f:
@@ -21,109 +27,224 @@ def load_json_history():
             logger.error(f"[BALANCE] Could not load balance watcher state: {e}")
     return {}
 
-async def save_json_history(history):
-    async with _save_lock:
-        tmp_file = WATCH_FILE + ".tmp"
-        try:
-            with open(tmp_file, "wt") as f:
-                json.dump(history, f, indent=2, ensure_ascii=False)
-            os.replace(tmp_file, WATCH_FILE)
-        except Exception as e:
-            logger.error(f"[BALANCE] Could not save balance watcher state: {e}")
-
-async def watch_balance(polling_interval=30):
-    logger.info(f"[BALANCE] JSON Watcher started")
-    # Structure :
-    # {
-    #   "My node": {
-    #     "AU12xxx...": [
-    #         {"datetime": "...", "balance": ...},
-    #         ...
-    #     ],
-    #     ...
-    #   },
-    #   ...
-    # }
-    history = load_json_history()
-    if not isinstance(history, dict):
-        history = {}
-
-    while True:
-        for node_name, node_data in app_globals.app_results.items():
-            wallets = node_data.get("wallets", {})
-            if not wallets:
-                continue
-
-            if node_name not in history:
-                history[node_name] = {}
-
-            for wallet_address in wallets:
-                try:
-                    resp = await pull_http_api(
-                        api_url=node_data['url'],
-                        api_method="POST",
-                        api_payload=json.dumps({
-                            "jsonrpc": "2.0",
-                            "method": "get_addresses",
-                            "params": [[wallet_address]],
-                            "id": 0
-                        }),
-                        api_content_type="application/json"
+# État du watcher (chargé au premier passage), dernière version de snapshot traitée
+# et wallets (node, wallet) dont l'historique compacté au chargement reste à réécrire en base
+_watcher_state = {"last_version": 0, "history": None, "compacted": set()}
+
+def collect_history():
+    """
+    Collecteur de remotes/persistence.py : nouvelles mesures (SQLite) ou copie à sérialiser (JSON).
+    Un historique compacté au chargement est réécrit en entier (une seule fois), les autres ne reçoivent que leurs ajouts.
+    """
+    history = _watcher_state['history']
+    if history is None:
+        return None
+    if not is_store_enabled():
+        # Le fichier est réécrit en entier à chaque fois
+        _watcher_state['compacted'].clear()
+        return write_json_file, (WATCH_FILE, copy_nested(history))
+
+    compacted = _watcher_state['compacted']
+    statements = []
+    for node_name, wallet_address in list(compacted):
+        statements += build_replace_samples_statements(
+            series="balance",
+            node_name=node_name,
+            wallet_address=wallet_address,
+            entries=history.get(node_name, {}).get(wallet_address, []),
+            on_commit=lambda compacted_key=(node_name, wallet_address): compacted.discard(compacted_key)
+        )
+    statements += build_history_statements(
+        series="balance",
+        history={
+            node_name: {
+                wallet_address: wallet_history
+                for wallet_address, wallet_history in node_history.items()
+                if (node_name, wallet_address) not in compacted
+            }
+            for node_name, node_history in history.items()
+        }
+    )
+    return write_store_statements, (statements,)
+
+def forget_wallet(node_name: str="", wallet_address: str=None) -> bool:
+    """Oubli de l'historique d'un wallet (ou de tous les wallets du node) : un wallet ré-ajouté repart de zéro."""
+    # Plus de réécriture en attente pour ce wallet (ses lignes partent avec lui)
+    _watcher_state['compacted'].difference_update([
+        key for key in _watcher_state['compacted']
+        if key[0] == node_name and (wallet_address is None or key[1] == wallet_address)
+    ])
+
+    history = _watcher_state['history']
+    if not history or node_name not in history:
+        return False
+    if wallet_address is None:
+        history.pop(node_name, None)
+    elif history[node_name].pop(wallet_address, None) is None:
+        return False
+    return True
+
+register_persistence(name="balance", collect_func=collect_history, forget_func=forget_wallet)
+
+def compress_balance_history(wallet_history: list=[]) -> list:
+    """
+    Ancien format (une mesure par passage) -> événements : une entrée quand la balance change,
+    plus une keyframe par balance_keyframe_period_sec si elle ne bouge pas. Les entrées gardées
+    sont les mêmes objets et la dernière est toujours gardée (suivi des écritures de remotes/store.py).
+
+    Format compressé, trié par 'time' :
+      {"time", "datetime", "balance"}                    changement de balance
+      {"time", "datetime", "balance", "keyframe": true}  balance identique à l'entrée précédente
+    Pas de champ de durée : une balance vaut jusqu'à l'entrée suivante (ou jusqu'à maintenant pour la
+    dernière), c'est la règle "égale à la précédente" qui code les séries. Les keyframes bornent l'écart
+    entre deux entrées pour que get_balance_at reste juste même après un trou dans les mesures.
+    Sans effet sur un historique déjà compressé.
+    """
+    keyframe_sec = app_config['service']['balance_keyframe_period_sec']
+    events = []
+    for position, entry in enumerate(wallet_history):
+        if "time" not in entry:
+            entry['time'] = int(get_entry_time(entry))
+        is_last = position == len(wallet_history) - 1
+        if events and not is_last and entry['balance'] == events[-1]['balance'] and entry['time'] - events[-1]['time'] < keyframe_sec:
+            continue
+        if events and entry['balance'] == events[-1]['balance']:
+            entry['keyframe'] = True
+        events.append(entry)
+    return events
+
+def record_balance(wallet_history: list=[], balance: float=0, time_now: int=0) -> bool:
+    """Ajoute un événement si la balance a changé ou si la dernière entrée date d'une keyframe. True si ajouté."""
+    last_event = wallet_history[-1] if wallet_history else None
+    if last_event is not None and balance == last_event['balance']:
+        if time_now - last_event['time'] < app_config['service']['balance_keyframe_period_sec']:
+            # Même balance : la série en cours s'allonge jusqu'au prochain événement
+            return False
+        wallet_history.append({
+            "time": time_now,
+            "datetime": datetime.fromtimestamp(time_now).isoformat(),
+            "balance": balance,
+            "keyframe": True
+        })
+        return True
+    wallet_history.append({
+        "time": time_now,
+        "datetime": datetime.fromtimestamp(time_now).isoformat(),
+        "balance": balance
+    })
+    return True
+
+def get_balance_at(node_name: str="", wallet_address: str="", unix_time: float=0) -> float:
+    """Balance connue à cet instant (dernier événement <= unix_time, par bisection), None si avant l'historique."""
+    history = _watcher_state['history'] or {}
+    wallet_history = history.get(node_name, {}).get(wallet_address, [])
+    position = bisect_right(wallet_history, unix_time, key=lambda event: event['time'])
+    if position == 0:
+        return None
+    return wallet_history[position - 1]['balance']
+
+def get_balance_change(node_name: str="", wallet_address: str="", period_sec: int=86400, time_now: float=0) -> float:
+    """Variation de balance sur period_sec jusqu'à time_now, None si l'historique ne remonte pas assez loin."""
+    balance_now = get_balance_at(node_name=node_name, wallet_address=wallet_address, unix_time=time_now)
+    balance_before = get_balance_at(node_name=node_name, wallet_address=wallet_address, unix_time=time_now - period_sec)
+    if balance_now is None or balance_before is None:
+        return None
+    return balance_now - balance_before
+
+async def watch_balance_tick() -> None:
+    """Traite le dernier snapshot d'adresses s'il est nouveau (job déclenché à chaque snapshot, cf. remotes/scheduler.py)."""
+    if _watcher_state['history'] is None:
+        logger.info(f"[BALANCE] JSON Watcher started")
+        # Structure :
+        # {
+        #   "My node": {
+        #     "AU12xxx...": [
+        #         {"time": ..., "datetime": "...", "balance": ...},                    <- changement
+        #         {"time": ..., "datetime": "...", "balance": ..., "keyframe": true},  <- inchangée
+        #         ...
+        #     ],
+        #     ...
+        #   },
+        #   ...
+        # }
+        history = load_json_history()
+        if not isinstance(history, dict):
+            history = {}
+        for node_name, node_history in history.items():
+            for wallet_address, wallet_history in node_history.items():
+                node_history[wallet_address] = compress_balance_history(wallet_history=wallet_history)
+                if len(node_history[wallet_address]) < len(wallet_history):
+                    # Ancien format : réécriture unique de l'historique compacté (base ou fichier)
+                    _watcher_state['compacted'].add((node_name, wallet_address))
+        _watcher_state['history'] = history
+        if _watcher_state['compacted']:
+            logger.info(f"[BALANCE] Compacted balance history of {len(_watcher_state['compacted'])} wallet(s)")
+            mark_dirty(name="balance")
+    history = _watcher_state['history']
+
+    snapshot = app_globals.address_snapshot
+    if snapshot['version'] == _watcher_state['last_version']:
+        return
+    _watcher_state['last_version'] = snapshot['version']
+
+    time_now = await t_now()
+    history_changed = False
+    for node_name, node_data in app_globals.app_results.items():
+        wallets = node_data.get("wallets", {})
+        if not wallets:
+            continue
+
+        if node_name not in history:
+            history[node_name] = {}
+
+        for wallet_address in wallets:
+            try:
+                addr_data = get_snapshot_wallet(snapshot, node_name, wallet_address)
+                if not addr_data:
+                    continue
+
+                final_balance = float(addr_data.get("final_balance", 0))
+
+                # Init de la liste d'événements
+                if wallet_address not in history[node_name]:
+                    history[node_name][wallet_address] = []
+
+                wallet_history = history[node_name][wallet_address]
+                prev = wallet_history[-1] if wallet_history else None
+
+                # Changement ou keyframe seulement (historique compressé)
+                if record_balance(wallet_history=wallet_history, balance=final_balance, time_now=time_now):
+                    history_changed = True
+
+                # Détection du changement de balance
+                if prev and final_balance != prev["balance"]:
+                    now_iso = datetime.now().isoformat()
+                    delta = final_balance - prev["balance"]
+                    direction = "Increase" if delta > 0 else "Decrease"
+                    emoji = "🟢" if delta > 0 else "🔴"
+                    change_24h = get_balance_change(node_name=node_name, wallet_address=wallet_address, period_sec=86400, time_now=time_now)
+                    message = (
+                        f"{emoji} <b>Balance change detected</b>\n"
+                        f"👛 Wallet: <code>{wallet_address}</code>\n"
+                        f"🏠 Node: <b>{node_name}</b>\n"
+                        f"🗓 {now_iso}\n"
+                        f"💸 {direction} of <b>{abs(delta):,.4f} MAS</b>\n"
+                        f"💰 New balance: <b>{final_balance:,.4f} MAS</b>"
+                        + (f"\n📊 24h change: <b>{change_24h:+,.4f} MAS</b>" if change_24h is not None else "")
                     )
+                    await send_alert(
+                        alert_type="wallet_balance_drop" if delta < 0 else "wallet_balance_up",
+                        node=node_name,
+                        wallet=wallet_address,
+                        level="info",
+                        html=message
+                    )
+                    logger.info(f"[BALANCE] Change for {wallet_address}@{node_name}: {prev['balance']} -> {final_balance}")
+
+            except Exception as e:
+                logger.error(f"[BALANCE] Error processing balance for {wallet_address}@{node_name}: {str(e)}")
 
-                    # Correction ici !
-                    if (
-                        not resp or
-                        "result" not in resp or
-                        "result" not in resp["result"] or
-                        not isinstance(resp["result"]["result"], list) or
-                        not resp["result"]["result"]
-                    ):
-                        continue
-
-                    addr_data = resp["result"]["result"][0]
-                    final_balance = float(addr_data.get("final_balance", 0))
-
-
-                    # Init de la liste d'observations
-                    if wallet_address not in history[node_name]:
-                        history[node_name][wallet_address] = []
-
-                    wallet_history = history[node_name][wallet_address]
-                    prev = wallet_history[-1] if wallet_history else None
-
-                    # Détection du changement de balance
-                    if prev and final_balance != prev["balance"]:
-                        now_iso = datetime.now().isoformat()
-                        delta = final_balance - prev["balance"]
-                        direction = "Increase" if delta > 0 else "Decrease"
-                        emoji = "🟢" if delta > 0 else "🔴"
-                        message = (
-                            f"{emoji} <b>Balance change detected</b>\n"
-                            f"👛 Wallet: <code>{wallet_address}</code>\n"
-                            f"🏠 Node: <b>{node_name}</b>\n"
-                            f"🗓 {now_iso}\n"
-                            f"💸 {direction} of <b>{abs(delta):,.4f} MAS</b>\n"
-                            f"💰 New balance: <b>{final_balance:,.4f} MAS</b>"
-                        )
-                        await send_alert(
-                            alert_type="wallet_balance_drop" if delta < 0 else "wallet_balance_up",
-                            node=node_name,
-                            wallet=wallet_address,
-                            level="info",
-                            html=message
-                        )
-                        logger.info(f"[BALANCE] Change for {wallet_address}@{node_name}: {prev['balance']} -> {final_balance}")
-
-                    # Ajoute à l'historique (toujours)
-                    entry = {
-                        "datetime": datetime.now().isoformat(),
-                        "balance": final_balance
-                    }
-                    history[node_name][wallet_address].append(entry)
-
-                except Exception as e:
-                    logger.error(f"[BALANCE] Error processing balance for {wallet_address}@{node_name}: {str(e)}")
-
-        await save_json_history(history)
-        await asyncio.sleep(polling_interval)
+    if not history_changed:
+        return
+    # Écriture différée (remotes/persistence.py)
+    mark_dirty(name="balance")
@@ -3,8 +3,11 @@
 import asyncio
 from loguru import logger
 
-from watcher_utils import load_json_watcher, save_json_watcher
-from remotes_utils import pull_http_api
+from watcher_utils import load_json_watcher
+from remotes_utils import pull_http_api_batch, get_node_read_url
+from remotes.addresses import get_snapshot_wallet
+from remotes.store import is_store_enabled, build_seen_statements, load_seen
+from remotes.persistence import register_persistence, mark_dirty, write_json_file, write_store_statements, copy_nested
 import app_globals
 from alert_manager import send_alert
 from watchers.watchers_control import is_watcher_enabled
@@ -34,117 +37,109 @@ def format_block_info(block_data):
         f"🔹 View on explorer: {explorer_url}"
     )
 
-async def get_block_info(block_id, api_url):
+async def get_blocks_info(block_ids, api_url):
+    # Un seul batch JSON-RPC pour tous les nouveaux blocks, erreurs rapportées par block
+    blocks_info = {}
     try:
-        payload = {
-            "jsonrpc": "2.0",
-            "method": "get_blocks",
-            "params": [[block_id]],
-            "id": 0
-        }
-        resp = await pull_http_api(
+        answers = await pull_http_api_batch(
             api_url=api_url,
-            api_method="POST",
-            api_payload=payload,
-            api_content_type="application/json"
+            api_calls=[("get_blocks", [[block_id]]) for block_id in block_ids]
         )
-        block_list = None
-        if "result" in resp and isinstance(resp["result"], dict) and "result" in resp["result"]:
-            block_list = resp["result"]["result"]
-        elif "result" in resp and isinstance(resp["result"], list):
-            block_list = resp["result"]
-        else:
-            block_list = []
-        if block_list:
-            return block_list[0]
+        for block_id, answer in zip(block_ids, answers):
+            block_list = answer.get("result", None)
+            if isinstance(block_list, list) and block_list:
+                blocks_info[block_id] = block_list[0]
+            else:
+                logger.error(f"[BLOCKS] Erreur lors de la récupération du block {block_id}: {answer.get('error', 'résultat vide')}")
     except Exception as e:
-        logger.error(f"[BLOCKS] Erreur lors de la récupération du block {block_id}: {str(e)}")
-    return None
-
-async def fetch_and_alert_block(block_id, node_url, node_name, wallet_address):
-    block_data = await get_block_info(block_id, node_url)
-    if block_data:
-        message = format_block_info(block_data)
-        await send_alert(
-            alert_type="watcher_block_produced",
-            node=node_name,
-            wallet=wallet_address,
-            level="info",
-            html=message,
-            disable_web_page_preview=True
-        )
-        logger.success(f"🟢 Nouveau block créé par {wallet_address}: {block_id}")
-    else:
-        logger.warning(f"[BLOCKS] Block {block_id} non trouvé ou non récupéré par l'API.")
-
-async def watch_blocks(polling_interval=10):
-    try:
-        previous_blocks = load_json_watcher(WATCH_FILE, {})
-    except Exception as e:
-        logger.error(f"[BLOCKS] Erreur chargement {WATCH_FILE} : {str(e)}")
-        previous_blocks = {}
-
-    logger.info(f"[BLOCKS] Watcher: blocks started")
-    while True:
-        if not is_watcher_enabled("blocks"):
-            logger.info(f"[BLOCKS] Désactivé, je dors...")
-            await asyncio.sleep(60)
-            continue
-        
-        for node_name, node_data in app_globals.app_results.items():
-            node_url = node_data.get("url")
-            for wallet_address in node_data.get("wallets", {}):
-                logger.debug(f"[BLOCKS] Checking wallet {wallet_address} on node {node_name}")
-                try:
-                    payload = {
-                        "jsonrpc": "2.0",
-                        "method": "get_addresses",
-                        "params": [[wallet_address]],
-                        "id": 0
-                    }
-                    resp = await pull_http_api(
-                        api_url=node_url,
-                        api_method="POST",
-                        api_payload=payload,
-                        api_content_type="application/json"
-                    )
-                except Exception as e:
-                    logger.warning(f"[BLOCKS] API error for {wallet_address}@{node_name}: {str(e)}")
-                    continue
-
-                result = resp.get("result", {}).get("result")
-
-                if not result or not isinstance(result, list) or not result[0]:
-                    logger.debug(f"[BLOCKS] {wallet_address}: résultat API inexploitable")
-                    continue
-                if "created_blocks" not in result[0]:
-                    logger.debug(f"[BLOCKS] {wallet_address}: champ 'created_blocks' absent")
-                    continue
-                created_blocks = result[0]["created_blocks"]
-                log_short_blocks(wallet_address, created_blocks, label="created_blocks")
-
-                old_blocks = previous_blocks.get(wallet_address, [])
-                log_short_blocks(wallet_address, old_blocks, label="old_blocks")
-
-                new_blocks = [b for b in created_blocks if b not in old_blocks]
-                log_short_blocks(wallet_address, new_blocks, label="new_blocks")
-
-                if not created_blocks or len(created_blocks) == 0:
-                    logger.warning(f"[BLOCKS] {wallet_address}@{node_name}: Pas de blocks créés (created_blocks vide). Peut-être une limitation du node public.")
-                    continue
-
-                if new_blocks:
-                    for block_id in new_blocks:
-                        asyncio.create_task(
-                            fetch_and_alert_block(block_id, node_url, node_name, wallet_address)
-                        )
-                    previous_blocks[wallet_address] = created_blocks
-                    try:
-                        save_json_watcher(WATCH_FILE, previous_blocks)
-                        logger.info(f"[BLOCKS] {WATCH_FILE} mis à jour pour {wallet_address} ({len(created_blocks)} blocks connus)")
-                    except Exception as e:
-                        logger.error(f"[BLOCKS] Erreur sauvegarde {WATCH_FILE}: {str(e)}")
-        await asyncio.sleep(polling_interval)
-
-    await save_history(history)
-    await asyncio.sleep(polling_interval)
+        logger.error(f"[BLOCKS] Erreur lors de la récupération des blocks {block_ids}: {str(e)}")
+    return blocks_info
+
+async def fetch_and_alert_blocks(block_ids, node_url, node_name, wallet_address):
+    blocks_info = await get_blocks_info(block_ids, node_url)
+    for block_id in block_ids:
+        block_data = blocks_info.get(block_id)
+        if block_data:
+            message = format_block_info(block_data)
+            await send_alert(
+                alert_type="watcher_block_produced",
+                node=node_name,
+                wallet=wallet_address,
+                level="info",
+                html=message,
+                disable_web_page_preview=True
+            )
+            logger.success(f"🟢 Nouveau block créé par {wallet_address}: {block_id}")
+        else:
+            logger.warning(f"[BLOCKS] Block {block_id} non trouvé ou non récupéré par l'API.")
+
+# État du watcher (chargé au premier passage) et dernière version de snapshot traitée
+_watcher_state = {"last_version": 0, "previous_blocks": None}
+
+def collect_seen():
+    """Collecteur de remotes/persistence.py : nouveaux identifiants (SQLite) ou copie à sérialiser (JSON)."""
+    previous_blocks = _watcher_state['previous_blocks']
+    if previous_blocks is None:
+        return None
+    if is_store_enabled():
+        return write_store_statements, (build_seen_statements(table="seen_blocks", seen=previous_blocks),)
+    return write_json_file, (WATCH_FILE, copy_nested(previous_blocks))
+
+register_persistence(name="blocks", collect_func=collect_seen)
+
+async def watch_blocks_tick() -> None:
+    """Traite le dernier snapshot d'adresses s'il est nouveau (job déclenché à chaque snapshot, cf. remotes/scheduler.py)."""
+    if _watcher_state['previous_blocks'] is None:
+        try:
+            if is_store_enabled():
+                previous_blocks = load_seen(table="seen_blocks")
+            else:
+                previous_blocks = load_json_watcher(WATCH_FILE, {})
+        except Exception as e:
+            logger.error(f"[BLOCKS] Erreur chargement {WATCH_FILE} : {str(e)}")
+            previous_blocks = {}
+
+        logger.info(f"[BLOCKS] Watcher: blocks started")
+        _watcher_state['previous_blocks'] = previous_blocks
+    previous_blocks = _watcher_state['previous_blocks']
+
+    if not is_watcher_enabled("blocks"):
+        return
+
+    snapshot = app_globals.address_snapshot
+    if snapshot['version'] == _watcher_state['last_version']:
+        return
+    _watcher_state['last_version'] = snapshot['version']
+
+    for node_name, node_data in app_globals.app_results.items():
+        node_url = get_node_read_url(node_name=node_name)
+        for wallet_address in node_data.get("wallets", {}):
+            logger.debug(f"[BLOCKS] Checking wallet {wallet_address} on node {node_name}")
+            addr_data = get_snapshot_wallet(snapshot, node_name, wallet_address)
+            if not addr_data:
+                logger.debug(f"[BLOCKS] {wallet_address}: résultat API inexploitable")
+                continue
+            if "created_blocks" not in addr_data:
+                logger.debug(f"[BLOCKS] {wallet_address}: champ 'created_blocks' absent")
+                continue
+            created_blocks = addr_data["created_blocks"]
+            log_short_blocks(wallet_address, created_blocks, label="created_blocks")
+
+            old_blocks = previous_blocks.get(wallet_address, [])
+            log_short_blocks(wallet_address, old_blocks, label="old_blocks")
+
+            new_blocks = [b for b in created_blocks if b not in old_blocks]
+            log_short_blocks(wallet_address, new_blocks, label="new_blocks")
+
+            if not created_blocks or len(created_blocks) == 0:
+                logger.warning(f"[BLOCKS] {wallet_address}@{node_name}: Pas de blocks créés (created_blocks vide). Peut-être une limitation du node public.")
+                continue
+
+            if new_blocks:
+                asyncio.create_task(
+                    fetch_and_alert_blocks(new_blocks, node_url, node_name, wallet_address)
+                )
+                previous_blocks[wallet_address] = created_blocks
+                # Écriture différée (remotes/persistence.py)
+                mark_dirty(name="blocks")
+                logger.info(f"[BLOCKS] {wallet_address}: {len(created_blocks)} blocks connus")
@@ -5,15 +5,18 @@ import json
 import os
 from datetime import datetime
 from loguru import logger
-from remotes_utils import pull_http_api
+from remotes.addresses import get_snapshot_wallet
+from remotes.store import is_store_enabled, build_history_statements, load_history
+from remotes.persistence import register_persistence, mark_dirty, write_json_file, write_store_statements, copy_nested
 import app_globals
 from alert_manager import send_alert
 from watchers.watchers_control import is_watcher_enabled
 
 WATCH_FILE = "watchers_state/missed_blocks_seen.json"
-_save_lock = asyncio.Lock()
 
 def load_json_history():
+    if is_store_enabled():
+        return load_history(series="missed_blocks")
     if os.path.exists(WATCH_FILE):
         try:
             with open(WATCH_FILE, "rt") as f:
@@ -22,113 +25,168 @@ def load_json_history():
             logger.error(f"[MISSED_BLOCK] Could not load missed blocks watcher state: {str(e)}")
     return {}
 
-async def save_json_history(history):
-    async with _save_lock:
-        tmp_file = WATCH_FILE + ".tmp"
-        try:
-            with open(tmp_file, "wt") as f:
-                json.dump(history, f, indent=2, ensure_ascii=False)
-            os.replace(tmp_file, WATCH_FILE)
-        except Exception as e:
-            logger.error(f"[MISSED_BLOCK] Could not save missed blocks watcher state: {str(e)}")
-
-async def watch_missed_blocks(polling_interval=30):
-    logger.info(f"[MISSED_BLOCK] JSON Watcher started")
-    # Structure :
-    # {
-    #   "My node": {
-    #     "AU12xxx...": [
-    #         {"datetime": "...", "cycle": ..., "missed": ...},
-    #         ...
-    #     ],
-    #     ...
-    #   },
-    #   ...
-    # }
-    history = load_json_history()
-    if not isinstance(history, dict):
-        history = {}
-
-    while True:
-        if not is_watcher_enabled("missed_blocks"):
-            logger.info(f"[MISSED_BLOCK] Désactivé, je dors...")
-            await asyncio.sleep(60)
+# État du watcher (chargé au premier passage), dernière version de snapshot traitée
+# et blocks manqués déjà signalés par cycle pas encore enregistré : {(node, wallet, cycle): nok_count}
+_watcher_state = {"last_version": 0, "history": None, "alerted": {}}
+
+def collect_history():
+    """Collecteur de remotes/persistence.py : nouvelles mesures (SQLite) ou copie à sérialiser (JSON)."""
+    history = _watcher_state['history']
+    if history is None:
+        return None
+    if is_store_enabled():
+        return write_store_statements, (build_history_statements(series="missed_blocks", history=history),)
+    return write_json_file, (WATCH_FILE, copy_nested(history))
+
+def forget_wallet(node_name: str="", wallet_address: str=None) -> bool:
+    """Oubli de l'historique d'un wallet (ou de tous les wallets du node) : un wallet ré-ajouté repart de zéro."""
+    # Blocks manqués signalés en direct (mémoire seulement, rien à réécrire)
+    alerted = _watcher_state['alerted']
+    for alerted_key in [key for key in alerted if key[0] == node_name and (wallet_address is None or key[1] == wallet_address)]:
+        alerted.pop(alerted_key, None)
+
+    history = _watcher_state['history']
+    if not history or node_name not in history:
+        return False
+    if wallet_address is None:
+        history.pop(node_name, None)
+    elif history[node_name].pop(wallet_address, None) is None:
+        return False
+    return True
+
+register_persistence(name="missed_blocks", collect_func=collect_history, forget_func=forget_wallet)
+
+async def watch_missed_blocks_tick(closed_cycle: int=None) -> None:
+    """
+    Deux passages :
+    - à chaque nouveau snapshot d'adresses (closed_cycle=None) : alerte dès que le nok_count d'un cycle
+      pas encore enregistré augmente, quelques secondes après le slot manqué ;
+    - en fin de cycle (remotes/cycles.py) : enregistre une fois chaque cycle final <= closed_cycle
+      (rattrape aussi les cycles qu'un node en retard n'avait pas encore rendus) et n'alerte que
+      pour les blocks manqués pas encore signalés.
+    """
+    if _watcher_state['history'] is None:
+        logger.info(f"[MISSED_BLOCK] JSON Watcher started")
+        # Structure :
+        # {
+        #   "My node": {
+        #     "AU12xxx...": [
+        #         {"datetime": "...", "cycle": ..., "missed": ...},
+        #         ...
+        #     ],
+        #     ...
+        #   },
+        #   ...
+        # }
+        history = load_json_history()
+        if not isinstance(history, dict):
+            history = {}
+        _watcher_state['history'] = history
+    history = _watcher_state['history']
+    alerted = _watcher_state['alerted']
+
+    if not is_watcher_enabled("missed_blocks"):
+        return
+
+    snapshot = app_globals.address_snapshot
+    if closed_cycle is None:
+        if snapshot['version'] == _watcher_state['last_version']:
+            return
+        _watcher_state['last_version'] = snapshot['version']
+
+    for node_name, node_data in app_globals.app_results.items():
+        wallets = node_data.get("wallets", {})
+        if not wallets:
             continue
 
-        for node_name, node_data in app_globals.app_results.items():
-            wallets = node_data.get("wallets", {})
-            if not wallets:
-                continue
-
-            if node_name not in history:
-                history[node_name] = {}
-
-            for wallet_address in wallets:
-                try:
-                    resp = await pull_http_api(
-                        api_url=node_data['url'],
-                        api_method="POST",
-                        api_payload=json.dumps({
-                            "jsonrpc": "2.0",
-                            "method": "get_addresses",
-                            "params": [[wallet_address]],
-                            "id": 0
-                        }),
-                        api_content_type="application/json"
-                    )
-                    if (
-                        not resp or
-                        "result" not in resp or
-                        "result" not in resp["result"] or
-                        not isinstance(resp["result"]["result"], list) or
-                        not resp["result"]["result"]
-                    ):
+        if node_name not in history:
+            history[node_name] = {}
+
+        for wallet_address in wallets:
+            try:
+                addr_info = get_snapshot_wallet(snapshot, node_name, wallet_address)
+                if not addr_info:
+                    continue
+
+                cycle_infos = addr_info.get("cycle_infos", [])
+
+                if wallet_address not in history[node_name]:
+                    history[node_name][wallet_address] = []
+
+                # Cycles déjà enregistrés (un cycle clôturé ne change plus)
+                seen_cycles = {c["cycle"] for c in history[node_name][wallet_address] if "cycle" in c}
+
+                for cycle in cycle_infos:
+                    cycle_num = cycle.get("cycle")
+                    missed = cycle.get("nok_count", 0) or 0
+                    if cycle_num is None or cycle_num in seen_cycles:
+                        continue
+                    alerted_key = (node_name, wallet_address, cycle_num)
+                    already_alerted = alerted.get(alerted_key, 0)
+
+                    if closed_cycle is None:
+                        # Cycle en cours (ou pas encore final) : alerte immédiate sur les nouveaux blocks manqués
+                        if missed <= already_alerted:
+                            continue
+                        alerted[alerted_key] = missed
+                        now_iso = datetime.now().isoformat()
+                        message = (
+                            f"❌ <b>Missed block detected</b>\n"
+                            f"👛 Wallet: <code>{wallet_address}</code>\n"
+                            f"🏠 Node: <b>{node_name}</b>\n"
+                            f"🌀 Cycle: <b>{cycle_num}</b>\n"
+                            f"⛔ New missed block(s): <b>{missed - already_alerted}</b> (total in this cycle: <b>{missed}</b>)\n"
+                            f"🕒 {now_iso}"
+                        )
+                        await send_alert(
+                            alert_type="wallet_block_miss",
+                            node=node_name,
+                            wallet=wallet_address,
+                            level="warning",
+                            html=message
+                        )
+                        logger.warning(f"[MISSED_BLOCK] New missed block for {wallet_address}@{node_name}: cycle={cycle_num}, missed={missed}")
                         continue
 
-                    addr_info = resp["result"]["result"][0]
-                    cycle_infos = addr_info.get("cycle_infos", [])
-
-                    if wallet_address not in history[node_name]:
-                        history[node_name][wallet_address] = []
-
-                    # On récupère les entrées déjà enregistrées (cycle, missed)
-                    seen = {(c["cycle"], c["missed"]) for c in history[node_name][wallet_address] if "cycle" in c and "missed" in c}
-
-                    for cycle in cycle_infos:
-                        cycle_num = cycle.get("cycle")
-                        missed = cycle.get("nok_count", 0)
-                        if missed and missed > 0:
-                            key_tuple = (cycle_num, missed)
-                            if key_tuple not in seen:
-                                now_iso = datetime.now().isoformat()
-                                entry = {
-                                    "datetime": now_iso,
-                                    "cycle": cycle_num,
-                                    "missed": missed
-                                }
-                                history[node_name][wallet_address].append(entry)
-                                seen.add(key_tuple)
-
-                                message = (
-                                    f"❌ <b>Missed block detected</b>\n"
-                                    f"👛 Wallet: <code>{wallet_address}</code>\n"
-                                    f"🏠 Node: <b>{node_name}</b>\n"
-                                    f"🌀 Cycle: <b>{cycle_num}</b>\n"
-                                    f"⛔ Total missed this cycle: <b>{missed}</b>\n"
-                                    f"🕒 {now_iso}\n"
-                                    f"🗂 Added to history."
-                                )
-                                await send_alert(
-                                    alert_type="wallet_block_miss",
-                                    node=node_name,
-                                    wallet=wallet_address,
-                                    level="warning",
-                                    html=message
-                                )
-                                logger.warning(f"[MISSED_BLOCK] New missed block for {wallet_address}@{node_name}: cycle={cycle_num}, missed={missed}")
-
-                except Exception as e:
-                    logger.error(f"[MISSED_BLOCK] Error fetching wallet {wallet_address}: {e}")
-
-        await save_json_history(history)
-        await asyncio.sleep(polling_interval)
+                    if cycle_num > closed_cycle:
+                        continue
+                    if not cycle.get("is_final", True):
+                        # Compteurs pas encore définitifs (node en retard) : relevé au prochain passage
+                        continue
+                    alerted.pop(alerted_key, None)
+                    if missed <= 0:
+                        continue
+
+                    now_iso = datetime.now().isoformat()
+                    entry = {
+                        "datetime": now_iso,
+                        "cycle": cycle_num,
+                        "missed": missed
+                    }
+                    history[node_name][wallet_address].append(entry)
+                    mark_dirty(name="missed_blocks")
+                    seen_cycles.add(cycle_num)
+                    if missed <= already_alerted:
+                        # Déjà signalé en direct pendant le cycle
+                        continue
+
+                    message = (
+                        f"❌ <b>Missed block detected</b>\n"
+                        f"👛 Wallet: <code>{wallet_address}</code>\n"
+                        f"🏠 Node: <b>{node_name}</b>\n"
+                        f"🌀 Cycle: <b>{cycle_num}</b>\n"
+                        f"⛔ Total missed in this (closed) cycle: <b>{missed}</b>\n"
+                        f"🕒 {now_iso}\n"
+                        f"🗂 Added to history."
+                    )
+                    await send_alert(
+                        alert_type="wallet_block_miss",
+                        node=node_name,
+                        wallet=wallet_address,
+                        level="warning",
+                        html=message
+                    )
+                    logger.warning(f"[MISSED_BLOCK] New missed block for {wallet_address}@{node_name}: cycle={cycle_num}, missed={missed}")
+
+            except Exception as e:
+                logger.error(f"[MISSED_BLOCK] Error fetching wallet {wallet_address}: {e}")
@@ -7,10 +7,13 @@ import time
 from datetime import datetime
 from loguru import logger
 
-from remotes_utils import pull_http_api
+from remotes_utils import pull_http_api_batch, get_node_read_url
+from remotes.addresses import get_snapshot_wallet
+from remotes.store import is_store_enabled, build_seen_statements, load_seen
+from remotes.persistence import register_persistence, mark_dirty, write_json_file, write_store_statements, copy_nested
 import app_globals
 from alert_manager import send_alert
-from watcher_utils import load_json_watcher, save_json_watcher
+from watcher_utils import load_json_watcher
 from watchers.watchers_control import is_watcher_enabled
 
 WATCH_FILE = "watchers_state/operations_seen.json"
@@ -23,33 +26,23 @@ def log_short_ops(wallet_address, ops, label="created_operations", preview=10):
         short_list = ops[:preview] + (["..."] if n > preview else [])
         logger.debug(f"[OPERATIONS] {wallet_address} {label} (total {n}): {short_list}")
 
-async def get_operation_details(op_id, node_url):
-    payload = {
-        "jsonrpc": "2.0",
-        "method": "get_operations",
-        "params": [[op_id]],
-        "id": 0
-    }
+async def get_operations_details(op_ids, node_url):
+    # Un seul batch JSON-RPC pour toutes les nouvelles opérations, erreurs rapportées par opération
+    ops_details = {}
     try:
-        resp = await pull_http_api(
+        answers = await pull_http_api_batch(
             api_url=node_url,
-            api_method="POST",
-            api_payload=payload,
-            api_content_type="application/json"
+            api_calls=[("get_operations", [[op_id]]) for op_id in op_ids]
         )
-        # Le résultat de l'API peut varier : dict avec clé "result", ou liste brute
-        op_list = None
-        if "result" in resp and isinstance(resp["result"], dict) and "result" in resp["result"]:
-            op_list = resp["result"]["result"]
-        elif "result" in resp and isinstance(resp["result"], list):
-            op_list = resp["result"]
-        else:
-            op_list = []
-        if op_list and len(op_list) > 0:
-            return op_list[0]
+        for op_id, answer in zip(op_ids, answers):
+            op_list = answer.get("result", None)
+            if isinstance(op_list, list) and op_list:
+                ops_details[op_id] = op_list[0]
+            else:
+                logger.error(f"[OPERATIONS] Erreur lors de la récupération du détail op {op_id}: {answer.get('error', 'résultat vide')}")
     except Exception as e:
-        logger.error(f"[OPERATIONS] Erreur lors de la récupération du détail op {op_id}: {str(e)}")
-    return None
+        logger.error(f"[OPERATIONS] Erreur lors de la récupération du détail des ops {op_ids}: {str(e)}")
+    return ops_details
 
 def format_operation_details(op_detail):
     if not op_detail:
@@ -135,88 +128,91 @@ def format_operation_details(op_detail):
             f"\n⏳ Status: <b>{op_status}</b>"
         )
 
-async def watch_operations(polling_interval=30):
-    try:
-        previous_ops = load_json_watcher(WATCH_FILE, {})
-    except Exception as e:
-        logger.error(f"[OPERATIONS] Erreur chargement {WATCH_FILE} : {str(e)}")
-        previous_ops = {}
-
-    logger.info(f"[OPERATIONS] Watcher: operations started")
-    while True:
-        if not is_watcher_enabled("operations"):
-            logger.info(f"[OPERATIONS] Désactivé, je dors...")
-            await asyncio.sleep(60)
-            continue
-
-        for node_name, node_data in app_globals.app_results.items():
-            node_url = node_data.get("url") or app_globals.app_config["service"]["mainnet_rpc_url"]
-            for wallet_address in node_data.get("wallets", {}):
-                logger.debug(f"[OPERATIONS] Checking wallet {wallet_address} on node {node_name}")
-                try:
-                    payload = {
-                        "jsonrpc": "2.0",
-                        "method": "get_addresses",
-                        "params": [[wallet_address]],
-                        "id": 0
-                    }
-                    resp = await pull_http_api(
-                        api_url=node_url,
-                        api_method="POST",
-                        api_payload=payload,
-                        api_content_type="application/json"
+# État du watcher (chargé au premier passage) et dernière version de snapshot traitée
+_watcher_state = {"last_version": 0, "previous_ops": None}
+
+def collect_seen():
+    """Collecteur de remotes/persistence.py : nouveaux identifiants (SQLite) ou copie à sérialiser (JSON)."""
+    previous_ops = _watcher_state['previous_ops']
+    if previous_ops is None:
+        return None
+    if is_store_enabled():
+        return write_store_statements, (build_seen_statements(table="seen_operations", seen=previous_ops),)
+    return write_json_file, (WATCH_FILE, copy_nested(previous_ops))
+
+register_persistence(name="operations", collect_func=collect_seen)
+
+async def watch_operations_tick() -> None:
+    """Traite le dernier snapshot d'adresses s'il est nouveau (job déclenché à chaque snapshot, cf. remotes/scheduler.py)."""
+    if _watcher_state['previous_ops'] is None:
+        try:
+            if is_store_enabled():
+                previous_ops = load_seen(table="seen_operations")
+            else:
+                previous_ops = load_json_watcher(WATCH_FILE, {})
+        except Exception as e:
+            logger.error(f"[OPERATIONS] Erreur chargement {WATCH_FILE} : {str(e)}")
+            previous_ops = {}
+
+        logger.info(f"[OPERATIONS] Watcher: operations started")
+        _watcher_state['previous_ops'] = previous_ops
+    previous_ops = _watcher_state['previous_ops']
+
+    if not is_watcher_enabled("operations"):
+        return
+
+    snapshot = app_globals.address_snapshot
+    if snapshot['version'] == _watcher_state['last_version']:
+        return
+    _watcher_state['last_version'] = snapshot['version']
+
+    for node_name, node_data in app_globals.app_results.items():
+        node_url = get_node_read_url(node_name=node_name)
+        for wallet_address in node_data.get("wallets", {}):
+            logger.debug(f"[OPERATIONS] Checking wallet {wallet_address} on node {node_name}")
+            addr_data = get_snapshot_wallet(snapshot, node_name, wallet_address)
+            if not addr_data:
+                logger.debug(f"[OPERATIONS] {wallet_address}: résultat API inexploitable")
+                continue
+            if "created_operations" not in addr_data:
+                logger.debug(f"[OPERATIONS] {wallet_address}: champ 'created_operations' absent dans la réponse")
+                continue
+            created_ops = addr_data["created_operations"]
+            log_short_ops(wallet_address, created_ops, label="created_operations")
+
+            old_ops = previous_ops.get(wallet_address, [])
+            log_short_ops(wallet_address, old_ops, label="old_operations")
+            new_ops = [o for o in created_ops if o not in old_ops]
+            log_short_ops(wallet_address, new_ops, label="new_operations")
+
+            if not created_ops or len(created_ops) == 0:
+                logger.warning(f"[OPERATIONS] {wallet_address}@{node_name}: Pas d'opérations créées (created_operations vide). Peut-être une limitation du node public.")
+                continue
+
+            if new_ops:
+                ops_details = await get_operations_details(new_ops, node_url)
+                for op_id in new_ops:
+                    op_detail = ops_details.get(op_id)
+                    dt = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                    message = (
+                        f"📨 <b>New operation created</b>\n"
+                        f"👛 Wallet: <code>{wallet_address}</code>\n"
+                        f"🏠 Node: <b>{node_name}</b>\n"
+                        f"🆔 Operation: <code>{op_id}</code>\n"
+                        f"🕒 {dt}\n"
+                        f"{format_operation_details(op_detail)}\n"
+                        f"🗂 Added to history."
                     )
-                except Exception as e:
-                    logger.warning(f"[OPERATIONS] API error for {wallet_address}@{node_name}: {str(e)}")
-                    continue
-
-                # Compatibilité: API peut répondre .result.result ou .result
-                result = resp.get("result", {}).get("result") if isinstance(resp.get("result", {}), dict) else resp.get("result")
-                if not result or not isinstance(result, list) or not result[0]:
-                    logger.debug(f"[OPERATIONS] {wallet_address}: résultat API inexploitable")
-                    continue
-                if "created_operations" not in result[0]:
-                    logger.debug(f"[OPERATIONS] {wallet_address}: champ 'created_operations' absent dans la réponse")
-                    continue
-                created_ops = result[0]["created_operations"]
-                log_short_ops(wallet_address, created_ops, label="created_operations")
-
-                old_ops = previous_ops.get(wallet_address, [])
-                log_short_ops(wallet_address, old_ops, label="old_operations")
-                new_ops = [o for o in created_ops if o not in old_ops]
-                log_short_ops(wallet_address, new_ops, label="new_operations")
-
-                if not created_ops or len(created_ops) == 0:
-                    logger.warning(f"[OPERATIONS] {wallet_address}@{node_name}: Pas d'opérations créées (created_operations vide). Peut-être une limitation du node public.")
-                    continue
-
-                if new_ops:
-                    for op_id in new_ops:
-                        op_detail = await get_operation_details(op_id, node_url)
-                        dt = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                        message = (
-                            f"📨 <b>New operation created</b>\n"
-                            f"👛 Wallet: <code>{wallet_address}</code>\n"
-                            f"🏠 Node: <b>{node_name}</b>\n"
-                            f"🆔 Operation: <code>{op_id}</code>\n"
-                            f"🕒 {dt}\n"
-                            f"{format_operation_details(op_detail)}\n"
-                            f"🗂 Added to history."
-                        )
-                        await send_alert(
-                            alert_type="operation_created",
-                            node=node_name,
-                            wallet=wallet_address,
-                            level="info",
-                            html=message
-                        )
-                        logger.success(f"[OPERATIONS] Nouvelle opération: {op_id} ({dt})")
-
-                    previous_ops[wallet_address] = created_ops
-                    try:
-                        save_json_watcher(WATCH_FILE, previous_ops)
-                        logger.info(f"{WATCH_FILE} mis à jour pour {wallet_address} ({len(created_ops)} opérations connues)")
-                    except Exception as e:
-                        logger.error(f"[OPERATIONS] Erreur sauvegarde {WATCH_FILE}: {str(e)}")
-
-        await asyncio.sleep(polling_interval)
+                    await send_alert(
+                        alert_type="operation_created",
+                        node=node_name,
+                        wallet=wallet_address,
+                        level="info",
+                        html=message
+                    )
+                    logger.success(f"[OPERATIONS] Nouvelle opération: {op_id} ({dt})")
+
+                previous_ops[wallet_address] = created_ops
+                # Écriture différée (remotes/persistence.py)
+                mark_dirty(name="operations")
+                logger.info(f"[OPERATIONS] {wallet_address}: {len(created_ops)} opérations connues")